@@ -0,0 +1,103 @@
+import math
+import statistics
+from logging import getLogger
+from pathlib import Path
+from typing import Any, NamedTuple
+
+from acp.atcoder.judge import JudgeResult, JudgeRunner
+
+logger = getLogger(__name__)
+
+
+__all__ = ["TimingStats", "benchmark"]
+
+
+class TimingStats(NamedTuple):
+    """
+    繰り返し実行したときの時間の統計 [sec]
+    """
+
+    min: float
+    median: float
+    p95: float
+    stddev: float
+
+    @classmethod
+    def from_samples(cls, samples: list[float]) -> "TimingStats":
+        """
+        Args:
+            samples (list[float]): 計測値 (1つ以上)
+
+        Returns:
+            TimingStats: 統計
+
+        Raises:
+            ValueError: 計測値がない場合
+        """
+        if not samples:
+            raise ValueError("No samples to compute timing statistics")
+        ordered = sorted(samples)
+        p95 = ordered[math.ceil(len(ordered) * 0.95) - 1]  # nearest-rank法
+        stddev = statistics.stdev(ordered) if len(ordered) > 1 else 0.0
+        return cls(ordered[0], statistics.median(ordered), p95, stddev)
+
+    def __str__(self) -> str:
+        return (
+            f"min {self.min:.3f} / median {self.median:.3f} / "
+            f"p95 {self.p95:.3f} / sd {self.stddev:.3f}"
+        )
+
+
+def benchmark(
+    runner: JudgeRunner,
+    input_testcase_file: Path,
+    output_testcase_file: Path,
+    repeat: int = 10,
+    warmup: int = 0,
+    margin: float = 0.1,
+    timelimit: float = 2,
+    **kwargs: Any,
+) -> tuple[JudgeResult, dict[str, Any]]:
+    """
+    テストケースを繰り返し実行し、実行時間の統計をとる
+    AC以外になった時点でその結果を返す
+
+    Args:
+        runner (JudgeRunner): 実行するJudgeRunner
+        input_testcase_file (Path): 入力ファイル
+        output_testcase_file (Path): テストケース
+        repeat (int, optional): 計測する回数. Defaults to 10.
+        warmup (int, optional): 計測前に捨てる実行の回数 (ディスクキャッシュなどを温める). Defaults to 0.
+        margin (float, optional): 中央値が実行時間制限の (1 - margin) 倍以上なら警告する. Defaults to 0.1.
+        timelimit (float, optional): 実行時間制限 [sec]. Defaults to 2.
+        **kwargs (Any): JudgeRunnerに渡す引数 (memory_limit など)
+
+    Returns:
+        tuple[JudgeResult, dict]: 判定結果, 最後の実行結果 (ACの場合は "bench" に統計を追加する)
+
+    Raises:
+        ValueError: repeatが1未満かwarmupが負の場合
+    """
+    if repeat < 1 or warmup < 0:
+        msg = f"repeat must be at least 1 and warmup must not be negative: repeat={repeat}, warmup={warmup}"
+        raise ValueError(msg)
+    times: list[float] = []
+    cpu_times: list[float] = []
+    for i in range(warmup + repeat):
+        code, meta = runner(
+            input_testcase_file, output_testcase_file, timelimit=timelimit, **kwargs
+        )
+        if code != JudgeResult.AC:
+            return code, meta
+        if i >= warmup:
+            times.append(meta["time"])
+            cpu_times.append(meta["cpu_time"])
+
+    time_stats = TimingStats.from_samples(times)
+    meta["bench"] = {
+        "repeat": repeat,
+        "time": time_stats,
+        "cpu_time": TimingStats.from_samples(cpu_times),
+        "near_limit": time_stats.median >= timelimit * (1 - margin),
+    }
+    return code, meta
@@ -0,0 +1,123 @@
+import hashlib
+import shlex
+import shutil
+import subprocess
+import tempfile
+import time
+from logging import getLogger
+from pathlib import Path
+from typing import NamedTuple
+
+logger = getLogger(__name__)
+
+
+__all__ = ["BUILD_COMMANDS", "BuildResult", "Builder"]
+
+BUILD_COMMANDS: dict[str, str] = {
+    ".cpp": "g++ -std=gnu++20 -O2 -o {out} {src}",
+    ".cc": "g++ -std=gnu++20 -O2 -o {out} {src}",
+    ".c": "gcc -std=gnu11 -O2 -o {out} {src} -lm",
+    ".rs": "rustc --edition 2021 -O -o {out} {src}",
+    ".go": "go build -o {out} {src}",
+}
+"""
+拡張子ごとのデフォルトのビルドコマンド
+{src}がソースファイル, {out}が出力する実行ファイルに置き換えられる
+"""
+
+
+class BuildResult(NamedTuple):
+    """
+    ビルド結果
+    """
+
+    binary: Path | None  # 実行ファイル (ビルドに失敗した場合はNone)
+    cached: bool  # キャッシュされた実行ファイルを使ったか
+    output: str  # コンパイラの出力
+    time: float  # ビルドにかかった時間 [sec]
+
+
+class Builder:
+    """
+    コンパイルが必要な言語のソースファイルをビルドするクラス
+    ソースファイルの内容とビルドコマンドのハッシュをキーに実行ファイルをキャッシュし、
+    変更がなければ再コンパイルしない
+    """
+
+    def __init__(self, cache_dir: Path) -> None:
+        """
+        Args:
+            cache_dir (Path): 実行ファイルを置くディレクトリ
+        """
+        self.cache_dir = cache_dir
+
+    def key(self, source: Path, build_command: str) -> str:
+        """
+        キャッシュのキー (ソースファイルの内容 + ビルドコマンドのハッシュ)
+        """
+        digest = hashlib.sha256(source.read_bytes())
+        digest.update(b"\0" + build_command.encode())
+        return digest.hexdigest()[:32]
+
+    def build(self, source: Path, build_command: str | None = None) -> BuildResult:
+        """
+        ソースファイルをビルドする (キャッシュがあればそれを使う)
+
+        Args:
+            source (Path): ソースファイル
+            build_command (str | None, optional): ビルドコマンド. Defaults to None (拡張子から決める).
+
+        Returns:
+            BuildResult: ビルド結果
+
+        Examples:
+            >>> builder = Builder(Path(".acp/build"))
+            >>> builder.build(Path("main.cpp"))
+            >>> builder.build(Path("main.cpp"), "g++ -std=c++17 -O2 -o {out} {src}")
+        """
+        if build_command is None:
+            if source.suffix not in BUILD_COMMANDS:
+                msg = f"No build command for '{source.suffix}' files. Please specify the build command."
+                return BuildResult(None, False, msg, 0.0)
+            build_command = BUILD_COMMANDS[source.suffix]
+        if not source.exists():
+            return BuildResult(None, False, f"{source} not found.", 0.0)
+
+        binary = (self.cache_dir / self.key(source, build_command)).resolve()
+        if binary.exists():
+            logger.info("Use cached binary: %s", binary)
+            return BuildResult(binary, True, "", 0.0)
+
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        # 並列に (同じプロセスの別スレッドからでも) 同じソースをビルドしても壊れないように、
+        # ビルドごとの一時ディレクトリに出力してからrenameする
+        # (コンパイラによっては既存のファイルを上書きしないので、ファイルではなくディレクトリを作る)
+        tmp_dir = Path(tempfile.mkdtemp(dir=self.cache_dir, suffix=".tmp")).resolve()
+        tmp = tmp_dir / binary.name
+        # コンパイラはソースのディレクトリで実行するので、パスは絶対パスにする
+        command = shlex.split(
+            build_command.format(
+                src=shlex.quote(str(source.resolve())), out=shlex.quote(str(tmp))
+            )
+        )
+        logger.info("Build: %s", command)
+        start = time.perf_counter()
+        try:
+            try:
+                proc = subprocess.run(
+                    command,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.STDOUT,
+                    cwd=source.parent,
+                    check=False,
+                )
+            except FileNotFoundError as e:
+                return BuildResult(None, False, str(e), time.perf_counter() - start)
+            elapsed = time.perf_counter() - start
+            output = proc.stdout.decode(errors="replace")
+            if proc.returncode != 0 or not tmp.exists():
+                return BuildResult(None, False, output, elapsed)
+            tmp.replace(binary)
+            return BuildResult(binary, False, output, elapsed)
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
@@ -0,0 +1,378 @@
+import re
+from collections.abc import Iterable, Iterator
+from itertools import chain, islice, zip_longest
+from logging import getLogger
+from typing import NamedTuple
+
+logger = getLogger(__name__)
+
+
+__all__ = [
+    "CHECKERS",
+    "CHUNK_SIZE",
+    "Checker",
+    "FloatChecker",
+    "Mismatch",
+    "TokenBlock",
+    "TokenChecker",
+    "YesNoChecker",
+    "iter_lines",
+    "iter_token_blocks",
+    "make_checker",
+]
+
+CHUNK_SIZE = 1 << 16  # 64 KiB
+"""
+出力を逐次読み込むときのチャンクサイズ
+"""
+
+
+class Mismatch(NamedTuple):
+    """
+    期待される出力と実際の出力の最初の不一致箇所
+    """
+
+    line: int  # 行番号 (1-indexed)
+    column: int  # 列番号 (1-indexed, byte単位)
+    expected: str  # 期待される出力の該当行
+    got: str  # 実際の出力の該当行
+
+    def __str__(self) -> str:
+        return f"line {self.line}, column {self.column}"
+
+
+def iter_lines(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    """
+    チャンクの列を行ごとに区切って返す
+    全体を結合せずに、1行分だけをバッファに持つ
+
+    Args:
+        chunks (Iterable[bytes]): 入力チャンク
+
+    Returns:
+        Iterator[bytes]: 改行を含まない各行
+    """
+    pieces: list[bytes] = []  # 改行がまだ来ていない行の断片 (最後に1回だけ結合する)
+    for chunk in chunks:
+        start = 0
+        while (end := chunk.find(b"\n", start)) >= 0:
+            pieces.append(chunk[start:end])
+            yield b"".join(pieces)
+            pieces.clear()
+            start = end + 1
+        if start < len(chunk):
+            pieces.append(chunk[start:])
+    if pieces:
+        yield b"".join(pieces)
+
+
+class TokenBlock(NamedTuple):
+    """
+    チャンク1つ分のトークン
+    トークンの位置 (行・列) は不一致が見つかったときだけ計算する
+    """
+
+    tokens: list[bytes]  # 空白区切りのトークン
+    buf: bytes  # トークンを切り出した元のバイト列 (トークンの途中では切れていない)
+    lineno: int  # bufの先頭の行番号
+    offset: int  # bufの先頭の、行頭からの位置
+
+    def locate(self, index: int) -> tuple[int, int]:
+        """
+        index番目のトークンの位置を返す
+
+        Returns:
+            tuple[int, int]: (行番号, 列番号)
+        """
+        start = next(islice(_TOKEN.finditer(self.buf), index, None)).start()
+        newline = self.buf.rfind(b"\n", 0, start)
+        if newline < 0:
+            return self.lineno, start + self.offset + 1
+        return self.lineno + self.buf.count(b"\n", 0, start), start - newline
+
+
+_TOKEN = re.compile(rb"\S+")
+_WHITESPACES = (b" ", b"\n", b"\t", b"\r", b"\x0b", b"\x0c")
+
+
+def iter_token_blocks(
+    chunks: Iterable[bytes], lineno: int = 1, offset: int = 0
+) -> Iterator[TokenBlock]:
+    """
+    チャンクの列を空白区切りのトークンに分けて、チャンクごとに返す
+    全体を結合したりsplitしたリストを作ったりせず、チャンクの境界で切れたトークンだけを持ち越す
+
+    Args:
+        chunks (Iterable[bytes]): 入力チャンク (トークンの先頭から始まる)
+        lineno (int, optional): 最初の行の行番号. Defaults to 1.
+        offset (int, optional): 最初のチャンクの先頭の、行頭からの位置. Defaults to 0.
+
+    Returns:
+        Iterator[TokenBlock]: チャンクごとのトークン
+    """
+    pieces: list[
+        bytes
+    ] = []  # 持ち越したトークンの断片 (空白が来たときに1回だけ結合する)
+    for chunk in chain(chunks, [None]):
+        if chunk is None:
+            buf = b"".join(pieces)
+            cut = len(buf)
+        else:
+            pieces.append(chunk)
+            # 最後の空白の直後で切る
+            last = max(chunk.rfind(w) for w in _WHITESPACES)
+            if last < 0:
+                continue  # 空白のない長いトークンの途中
+            buf = b"".join(pieces)
+            cut = len(buf) - len(chunk) + last + 1
+        head = buf[:cut]
+        yield TokenBlock(head.split(), head, lineno, offset)
+        if newlines := head.count(b"\n"):
+            lineno += newlines
+            offset = -(head.rfind(b"\n") + 1)
+        offset += cut
+        pieces = [buf[cut:]]
+
+
+def _preview(line: bytes, limit: int = 256) -> str:
+    text = line.decode(errors="replace")
+    return text if len(text) <= limit else text[:limit] + " ..."
+
+
+class Checker:
+    """
+    出力が正しいかを判定するクラス
+    期待される出力と実際の出力をチャンク単位で読み進め、最初の不一致で打ち切る
+
+    行ごとの完全一致で判定する (行末の空白と末尾の空行は無視する)
+    """
+
+    name = "exact"
+
+    LINE_LIMIT = CHUNK_SIZE
+    """
+    一致した部分を行の区切りまで持っておく長さの上限 [byte]
+    これより長い行は行の途中で読み捨てる (不一致の表示は読み捨てた位置から始まる)
+    """
+
+    def cut(self, buf: bytes | bytearray, start: int, end: int) -> int:
+        """
+        一致を確かめたbuf[:end]のうち、読み捨ててよい長さを返す
+        (buf[:start]は前回までに確かめて、読み捨てられなかった部分)
+
+        行ごとに比較するので、基本は行の区切りで切る
+        """
+        cut = buf.rfind(b"\n", start, end) + 1
+        return end if cut == 0 and end > self.LINE_LIMIT else cut
+
+    def compare(
+        self, expected: Iterable[bytes], output: Iterable[bytes]
+    ) -> Mismatch | None:
+        """
+        Args:
+            expected (Iterable[bytes]): 期待される出力のチャンク
+            output (Iterable[bytes]): 実際の出力のチャンク
+
+        Returns:
+            Mismatch | None: 最初の不一致箇所 (一致した場合はNone)
+        """
+        # バイト列として完全に一致している部分は行単位で見ずに読み飛ばす
+        # 一致しない(かもしれない)ところからはcompare_restで比較する
+        expected_chunks, output_chunks = iter(expected), iter(output)
+        expected_buf, output_buf = bytearray(), bytearray()
+        checked = 0  # バッファの先頭から何byteまで一致を確かめたか
+        lineno, offset = 1, 0  # バッファの先頭の位置 (行番号, 行頭からの位置)
+        while True:
+            if len(expected_buf) <= len(output_buf):
+                chunk = next(expected_chunks, None)
+                if chunk is None:
+                    break
+                expected_buf += chunk
+            else:
+                chunk = next(output_chunks, None)
+                if chunk is None:
+                    break
+                output_buf += chunk
+            n = min(len(expected_buf), len(output_buf))
+            # 新しく比べられるようになった部分だけを (コピーせずに) 比較する
+            if memoryview(expected_buf)[checked:n] != memoryview(output_buf)[checked:n]:
+                break
+            cut = self.cut(expected_buf, checked, n)
+            if newlines := expected_buf.count(b"\n", 0, cut):
+                lineno += newlines
+                offset = cut - (expected_buf.rfind(b"\n", 0, cut) + 1)
+            else:
+                offset += cut
+            del expected_buf[:cut], output_buf[:cut]
+            checked = n - cut
+        return self.compare_rest(
+            chain([bytes(expected_buf)], expected_chunks),
+            chain([bytes(output_buf)], output_chunks),
+            lineno,
+            offset,
+        )
+
+    def compare_rest(
+        self,
+        expected: Iterable[bytes],
+        output: Iterable[bytes],
+        lineno: int = 1,
+        offset: int = 0,
+    ) -> Mismatch | None:
+        """
+        バイト列として一致しなかった部分を比較する (行ごとの比較)
+
+        Args:
+            expected (Iterable[bytes]): 期待される出力の残りのチャンク
+            output (Iterable[bytes]): 実際の出力の残りのチャンク
+            lineno (int, optional): 最初の行の行番号. Defaults to 1.
+            offset (int, optional): 最初のチャンクの先頭の、行頭からの位置 (それより前は一致している). Defaults to 0.
+
+        Returns:
+            Mismatch | None: 最初の不一致箇所 (一致した場合はNone)
+        """
+        lines = zip_longest(iter_lines(expected), iter_lines(output), fillvalue=b"")
+        for line, (e, o) in enumerate(lines, lineno):
+            e, o = e.rstrip(), o.rstrip()
+            if e != o:
+                column = next(
+                    (i for i, (x, y) in enumerate(zip(e, o)) if x != y),
+                    min(len(e), len(o)),
+                )
+                if line == lineno and offset > 0:
+                    # 行の途中から比較した (行頭の一致した部分は読み捨てている)
+                    return Mismatch(
+                        line,
+                        offset + column + 1,
+                        "... " + _preview(e),
+                        "... " + _preview(o),
+                    )
+                return Mismatch(line, column + 1, _preview(e), _preview(o))
+        return None
+
+
+class TokenChecker(Checker):
+    """
+    空白区切りのトークンごとに比較する (空白・改行の違いは無視する)
+    """
+
+    name = "token"
+
+    def match(self, expected: bytes, output: bytes) -> bool:
+        """
+        トークン1つを比較する
+
+        Args:
+            expected (bytes): 期待されるトークン
+            output (bytes): 実際のトークン
+
+        Returns:
+            bool: 一致しているか
+        """
+        return expected == output
+
+    def cut(self, buf: bytes | bytearray, start: int, end: int) -> int:
+        """
+        トークンごとに比較するので、トークンの途中では切らない (最後の空白の直後で切る)
+        """
+        return max(buf.rfind(w, start, end) for w in _WHITESPACES) + 1
+
+    def compare_rest(
+        self,
+        expected: Iterable[bytes],
+        output: Iterable[bytes],
+        lineno: int = 1,
+        offset: int = 0,
+    ) -> Mismatch | None:
+        expected_blocks = iter_token_blocks(expected, lineno, offset)
+        output_blocks = iter_token_blocks(output, lineno, offset)
+        e = o = TokenBlock([], b"", lineno, offset)
+        ei = oi = 0  # e, oの何番目のトークンまで比較したか
+        while True:
+            while ei == len(e.tokens) and (block := next(expected_blocks, None)):
+                e, ei = block, 0
+            while oi == len(o.tokens) and (block := next(output_blocks, None)):
+                o, oi = block, 0
+            if ei == len(e.tokens) or oi == len(o.tokens):
+                break  # どちらかが終わった
+            n = min(len(e.tokens) - ei, len(o.tokens) - oi)
+            if e.tokens[ei : ei + n] != o.tokens[oi : oi + n]:
+                # まとめて比較して一致しなかったときだけ1つずつ見る
+                for k in range(n):
+                    if not self.match(e.tokens[ei + k], o.tokens[oi + k]):
+                        return Mismatch(
+                            *o.locate(oi + k),
+                            _preview(e.tokens[ei + k]),
+                            _preview(o.tokens[oi + k]),
+                        )
+            ei, oi = ei + n, oi + n
+        if ei < len(e.tokens):
+            return Mismatch(*e.locate(ei), _preview(e.tokens[ei]), "(EOF)")
+        if oi < len(o.tokens):
+            return Mismatch(*o.locate(oi), "(EOF)", _preview(o.tokens[oi]))
+        return None
+
+
+class FloatChecker(TokenChecker):
+    """
+    トークンごとに比較し、実数は絶対誤差または相対誤差が許容範囲内なら一致とみなす
+    """
+
+    name = "float"
+
+    def __init__(self, abs_eps: float = 1e-6, rel_eps: float = 1e-6) -> None:
+        """
+        Args:
+            abs_eps (float, optional): 許容する絶対誤差. Defaults to 1e-6.
+            rel_eps (float, optional): 許容する相対誤差. Defaults to 1e-6.
+        """
+        self.abs_eps = abs_eps
+        self.rel_eps = rel_eps
+
+    def match(self, expected: bytes, output: bytes) -> bool:
+        if expected == output:
+            return True
+        try:
+            e, o = float(expected), float(output)
+        except ValueError:
+            return False  # 実数でないトークンは完全一致のみ
+        diff = abs(e - o)
+        return diff <= self.abs_eps or diff <= self.rel_eps * abs(e)
+
+
+class YesNoChecker(TokenChecker):
+    """
+    トークンごとに比較し、Yes/Noだけは大文字小文字を区別しない
+    """
+
+    name = "yesno"
+
+    def match(self, expected: bytes, output: bytes) -> bool:
+        if expected.lower() in (b"yes", b"no"):
+            return expected.lower() == output.lower()
+        return expected == output
+
+
+CHECKERS: dict[str, type[Checker]] = {
+    checker.name: checker
+    for checker in (Checker, TokenChecker, FloatChecker, YesNoChecker)
+}
+"""
+名前から判定方法を引くための辞書
+"""
+
+
+def make_checker(name: str = "exact", eps: float = 1e-6) -> Checker:
+    """
+    名前から判定方法を作る
+
+    Args:
+        name (str, optional): 判定方法 (exact, token, float, yesno). Defaults to "exact".
+        eps (float, optional): floatの場合に許容する絶対誤差・相対誤差. Defaults to 1e-6.
+
+    Returns:
+        Checker: 判定方法
+    """
+    if name == FloatChecker.name:
+        return FloatChecker(abs_eps=eps, rel_eps=eps)
+    return CHECKERS[name]()
@@ -0,0 +1,317 @@
+import os
+import tempfile
+import threading
+import time
+from contextlib import ExitStack
+from logging import getLogger
+from pathlib import Path
+from typing import Any, NamedTuple
+
+from acp.atcoder.checker import CHUNK_SIZE, Checker
+from acp.atcoder.judge import MEMORY_ERROR_MARKERS, JudgeResult, JudgeRunner
+from acp.atcoder.process import PopenProcess
+
+logger = getLogger(__name__)
+
+
+__all__ = ["InteractiveResult", "InteractiveRunner"]
+
+
+class InteractiveResult(NamedTuple):
+    """
+    インタラクティブな問題のプログラム1回分の実行結果
+    """
+
+    return_code: int  # 解答のリターンコード
+    time: float  # 解答の実時間 [sec]
+    cpu_time: float  # 解答のユーザー + システムCPU時間 [sec]
+    memory: int  # 解答の最大RSS [KB]
+    stderr: str  # 解答の標準エラー出力
+    timed_out: bool  # 制限時間を超えてkillされたか
+    interactor_return_code: int  # インタラクタのリターンコード (0ならAC)
+    interactor_stderr: str  # インタラクタのメッセージ
+    solution_exited_first: bool  # インタラクタより先に解答が終了していたか
+    transcript: str | None = None  # やりとりの記録 (記録した場合のみ)
+
+
+class InteractiveRunner(JudgeRunner):
+    """
+    インタラクティブな問題の解答を、ローカルのインタラクタとつないで実行するクラス
+
+    解答の標準入出力とインタラクタの標準入出力をパイプで直接つなぐ
+    やりとりを記録する場合はacpが間に入って転送し、判定した実行の記録をそのまま返す (転送の分だけ遅くなる)
+    インタラクタは `<interactor> <入力ファイル>` として実行され、終了コードが0ならAC、それ以外はWAとする
+    """
+
+    TRANSCRIPT_SIZE = 1 << 16
+    """
+    記録するやりとりのサイズの上限 [byte]
+    """
+
+    def __init__(
+        self,
+        command: list[str],
+        interactor: list[str],
+        cd: Path | None = None,
+        checker: Checker | None = None,
+        record: bool = False,
+    ) -> None:
+        """
+        Args:
+            command (list[str]): 解答の実行コマンド
+            interactor (list[str]): インタラクタの実行コマンド
+            cd (Path | None, optional): 実行ディレクトリ. Defaults to None.
+            checker (Checker | None, optional): 使わない (JudgeRunnerとの互換のため). Defaults to None.
+            record (bool, optional): やりとりを記録する (acpが間に入って転送するので少し遅くなる). Defaults to False.
+
+        Examples:
+            >>> runner = InteractiveRunner(["python3", "main.py"], ["python3", "interactor.py"], Path("contest"))
+        """
+        super().__init__(command, cd, checker)
+        self.interactor = interactor
+        self.record = record
+
+    def interact(
+        self,
+        input_testcase_file: Path,
+        timeout: float = 60,
+        address_limit: int | None = None,
+        record: bool = False,
+    ) -> InteractiveResult:
+        """
+        Args:
+            input_testcase_file (Path): インタラクタに渡す入力ファイル
+            timeout (float, optional): やりとり全体でこの秒数を超えたら両方killする. Defaults to 60.
+            address_limit (int | None, optional): 解答のアドレス空間の上限 [MB]. Defaults to None (無制限).
+            record (bool, optional): やりとりを記録する (acpが間に入って転送するので少し遅くなる). Defaults to False.
+
+        Returns:
+            InteractiveResult: 実行結果
+        """
+        with ExitStack() as stack:
+            stderr = stack.enter_context(tempfile.TemporaryFile())
+            interactor_stderr = stack.enter_context(tempfile.TemporaryFile())
+            # to_interactor: 解答 -> インタラクタ, to_solution: インタラクタ -> 解答
+            to_interactor = os.pipe()
+            to_solution = os.pipe()
+            relays: list[tuple[int, int]] = []
+            if record:
+                # 間にacpを挟んで、転送しながら記録する
+                from_solution, from_interactor = os.pipe(), os.pipe()
+                relays = [
+                    (from_solution[0], to_interactor[1]),
+                    (from_interactor[0], to_solution[1]),
+                ]
+                solution_fds = (to_solution[0], from_solution[1])
+                interactor_fds = (to_interactor[0], from_interactor[1])
+            else:
+                solution_fds = (to_solution[0], to_interactor[1])
+                interactor_fds = (to_interactor[0], to_solution[1])
+
+            start = time.perf_counter()
+            interactor = PopenProcess(
+                [*self.interactor, str(input_testcase_file)],
+                self.cd,
+                *interactor_fds,
+                interactor_stderr,
+            )
+            solution = PopenProcess(
+                self.command,
+                self.cd,
+                *solution_fds,
+                stderr,
+                address_limit=address_limit,
+            )
+            # 子プロセスに渡した端を閉じておかないと、相手が終了してもEOFにならない
+            for fd in (*solution_fds, *interactor_fds):
+                os.close(fd)
+            transcript = _Transcript(self.TRANSCRIPT_SIZE)
+            threads = [
+                threading.Thread(
+                    target=_relay,
+                    args=(src, dst, transcript, prefix),
+                    daemon=True,
+                )
+                for (src, dst), prefix in zip(relays, (b"> ", b"< "))
+            ]
+            for thread in threads:
+                thread.start()
+            timed_out = threading.Event()
+
+            def kill() -> None:
+                timed_out.set()
+                solution.kill()
+                interactor.kill()
+
+            timer = threading.Timer(timeout, kill)
+            timer.start()
+            try:
+                exited = self._wait(solution, start)
+                interactor_return_code, _, _ = interactor.wait()
+                solution_exited_first = _exited(solution.pid)
+                if interactor_return_code != 0:
+                    solution.kill()  # WAが確定したので解答の終了は待たない
+                return_code, cpu_time, memory, wall_time = exited.result()
+            finally:
+                timer.cancel()
+                for thread in threads:
+                    thread.join()
+
+            stderr.seek(0)
+            interactor_stderr.seek(0)
+            return InteractiveResult(
+                return_code=return_code,
+                time=wall_time,
+                cpu_time=cpu_time,
+                memory=memory,
+                stderr=stderr.read().decode(errors="replace"),
+                timed_out=timed_out.is_set(),
+                interactor_return_code=interactor_return_code,
+                interactor_stderr=interactor_stderr.read().decode(errors="replace"),
+                solution_exited_first=solution_exited_first,
+                transcript=transcript.text() if record else None,
+            )
+
+    def __call__(
+        self,
+        input_testcase_file: Path,
+        output_testcase_file: Path | None = None,
+        timelimit: float = 2,
+        memory_limit: int | None = 1024,
+        kill_margin: float = 0.5,
+        output_limit: int | None = None,
+        address_limit: int | None = None,
+    ) -> tuple[JudgeResult, dict[str, Any]]:
+        """
+        Args:
+            input_testcase_file (Path): インタラクタに渡す入力ファイル
+            output_testcase_file (Path | None, optional): 使わない (JudgeRunnerとの互換のため). Defaults to None.
+            timelimit (float, optional): 実行時間制限 [sec]. Defaults to 2.
+            memory_limit (int | None, optional): メモリ制限 [MB] (解答の最大RSSと比べる). Defaults to 1024. Noneの場合は無制限
+            kill_margin (float, optional): 実行時間制限を何秒超えたらkillするか. Defaults to 0.5.
+            output_limit (int | None, optional): 使わない (JudgeRunnerとの互換のため). Defaults to None.
+            address_limit (int | None, optional): 解答のアドレス空間の上限 [MB]. Defaults to None (無制限).
+
+        Returns:
+            tuple[JudgeResult, dict]: 判定結果, 実行結果 (AC以外の場合は "transcript" にやりとりの記録を含む)
+        """
+        # 判定する実行そのものを記録する (実行し直すと、乱択の解答やインタラクタでは別のやりとりになる)
+        result = self.interact(
+            input_testcase_file,
+            timeout=timelimit + kill_margin,
+            address_limit=address_limit,
+            record=self.record,
+        )
+        code = self.judge(result, timelimit, memory_limit)
+        # ACなら記録は返さない
+        transcript = result.transcript if code != JudgeResult.AC else None
+        return code, {
+            "time": result.time,
+            "cpu_time": result.cpu_time,
+            "memory": result.memory,
+            "return_code": result.return_code,
+            "answer": "",
+            "stdout": "",
+            "stderr": result.stderr,
+            "output_size": 0,
+            "mismatch": None,
+            "interactor_return_code": result.interactor_return_code,
+            "interactor_stderr": result.interactor_stderr,
+            "transcript": transcript,
+        }
+
+    @staticmethod
+    def judge(
+        result: InteractiveResult, timelimit: float, memory_limit: int | None
+    ) -> JudgeResult:
+        """
+        実行結果から判定する
+
+        解答が異常終了するとインタラクタも入力が途切れて失敗するので、先に終了した方の結果で判定する
+        """
+        if result.timed_out:
+            return JudgeResult.TLE
+        if memory_limit is not None and (
+            result.memory > memory_limit * 1024
+            or (
+                result.return_code != 0
+                and any(marker in result.stderr for marker in MEMORY_ERROR_MARKERS)
+            )
+        ):
+            return JudgeResult.MLE
+        if result.return_code != 0 and (
+            result.interactor_return_code == 0 or result.solution_exited_first
+        ):
+            return JudgeResult.RE
+        if result.interactor_return_code != 0:
+            return JudgeResult.WA
+        if result.time > timelimit:
+            return JudgeResult.TLE
+        return JudgeResult.AC
+
+
+_PF_EXITING = 0x00000004  # <linux/sched.h>
+
+
+def _exited(pid: int) -> bool:
+    """
+    子プロセスが終了しているか (回収はしない)
+    """
+    try:
+        if os.waitid(os.P_PID, pid, os.WEXITED | os.WNOHANG | os.WNOWAIT) is not None:
+            return True
+    except ChildProcessError:
+        return True  # すでに回収されている
+    # カーネルはファイルを閉じてからゾンビになるので、その間は終了処理中のフラグを見る
+    try:
+        stat = Path(f"/proc/{pid}/stat").read_bytes()
+    except OSError:
+        return False
+    return bool(int(stat.rsplit(b")", 1)[1].split()[6]) & _PF_EXITING)
+
+
+class _Transcript:
+    """
+    やりとりの記録 (先頭から上限まで)
+    """
+
+    def __init__(self, limit: int) -> None:
+        self.limit = limit
+        self.size = 0
+        self.chunks: list[bytes] = []
+        self.lock = threading.Lock()
+        self.at_line_start = {b"> ": True, b"< ": True}
+
+    def append(self, prefix: bytes, data: bytes) -> None:
+        with self.lock:
+            if self.size >= self.limit:
+                return
+            # 行ごとに向き (> 解答からインタラクタへ, < インタラクタから解答へ) を付ける
+            lines = data.splitlines(keepends=True)
+            for line in lines:
+                if self.at_line_start[prefix]:
+                    line = prefix + line
+                self.at_line_start[prefix] = line.endswith(b"\n")
+                self.chunks.append(line)
+                self.size += len(line)
+
+    def text(self) -> str:
+        text = b"".join(self.chunks).decode(errors="replace")
+        return text if self.size < self.limit else text + "\n..."
+
+
+def _relay(src: int, dst: int, transcript: _Transcript, prefix: bytes) -> None:
+    """
+    srcから読んだデータを記録しながらdstに書き込む (srcがEOFになったらdstを閉じる)
+    """
+    try:
+        while data := os.read(src, CHUNK_SIZE):
+            transcript.append(prefix, data)
+            try:
+                while data:
+                    data = data[os.write(dst, data) :]
+            except BrokenPipeError:
+                break  # 相手が先に終了した
+    finally:
+        os.close(src)
+        os.close(dst)
@@ -1,14 +1,36 @@
 import enum
-import subprocess
+import mmap
+import os
+import signal
+import tempfile
+import threading
 import time
+from collections.abc import Iterator
+from concurrent.futures import Future, wait
+from contextlib import ExitStack
 from logging import getLogger
 from pathlib import Path
-from typing import Any
+from typing import IO, Any, NamedTuple
+
+from acp.atcoder.checker import CHUNK_SIZE, Checker, Mismatch
+from acp.atcoder.prefork import PreforkServer
+from acp.atcoder.process import PopenProcess, Process
 
 logger = getLogger(__name__)
 
 
-__all__ = ["JudgeResult", "JudgeRunner"]
+__all__ = ["ExecResult", "JudgeResult", "JudgeRunner"]
+
+MEMORY_ERROR_MARKERS = (
+    "MemoryError",  # Python
+    "std::bad_alloc",  # C++
+    "memory allocation of",  # Rust
+    "out of memory",  # Go
+    "OutOfMemoryError",  # Java
+)
+"""
+メモリを確保できずに (address_limitのRLIMIT_ASやシステムのメモリ不足で) 異常終了したときに標準エラー出力に現れる文字列
+"""
 
 
 class JudgeResult(enum.Enum):
@@ -26,57 +48,188 @@ class JudgeResult(enum.Enum):
     IE = "IE"  # Internal Error
 
 
+class ExecResult(NamedTuple):
+    """
+    プログラム1回分の実行結果
+    時間とメモリは子プロセスのrusage (wait4) から取得する
+    """
+
+    stdout: str
+    stderr: str
+    return_code: int
+    time: float  # 実時間 [sec]
+    cpu_time: float  # ユーザー + システムCPU時間 [sec]
+    memory: int  # 最大RSS [KB]
+    timed_out: bool = False  # 制限時間を超えてkillされたか
+    output_size: int = 0  # 標準出力のサイズ [byte]
+    output_exceeded: bool = False  # 出力サイズの上限を超えてkillされたか
+    mismatch: Mismatch | None = None  # 期待される出力との最初の不一致箇所
+    aborted: bool = False  # 不一致が見つかった時点でkillしたか
+
+
 class JudgeRunner:
     """
     プログラムを実行し、結果を判定するクラス
     """
 
-    def __init__(self, command: list[str], cd: Path | None = None) -> None:
+    PREVIEW_SIZE = 1 << 16
+    """
+    表示用に保持する標準出力の先頭のサイズ [byte]
+    """
+
+    def __init__(
+        self,
+        command: list[str],
+        cd: Path | None = None,
+        checker: Checker | None = None,
+        prefork: PreforkServer | None = None,
+    ) -> None:
         """
         Args:
             command (list[str]): 実行コマンド
             cd (Path | None, optional): 実行ディレクトリ. Defaults to None.
+            checker (Checker | None, optional): 出力の判定方法. Defaults to None (完全一致).
+            prefork (PreforkServer | None, optional): 指定すると常駐しているワーカーからforkして実行する. Defaults to None.
 
         Examples:
             >>> runner = JudgeRunner(["python3", "main.py"], Path("contest"))
         """
         self.command = command
         self.cd = cd or Path.cwd()
+        self.checker = checker or Checker()
+        self.prefork = prefork
         logger.info("Command: %s", self.command)
         logger.info("Execute Directory: %s", self.cd)
 
     def run(
-        self, input_testcase_file: Path | str, timeout: int = 60
-    ) -> tuple[str, int, tuple[str, str]]:
+        self,
+        input_testcase_file: Path | str,
+        output_testcase_file: Path | None = None,
+        timeout: float = 60,
+        address_limit: int | None = None,
+        output_limit: int | None = None,
+        stdout_file: Path | None = None,
+    ) -> ExecResult:
         """
         Args:
             input_testcase_file (Path | str): 入力ファイル
-            timeout (int, optional): タイムアウト秒数. Defaults to 60.
+            output_testcase_file (Path | None, optional): 期待される出力. 指定すると出力を読みながら比較し、不一致の時点でkillする. Defaults to None.
+            timeout (float, optional): この秒数を超えたらプロセスグループごとkillする. Defaults to 60.
+            address_limit (int | None, optional): アドレス空間の上限 [MB]. Defaults to None (無制限).
+            output_limit (int | None, optional): 標準出力の上限 [byte]. 超えた書き込みは失敗する (RLIMIT_FSIZE). Defaults to None (無制限).
+            stdout_file (Path | None, optional): 標準出力を全て書き出すファイル. Defaults to None (一時ファイルに書いて捨てる).
 
         Returns:
-            tuple[str, int, tuple[str, str]]: 出力, リターンコード, (stdout, stderr)
+            ExecResult: 出力 (先頭のみ), リターンコード, 実行時間, CPU時間, 最大メモリ使用量, 不一致箇所など
         """
         input_testcase_file = (
             input_testcase_file
             if isinstance(input_testcase_file, Path)
             else Path(input_testcase_file)
         )
-        proc = subprocess.Popen(
-            self.command,
-            stdin=subprocess.PIPE,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            cwd=self.cd,
-        )
-        stdout, stderr = proc.communicate(
-            input=input_testcase_file.read_text().encode(), timeout=timeout
-        )
-        return (
-            stdout.decode(),
-            proc.returncode,
-            (stdout.decode(), stderr.decode()),
+        # 入力ファイルをそのまま標準入力にし、出力は一時ファイルに直接書かせる
+        # (acpのプロセスで入出力をコピーしない)
+        with ExitStack() as stack:
+            stdin = stack.enter_context(input_testcase_file.open("rb"))
+            stdout = (
+                stack.enter_context(tempfile.TemporaryFile())
+                if stdout_file is None
+                else stack.enter_context(stdout_file.open("w+b"))
+            )
+            stderr = stack.enter_context(tempfile.TemporaryFile())
+
+            start = time.perf_counter()
+            proc: Process = (
+                self.prefork.start(stdin, stdout, stderr, address_limit, output_limit)
+                if self.prefork is not None
+                else PopenProcess(
+                    self.command,
+                    self.cd,
+                    stdin,
+                    stdout,
+                    stderr,
+                    address_limit=address_limit,
+                    output_limit=output_limit,
+                )
+            )
+            timed_out = threading.Event()
+
+            def kill() -> None:
+                timed_out.set()
+                proc.kill()
+
+            timer = threading.Timer(timeout, kill)
+            timer.start()
+            try:
+                exited = self._wait(proc, start)
+                # 時間内に終了していれば、出力の比較に時間がかかってもkillしない
+                exited.add_done_callback(lambda _: timer.cancel())
+                mismatch = None
+                aborted = False
+                if output_testcase_file is not None:
+                    expected = stack.enter_context(output_testcase_file.open("rb"))
+                    output = _OutputFollower(stdout, exited)
+                    mismatch = self.checker.compare(
+                        _iter_mapped(stack, expected), output
+                    )
+                    if not output.finished and not exited.done():
+                        # 不一致が確定したので残りの出力は待たない
+                        proc.kill()
+                        aborted = True
+                return_code, cpu_time, memory, wall_time = exited.result()
+                # killする前に自分で終了していたら、そのリターンコードで判定する
+                aborted = aborted and return_code == -signal.SIGKILL
+            finally:
+                timer.cancel()
+
+            output_size = os.fstat(stdout.fileno()).st_size
+            preview = os.pread(stdout.fileno(), self.PREVIEW_SIZE, 0)
+            stderr.seek(0)
+            stderr_bytes = stderr.read()
+
+        output_exceeded = output_limit is not None and output_size > output_limit
+        return ExecResult(
+            stdout=preview.decode(errors="replace"),
+            stderr=stderr_bytes.decode(errors="replace"),
+            return_code=return_code,
+            time=wall_time,
+            cpu_time=cpu_time,
+            memory=memory,
+            # killが終了と行き違った場合は、子プロセス自身の実時間で判定する
+            timed_out=timed_out.is_set() and wall_time >= timeout,
+            output_size=output_size,
+            output_exceeded=output_exceeded,
+            mismatch=mismatch,
+            aborted=aborted and not output_exceeded,
         )
 
+    @staticmethod
+    def _wait(proc: Process, start: float) -> Future[tuple[int, float, int, float]]:
+        """
+        別スレッドで子プロセスの終了を待つ
+        実時間は終了した時点で測るので、出力の比較にかかった時間は含まれない
+
+        Args:
+            proc (Process): 子プロセス
+            start (float): 起動した時刻 (time.perf_counter)
+
+        Returns:
+            Future[tuple[int, float, int, float]]: リターンコード, CPU時間, 最大RSS, 実時間
+        """
+        exited: Future[tuple[int, float, int, float]] = Future()
+
+        def wait() -> None:
+            try:
+                return_code, cpu_time, memory = proc.wait()
+                exited.set_result(
+                    (return_code, cpu_time, memory, time.perf_counter() - start)
+                )
+            except BaseException as e:  # noqa: BLE001 (待っている側で送出し直す)
+                exited.set_exception(e)
+
+        threading.Thread(target=wait, daemon=True).start()
+        return exited
+
     def check(self, output_testcase: str, answer: str) -> bool:
         """
         Args:
@@ -86,45 +239,124 @@ class JudgeRunner:
         Returns:
             bool: 正解かどうか (True: 正解, False: 不正解)
         """
-        return output_testcase == answer
+        return (
+            self.checker.compare([output_testcase.encode()], [answer.encode()]) is None
+        )
 
     def __call__(
         self,
         input_testcase_file: Path,
         output_testcase_file: Path,
-        timelimit: int = 2,
+        timelimit: float = 2,
+        memory_limit: int | None = 1024,
+        kill_margin: float = 0.5,
+        output_limit: int | None = 64 * 1024 * 1024,
+        address_limit: int | None = None,
     ) -> tuple[JudgeResult, dict[str, Any]]:
         """
         Args:
             input_testcase_file (Path): 入力ファイル
             output_testcase_file (Path): テストケース
-            timelimit (int, optional): タイムアウト秒数. Defaults to 2.
+            timelimit (float, optional): 実行時間制限 [sec]. Defaults to 2.
+            memory_limit (int | None, optional): メモリ制限 [MB] (最大RSSと比べる). Defaults to 1024. Noneの場合は無制限
+            kill_margin (float, optional): 実行時間制限を何秒超えたらkillするか. Defaults to 0.5.
+            output_limit (int | None, optional): 出力サイズの上限 [byte]. Defaults to 64 MiB. Noneの場合は無制限
+            address_limit (int | None, optional): アドレス空間の上限 [MB] (RLIMIT_AS). JVMやGoなどは使わなくても大きく予約するので、指定する場合はメモリ制限より十分大きくする. Defaults to None (無制限).
 
         Returns:
             tuple[JudgeResult, dict]: 判定結果, 実行結果
 
         """
-        start = time.perf_counter()
-        answer, return_code, (stdout, stderr) = self.run(input_testcase_file)
-        answer = answer.strip().rstrip()
-        true_output = output_testcase_file.read_text().strip().rstrip()
-        t = time.perf_counter() - start
-        logger.debug("Time: %f", t)
+        result = self.run(
+            input_testcase_file,
+            output_testcase_file,
+            timeout=timelimit + kill_margin,
+            address_limit=address_limit,
+            output_limit=output_limit,
+        )
+        t = result.time
+        logger.debug(
+            "Time: %f, CPU Time: %f, Memory: %d", t, result.cpu_time, result.memory
+        )
 
         code = JudgeResult.IE
         # 簡易的な判定
-        if return_code != 0:
+        if result.timed_out:
+            code = JudgeResult.TLE
+        elif memory_limit is not None and (
+            result.memory > memory_limit * 1024
+            or (
+                result.return_code != 0
+                and any(marker in result.stderr for marker in MEMORY_ERROR_MARKERS)
+            )
+        ):
+            code = JudgeResult.MLE
+        elif result.output_exceeded:
+            code = JudgeResult.OLE
+        elif result.aborted:
+            code = (
+                JudgeResult.WA
+            )  # 不一致の時点でkillしているので、リターンコードは見ない
+        elif result.return_code != 0:
             code = JudgeResult.RE
         elif t > timelimit:
             code = JudgeResult.TLE
-        elif not self.check(true_output, answer):
+        elif result.mismatch is not None:
             code = JudgeResult.WA
         else:
             code = JudgeResult.AC
         return code, {
             "time": t,
-            "return_code": return_code,
-            "answer": answer,
-            "stdout": stdout,
-            "stderr": stderr,
+            "cpu_time": result.cpu_time,
+            "memory": result.memory,
+            "return_code": result.return_code,
+            "answer": result.stdout.strip(),
+            "stdout": result.stdout,
+            "stderr": result.stderr,
+            "output_size": result.output_size,
+            "mismatch": result.mismatch,
         }
+
+
+class _OutputFollower:
+    """
+    子プロセスが一時ファイルに書き込んでいる標準出力を、追いかけながらチャンク単位で読み込むイテレータ
+    子プロセスが終了したら、残りはmmapした領域から読む
+    """
+
+    POLL_INTERVAL = 0.005
+    """
+    書き込みに追いついたときに待つ時間 [sec]
+    """
+
+    def __init__(self, stream: IO[bytes], exited: Future[Any]) -> None:
+        self.fd = stream.fileno()
+        self.exited = exited
+        self.finished = False
+
+    def __iter__(self) -> Iterator[bytes]:
+        pos = 0
+        while not self.exited.done():
+            chunk = os.pread(self.fd, CHUNK_SIZE, pos)
+            if not chunk:
+                wait([self.exited], timeout=self.POLL_INTERVAL)
+                continue
+            pos += len(chunk)
+            yield chunk
+        size = os.fstat(self.fd).st_size
+        if pos < size:
+            with mmap.mmap(self.fd, 0, access=mmap.ACCESS_READ) as mapped:
+                for i in range(pos, size, CHUNK_SIZE):
+                    yield mapped[i : i + CHUNK_SIZE]
+        self.finished = True
+
+
+def _iter_mapped(stack: ExitStack, f: IO[bytes]) -> Iterator[bytes]:
+    """
+    ファイルをmmapしてチャンク単位で返す (mmapはstackを閉じるときに解放する)
+    """
+    size = os.fstat(f.fileno()).st_size
+    if size == 0:
+        return iter(())  # 空のファイルはmmapできない
+    mapped = stack.enter_context(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+    return (mapped[i : i + CHUNK_SIZE] for i in range(0, size, CHUNK_SIZE))
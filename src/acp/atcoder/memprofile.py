@@ -0,0 +1,180 @@
+import json
+import re
+import tempfile
+from logging import getLogger
+from pathlib import Path
+from typing import NamedTuple
+
+from acp.atcoder.judge import JudgeRunner
+
+logger = getLogger(__name__)
+
+
+__all__ = ["MemoryLine", "MemoryProfile", "MemoryProfiler"]
+
+
+class MemoryLine(NamedTuple):
+    """
+    メモリを確保していたソースコードの行
+    """
+
+    filename: str
+    lineno: int
+    size: int  # 確保したまま解放されていないメモリ [byte]
+    blocks: int  # 確保したまま解放されていないブロック数
+
+
+class MemoryProfile(NamedTuple):
+    """
+    tracemallocで計測したメモリの使用状況
+    """
+
+    peak: int  # Pythonが確保したメモリの最大値 [byte]
+    top: list[MemoryLine]  # 終了時点でメモリを多く確保していた行 (集計できなければ空)
+
+
+# 解答の前にtracemallocを開始し、終了時に結果をファイルに書き出すブートストラップ
+# `python -c <bootstrap> <結果のファイル> <行数> <アドレス空間の上限> main.py ...` として実行する
+_BOOTSTRAP = """
+import json, os, resource, sys, tracemalloc, types
+report, top, limit, sys.argv = sys.argv[1], int(sys.argv[2]), int(sys.argv[3]), sys.argv[4:]
+# MemoryErrorの後は小さなオブジェクトも作れないので、上限を緩めるための準備を先にしておく
+relaxed = (2 * limit, resource.RLIM_INFINITY)
+reserve = bytearray(1 << 20)
+if limit > 0:
+    resource.setrlimit(resource.RLIMIT_AS, (limit, resource.RLIM_INFINITY))
+if sys.argv[0] == "-m":
+    import runpy
+    sys.argv = sys.argv[1:]
+    run = lambda: runpy.run_module(sys.argv[0], run_name="__main__", alter_sys=True)
+else:
+    # python main.py と同じ状態にしてから実行する (コンパイルは計測しない)
+    sys.path[0] = os.path.dirname(os.path.abspath(sys.argv[0]))
+    with open(sys.argv[0], "rb") as f:
+        code = compile(f.read(), sys.argv[0], "exec")
+    main = types.ModuleType("__main__")
+    main.__file__ = sys.argv[0]
+    sys.modules["__main__"] = main
+    run = lambda: exec(code, main.__dict__)
+tracemalloc.start()
+try:
+    run()
+finally:
+    del reserve
+    if limit > 0:
+        # MemoryErrorで終了する場合も集計できるように、上限を緩める
+        resource.setrlimit(resource.RLIMIT_AS, relaxed)
+    _, peak = tracemalloc.get_traced_memory()
+    try:
+        snapshot = tracemalloc.take_snapshot()
+    except MemoryError:
+        snapshot = None  # 小さいオブジェクトが多すぎて集計できない
+    tracemalloc.stop()  # 以降の確保は記録しない (記録のためのメモリも解放される)
+    stats = [] if snapshot is None else snapshot.filter_traces([
+        tracemalloc.Filter(False, "<frozen *>"),
+        tracemalloc.Filter(False, "<string>"),
+        tracemalloc.Filter(False, tracemalloc.__file__),
+    ]).statistics("lineno")[:top]
+    with open(report, "w") as f:
+        json.dump({"peak": peak, "top": [
+            [s.traceback[0].filename, s.traceback[0].lineno, s.size, s.count]
+            for s in stats
+        ]}, f)
+"""
+
+
+class MemoryProfiler:
+    """
+    Pythonの解答にtracemallocを仕込んで実行し、メモリを確保している行を調べるクラス
+
+    tracemallocはブロックごとに記録を持つので、実行時間とメモリ使用量は普段より大きくなる
+    判定には使わず、判定とは別にもう一度実行して調べる
+    """
+
+    OVERHEAD = 4
+    """
+    tracemallocの記録の分、アドレス空間の上限の何倍まで使わせるか
+    """
+
+    def __init__(self, command: list[str], top: int = 5) -> None:
+        """
+        Args:
+            command (list[str]): 解答の実行コマンド (`python main.py` または `python -m module`)
+            top (int, optional): 報告する行の数. Defaults to 5.
+
+        Examples:
+            >>> profiler = MemoryProfiler(["python3", "main.py"])
+            >>> report = profiler.profile(Path("abc300/a/in/sample-0.in"), Path("abc300/a"))
+        """
+        self.command = command
+        self.top = top
+
+    @staticmethod
+    def supported(command: list[str]) -> bool:
+        """
+        tracemallocを仕込めるコマンド (CPythonでスクリプトかモジュールを実行する) か
+        """
+        return (
+            re.fullmatch(r"python[\d.]*", Path(command[0]).name) is not None
+            and len(command) >= 2
+            and (not command[1].startswith("-") or command[1] == "-m")
+        )
+
+    def wrap(self, report_file: Path, address_limit: int | None = None) -> list[str]:
+        """
+        tracemallocを仕込んだ実行コマンド
+
+        Args:
+            report_file (Path): 終了時に結果を書き出すファイル
+            address_limit (int | None, optional): アドレス空間の上限 [MB]. Defaults to None (無制限).
+
+        Returns:
+            list[str]: 実行コマンド
+        """
+        limit = 0 if address_limit is None else address_limit * self.OVERHEAD << 20
+        return [
+            self.command[0],
+            "-c",
+            _BOOTSTRAP,
+            str(report_file),
+            str(self.top),
+            str(limit),
+            *self.command[1:],
+        ]
+
+    def profile(
+        self,
+        input_testcase_file: Path,
+        cd: Path,
+        timeout: float = 60,
+        address_limit: int | None = None,
+    ) -> MemoryProfile | None:
+        """
+        tracemallocを仕込んで実行する (出力は判定しない)
+
+        Args:
+            input_testcase_file (Path): 入力ファイル
+            cd (Path): 実行ディレクトリ
+            timeout (float, optional): この秒数を超えたらkillする. Defaults to 60.
+            address_limit (int | None, optional): アドレス空間の上限 [MB]. Defaults to None (無制限).
+
+        Returns:
+            MemoryProfile | None: メモリの使用状況 (killされた場合はNone)
+        """
+        with tempfile.TemporaryDirectory() as tmp:
+            report_file = Path(tmp) / "memprofile.json"
+            JudgeRunner(self.wrap(report_file, address_limit), cd).run(
+                input_testcase_file, timeout=timeout
+            )
+            return self.read(report_file)
+
+    @staticmethod
+    def read(report_file: Path) -> MemoryProfile | None:
+        """
+        書き出された結果を読む (killされたなどで結果がなければNone)
+        """
+        try:
+            data = json.loads(report_file.read_text())
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        return MemoryProfile(data["peak"], [MemoryLine(*line) for line in data["top"]])
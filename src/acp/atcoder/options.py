@@ -0,0 +1,109 @@
+from dataclasses import dataclass
+from logging import getLogger
+from pathlib import Path
+from typing import Any
+
+from acp.atcoder.report import REPORT_FORMATS
+
+logger = getLogger(__name__)
+
+
+__all__ = ["BenchOptions", "JudgeLimits", "ProfileOptions", "ReportOptions"]
+
+
+@dataclass(frozen=True)
+class JudgeLimits:
+    """
+    テストケースを実行するときの制限
+
+    Attributes:
+        timelimit (float): 実行時間制限 [sec]. Defaults to 2.
+        memory_limit (int | None): メモリ制限 [MB] (最大RSSと比べる). Defaults to 1024.
+        output_limit (int | None): 出力サイズの上限 [MB]. Defaults to 64.
+        address_limit (int | None): アドレス空間の上限 [MB] (RLIMIT_AS). MLEの判定には使わない. Defaults to None (無制限).
+    """
+
+    timelimit: float = 2
+    memory_limit: int | None = 1024
+    output_limit: int | None = 64
+    address_limit: int | None = None
+
+    def runner_kwargs(self) -> dict[str, Any]:
+        """
+        JudgeRunnerに渡す引数 (出力サイズの上限はバイトに直す)
+
+        Returns:
+            dict[str, Any]: timelimit, memory_limit, output_limit, address_limit
+        """
+        return {
+            "timelimit": self.timelimit,
+            "memory_limit": self.memory_limit,
+            "output_limit": (
+                None if self.output_limit is None else self.output_limit * 1024 * 1024
+            ),
+            "address_limit": self.address_limit,
+        }
+
+
+@dataclass(frozen=True)
+class BenchOptions:
+    """
+    各テストケースを繰り返し実行して時間の統計をとるときの設定
+
+    Attributes:
+        repeat (int): 計測する回数 (1以上)
+        warmup (int): 計測前に捨てる実行の回数 (0以上). Defaults to 0.
+        margin (float): 実行時間の中央値が制限の (1 - margin) 倍以上なら警告する. Defaults to 0.1.
+
+    Raises:
+        ValueError: repeatが1未満かwarmupが負の場合
+    """
+
+    repeat: int
+    warmup: int = 0
+    margin: float = 0.1
+
+    def __post_init__(self) -> None:
+        if self.repeat < 1:
+            raise ValueError(f"repeat must be at least 1: {self.repeat}")
+        if self.warmup < 0:
+            raise ValueError(f"warmup must not be negative: {self.warmup}")
+
+
+@dataclass(frozen=True)
+class ProfileOptions:
+    """
+    判定とは別にプロファイラの下で実行するときの設定
+
+    Attributes:
+        case (int | str | None): 時間のかかった関数を表示するテストケース ("slowest"なら最も遅いもの). Defaults to None (表示しない).
+        top (int): 表示する関数の数. Defaults to 10.
+        memory (bool): Pythonの解答をtracemallocを仕込んで実行し、メモリを多く確保している行を表示する. Defaults to False.
+    """
+
+    case: int | str | None = None
+    top: int = 10
+    memory: bool = False
+
+
+@dataclass(frozen=True)
+class ReportOptions:
+    """
+    判定結果をファイルに書き出すときの設定
+
+    Attributes:
+        format (str): 書き出す形式 ("json": JSON Lines, "junit": JUnit XML)
+        file (Path): 書き出すファイル
+
+    Raises:
+        ValueError: 形式がREPORT_FORMATSにない場合
+    """
+
+    format: str
+    file: Path
+
+    def __post_init__(self) -> None:
+        if self.format not in REPORT_FORMATS:
+            raise ValueError(
+                f"Unknown report format: {self.format} (choose from {', '.join(REPORT_FORMATS)})"
+            )
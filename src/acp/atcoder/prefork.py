@@ -0,0 +1,251 @@
+import json
+import queue
+import socket
+import subprocess
+import threading
+import time
+from logging import getLogger
+from pathlib import Path
+from typing import IO, Any
+
+from typing_extensions import Self
+
+from acp.atcoder.process import Process, max_rss_kb
+
+logger = getLogger(__name__)
+
+
+__all__ = ["PreforkError", "PreforkProcess", "PreforkServer"]
+
+WORKER_SCRIPT = Path(__file__).with_name("worker.py")
+
+
+class PreforkError(Exception):
+    pass
+
+
+class _Worker:
+    """
+    常駐しているPythonインタプリタ1つ (worker.py)
+    """
+
+    def __init__(self, interpreter: str, cd: Path, preload: list[str]) -> None:
+        start = time.perf_counter()
+        self.sock, child = socket.socketpair()
+        self.popen = subprocess.Popen(
+            [interpreter, str(WORKER_SCRIPT), str(child.fileno()), *preload],
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+            cwd=cd,
+            pass_fds=[child.fileno()],
+        )
+        child.close()
+        self.reader = self.sock.makefile("rb")
+        ready = self.receive()
+        if not ready:
+            assert self.popen.stderr
+            msg = f"Failed to start the worker: {self.popen.stderr.read().decode(errors='replace')}"
+            self.close()
+            raise PreforkError(msg)
+        self.import_time: float = ready["import_time"]
+        self.startup = time.perf_counter() - start  # インタプリタの起動 + import
+
+    def receive(self) -> Any:
+        """
+        workerから1行分のメッセージを受け取る
+        (workerが終了していたり、途中で切れていたりしたらNone)
+        """
+        try:
+            line = self.reader.readline()
+            return json.loads(line) if line.endswith(b"\n") else None
+        except (OSError, ValueError):
+            return None
+
+    def close(self) -> None:
+        self.reader.close()
+        self.sock.close()  # workerはEOFを受け取って終了する
+        try:
+            self.popen.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            self.popen.kill()
+            self.popen.wait()
+        if self.popen.stderr:
+            self.popen.stderr.close()
+
+
+class PreforkProcess(Process):
+    """
+    常駐しているワーカーからforkして実行したプログラム
+    """
+
+    RESULT_KEYS = frozenset(("return_code", "cpu_time", "max_rss"))
+    """
+    終了したときにワーカーから受け取る結果のキー
+    """
+
+    def __init__(
+        self,
+        server: "PreforkServer",
+        worker: _Worker,
+        stdin: IO[Any],
+        stdout: IO[Any],
+        stderr: IO[Any],
+        address_limit: int | None = None,
+        output_limit: int | None = None,
+    ) -> None:
+        self.server = server
+        self.worker = worker
+        request = {
+            "argv": server.argv,
+            "cwd": str(server.cd),
+            "address_limit": address_limit,
+            "output_limit": output_limit,
+        }
+        # ファイルディスクリプタをそのまま渡すので、入出力はacpを経由しない
+        try:
+            socket.send_fds(
+                worker.sock,
+                [json.dumps(request).encode()],
+                [stdin.fileno(), stdout.fileno(), stderr.fileno()],
+            )
+        except OSError:
+            started = None
+        else:
+            started = worker.receive()
+        if not isinstance(started, dict) or "pid" not in started:
+            server.discard(worker)
+            msg = f"The prefork worker (pid {worker.popen.pid}) exited before starting the program"
+            raise PreforkError(msg)
+        self.pid = started["pid"]
+
+    def wait(self) -> tuple[int, float, int]:
+        result = self.worker.receive()
+        if not isinstance(result, dict) or not self.RESULT_KEYS <= result.keys():
+            # workerが落ちたので終了状態はわからない (残っているかもしれないプログラムはkillする)
+            logger.error(
+                "The prefork worker (pid %d) crashed while running the program",
+                self.worker.popen.pid,
+            )
+            self.kill()
+            self.server.discard(self.worker)
+            return 1, 0.0, 0
+        self.server.release(self.worker)
+        return result["return_code"], result["cpu_time"], max_rss_kb(result["max_rss"])
+
+
+class PreforkServer:
+    """
+    重いモジュールをimportしたPythonインタプリタを常駐させておき、
+    テストケースごとにそこからforkして解答を実行する
+
+    インタプリタの起動とimportにかかる時間 (startup) は各テストケースの実行時間に含まれない
+    """
+
+    def __init__(
+        self, command: list[str], cd: Path, preload: list[str] | None = None
+    ) -> None:
+        """
+        Args:
+            command (list[str]): 実行コマンド (python <script> [args ...] の形式)
+            cd (Path): 実行ディレクトリ
+            preload (list[str] | None, optional): 事前にimportしておくモジュール. Defaults to None.
+
+        Examples:
+            >>> with PreforkServer(["python", "main.py"], Path("."), ["numpy"]) as server:
+            ...     runner = JudgeRunner(["python", "main.py"], prefork=server)
+        """
+        if len(command) < 2 or command[1].startswith("-"):
+            msg = f"Prefork mode requires a command like 'python <script>', got {' '.join(command)!r}"
+            raise PreforkError(msg)
+        self.interpreter = command[0]
+        self.argv = command[1:]
+        self.cd = cd
+        self.preload = preload or []
+        self.startup: float | None = None
+        """
+        最初のワーカーの起動 (インタプリタの起動 + import) にかかった時間 [sec]
+        """
+        self.import_time: float | None = None
+        self._idle: queue.SimpleQueue[_Worker] = queue.SimpleQueue()
+        self._workers: list[_Worker] = []
+        self._lock = threading.Lock()
+
+    def prepare(self, n: int = 1) -> None:
+        """
+        ワーカーをn個まで起動しておく (並列実行する数だけ起動しておけば、テスト中に起動を待たない)
+
+        Args:
+            n (int, optional): ワーカーの数. Defaults to 1.
+        """
+        while len(self._workers) < n:
+            self.release(self._spawn())
+
+    def start(
+        self,
+        stdin: IO[Any],
+        stdout: IO[Any],
+        stderr: IO[Any],
+        address_limit: int | None = None,
+        output_limit: int | None = None,
+    ) -> PreforkProcess:
+        """
+        空いているワーカーからforkしてプログラムを実行する (空いていなければワーカーを増やす)
+
+        Args:
+            stdin (IO[Any]): 標準入力にするファイル
+            stdout (IO[Any]): 標準出力にするファイル
+            stderr (IO[Any]): 標準エラー出力にするファイル
+            address_limit (int | None, optional): アドレス空間の上限 [MB]. Defaults to None (無制限).
+            output_limit (int | None, optional): 出力サイズの上限 [byte]. Defaults to None (無制限).
+
+        Returns:
+            PreforkProcess: 実行中のプログラム
+        """
+        try:
+            worker = self._idle.get_nowait()
+        except queue.Empty:
+            worker = self._spawn()
+        try:
+            return PreforkProcess(
+                self, worker, stdin, stdout, stderr, address_limit, output_limit
+            )
+        except PreforkError:
+            # 空いていたワーカーが落ちていたら、新しく起動したワーカーでやり直す
+            logger.warning("Restarting a crashed prefork worker")
+            return PreforkProcess(
+                self, self._spawn(), stdin, stdout, stderr, address_limit, output_limit
+            )
+
+    def _spawn(self) -> _Worker:
+        worker = _Worker(self.interpreter, self.cd, self.preload)
+        with self._lock:
+            self._workers.append(worker)
+            if self.startup is None:
+                self.startup = worker.startup
+                self.import_time = worker.import_time
+        return worker
+
+    def release(self, worker: _Worker) -> None:
+        self._idle.put(worker)
+
+    def discard(self, worker: _Worker) -> None:
+        """
+        落ちたワーカーを閉じて、以降は使わない
+        """
+        with self._lock:
+            if worker in self._workers:
+                self._workers.remove(worker)
+        worker.close()
+
+    def close(self) -> None:
+        with self._lock:
+            for worker in self._workers:
+                worker.close()
+            self._workers.clear()
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        self.close()
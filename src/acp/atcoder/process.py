@@ -0,0 +1,132 @@
+import os
+import resource
+import signal
+import subprocess
+import sys
+from abc import ABC, abstractmethod
+from collections.abc import Callable
+from logging import getLogger
+from pathlib import Path
+from typing import IO, Any
+
+logger = getLogger(__name__)
+
+
+__all__ = ["PopenProcess", "Process", "max_rss_kb", "set_limits"]
+
+
+class Process(ABC):
+    """
+    実行中のプログラム
+    標準入出力はファイルに直接つながっていて、子孫プロセスごとkillできるように別セッションで起動されている
+    """
+
+    pid: int
+
+    def kill(self) -> None:
+        """
+        プロセスとその子孫をまとめてkillする
+        """
+        try:
+            os.killpg(self.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass  # 既に終了している
+
+    def interrupt(self) -> None:
+        """
+        プロセスとその子孫にSIGINTを送る (Ctrl-Cと同じ)
+        """
+        try:
+            os.killpg(self.pid, signal.SIGINT)
+        except ProcessLookupError:
+            pass  # 既に終了している
+
+    @abstractmethod
+    def wait(self) -> tuple[int, float, int]:
+        """
+        プロセスの終了を待つ
+
+        Returns:
+            tuple[int, float, int]: リターンコード, CPU時間 [sec], 最大RSS [KB]
+        """
+
+
+class PopenProcess(Process):
+    """
+    subprocess.Popenで起動したプログラム
+    """
+
+    def __init__(
+        self,
+        command: list[str],
+        cd: Path,
+        stdin: int | IO[Any],
+        stdout: int | IO[Any],
+        stderr: int | IO[Any],
+        address_limit: int | None = None,
+        output_limit: int | None = None,
+    ) -> None:
+        """
+        Args:
+            command (list[str]): 実行コマンド
+            cd (Path): 実行ディレクトリ
+            stdin (int | IO[Any]): 標準入力にするファイル (またはファイルディスクリプタ)
+            stdout (int | IO[Any]): 標準出力にするファイル (またはファイルディスクリプタ)
+            stderr (int | IO[Any]): 標準エラー出力にするファイル (またはファイルディスクリプタ)
+            address_limit (int | None, optional): アドレス空間の上限 [MB]. Defaults to None (無制限).
+            output_limit (int | None, optional): 書き込めるファイルサイズの上限 [byte]. Defaults to None (無制限).
+        """
+        self.popen = subprocess.Popen(
+            command,
+            stdin=stdin,
+            stdout=stdout,
+            stderr=stderr,
+            cwd=cd,
+            start_new_session=True,  # 子孫プロセスごとkillできるようにする
+            # setrlimitを呼ぶだけでロックをとらないので、スレッドから起動しても安全
+            preexec_fn=_set_limits(address_limit, output_limit),  # noqa: PLW1509
+        )
+        self.pid = self.popen.pid
+
+    def wait(self) -> tuple[int, float, int]:
+        # Popen.wait()は子プロセスを回収してしまうので、wait4でrusageごと回収する
+        _, status, rusage = os.wait4(self.pid, 0)
+        self.popen.returncode = os.waitstatus_to_exitcode(status)
+        return (
+            self.popen.returncode,
+            rusage.ru_utime + rusage.ru_stime,
+            max_rss_kb(rusage.ru_maxrss),
+        )
+
+
+def max_rss_kb(ru_maxrss: int) -> int:
+    """
+    ru_maxrssをKB単位にする (LinuxではKB, macOSではbyte単位)
+    """
+    return ru_maxrss // 1024 if sys.platform == "darwin" else ru_maxrss
+
+
+def set_limits(address_limit: int | None, output_limit: int | None) -> None:
+    """
+    現在のプロセスにアドレス空間と出力サイズの上限を設定する (fork後の子プロセスで呼ぶ)
+
+    Args:
+        address_limit (int | None): アドレス空間の上限 [MB]
+        output_limit (int | None): 出力サイズの上限 [byte]. 1byteでも超えたら書き込みに失敗するように+1する
+    """
+    if address_limit is not None:
+        limit = address_limit * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    if output_limit is not None:
+        resource.setrlimit(resource.RLIMIT_FSIZE, (output_limit + 1, output_limit + 1))
+
+
+def _set_limits(
+    address_limit: int | None, output_limit: int | None
+) -> Callable[[], None] | None:
+    """
+    set_limitsを呼ぶ関数を返す (preexec_fn用)
+    """
+    if address_limit is None and output_limit is None:
+        return None
+    return lambda: set_limits(address_limit, output_limit)
@@ -0,0 +1,212 @@
+import os
+import pstats
+import re
+import shutil
+import subprocess
+import tempfile
+import threading
+from contextlib import ExitStack
+from logging import getLogger
+from pathlib import Path
+from typing import NamedTuple
+
+from acp.atcoder.process import PopenProcess
+
+logger = getLogger(__name__)
+
+
+__all__ = ["HotFunction", "ProfileResult", "Profiler"]
+
+
+class HotFunction(NamedTuple):
+    """
+    プロファイルで時間のかかっていた関数
+    """
+
+    name: str  # 関数 (cProfile: ファイル:行番号(関数名), perf: シンボル)
+    share: float  # 全体の実行時間に占める割合 (その関数自身の時間のみ) [0, 1]
+    self_time: float | None = None  # その関数自身の時間 [sec] (perfではNone)
+    calls: int | None = None  # 呼び出し回数 (perfではNone)
+
+
+class ProfileResult(NamedTuple):
+    """
+    プロファイルの結果
+    """
+
+    tool: str  # "cProfile" または "perf"
+    profile_file: Path  # 生のプロファイル (cProfile: pstats形式, perf: perf.data)
+    hot: list[HotFunction]  # 時間のかかっていた順
+    return_code: int
+    timed_out: bool  # 時間切れで中断したか (中断までのプロファイルは残る)
+
+
+class Profiler:
+    """
+    解答をプロファイラの下で実行するクラス
+    Pythonの解答はcProfile、それ以外はperf (インストールされている場合) で計測する
+    """
+
+    class Exceptions:
+        class UnsupportedCommandError(Exception):
+            pass
+
+        class ProfilerError(Exception):
+            pass
+
+    INTERRUPT_GRACE = 5.0
+    """
+    時間切れで中断 (SIGINT) してから、プロファイルの書き出しを待つ時間 [sec]
+    """
+
+    def __init__(self, command: list[str], cd: Path, top: int = 10) -> None:
+        """
+        Args:
+            command (list[str]): 解答の実行コマンド
+            cd (Path): 実行ディレクトリ
+            top (int, optional): 表示する関数の数. Defaults to 10.
+
+        Examples:
+            >>> profiler = Profiler(["python3", "main.py"], Path("abc300/a"))
+            >>> result = profiler.profile(Path("abc300/a/in/sample-0.in"), Path("abc300/a/sample-0"))
+        """
+        self.command = command
+        self.cd = cd
+        self.top = top
+
+    @property
+    def tool(self) -> str | None:
+        """
+        使うプロファイラ (使えるものがなければNone)
+        """
+        if re.fullmatch(r"(python|pypy)[\d.]*", Path(self.command[0]).name):
+            return "cProfile"
+        if shutil.which("perf") is not None:
+            return "perf"
+        return None
+
+    def profile(
+        self,
+        input_testcase_file: Path,
+        stem: Path,
+        timeout: float = 60,
+        address_limit: int | None = None,
+    ) -> ProfileResult:
+        """
+        入力を与えてプロファイラの下で実行する
+
+        Args:
+            input_testcase_file (Path): 入力ファイル
+            stem (Path): プロファイルの保存先 (拡張子は .prof または .perf.data が付く)
+            timeout (float, optional): この秒数を超えたら中断し、それまでのプロファイルを使う. Defaults to 60.
+            address_limit (int | None, optional): アドレス空間の上限 [MB]. Defaults to None (無制限).
+
+        Returns:
+            ProfileResult: プロファイルの結果
+
+        Raises:
+            Profiler.Exceptions.UnsupportedCommandError: 使えるプロファイラがない
+            Profiler.Exceptions.ProfilerError: プロファイルを書き出せなかった
+        """
+        tool = self.tool
+        if tool == "cProfile":
+            profile_file = stem.with_name(f"{stem.name}.prof")
+            command = [self.command[0], "-m", "cProfile", "-o", str(profile_file)]
+            command += self.command[1:]
+        elif tool == "perf":
+            profile_file = stem.with_name(f"{stem.name}.perf.data")
+            command = ["perf", "record", "-q", "-o", str(profile_file), "--"]
+            command += self.command
+        else:
+            raise self.Exceptions.UnsupportedCommandError(
+                f"No profiler for '{self.command[0]}' (install perf to profile native binaries)"
+            )
+        profile_file.unlink(missing_ok=True)
+
+        with ExitStack() as stack:
+            stdin = stack.enter_context(input_testcase_file.open("rb"))
+            stdout = stack.enter_context(open(os.devnull, "wb"))
+            stderr = stack.enter_context(tempfile.TemporaryFile())
+            proc = PopenProcess(
+                command, self.cd, stdin, stdout, stderr, address_limit=address_limit
+            )
+            # 時間切れのときはSIGINTで中断し、プロファイラにそれまでの結果を書き出させる
+            timed_out = threading.Event()
+
+            def interrupt() -> None:
+                timed_out.set()
+                proc.interrupt()
+
+            timers = [
+                threading.Timer(timeout, interrupt),
+                threading.Timer(timeout + self.INTERRUPT_GRACE, proc.kill),
+            ]
+            for timer in timers:
+                timer.start()
+            try:
+                return_code, _, _ = proc.wait()
+            finally:
+                for timer in timers:
+                    timer.cancel()
+            stderr.seek(0)
+            err = stderr.read().decode(errors="replace")
+
+        if not profile_file.exists():
+            raise self.Exceptions.ProfilerError(
+                f"{tool} did not write a profile (return code {return_code}):\n{err}"
+            )
+        hot = (
+            self.summarize_cprofile(profile_file)
+            if tool == "cProfile"
+            else self.summarize_perf(profile_file)
+        )
+        return ProfileResult(tool, profile_file, hot, return_code, timed_out.is_set())
+
+    def summarize_cprofile(self, profile_file: Path) -> list[HotFunction]:
+        """
+        cProfileの結果から、自身の実行時間が長い順に関数を返す
+        """
+        stats = pstats.Stats(str(profile_file))
+        total = stats.total_tt  # type: ignore[attr-defined]
+        entries = sorted(
+            stats.stats.items(),  # type: ignore[attr-defined]
+            key=lambda item: item[1][2],
+            reverse=True,
+        )
+        hot = []
+        for (file, line, func), (_, calls, self_time, _, _) in entries[: self.top]:
+            name = func if file == "~" else f"{Path(file).name}:{line}({func})"
+            share = self_time / total if total > 0 else 0.0
+            hot.append(HotFunction(name, share, self_time, calls))
+        return hot
+
+    def summarize_perf(self, profile_file: Path) -> list[HotFunction]:
+        """
+        perfの結果から、サンプル数が多い順にシンボルを返す
+        """
+        report = subprocess.run(
+            [
+                "perf",
+                "report",
+                "-i",
+                str(profile_file),
+                "--stdio",
+                "--no-children",
+                "--sort",
+                "symbol",
+                "-q",
+            ],
+            capture_output=True,
+            text=True,
+            check=False,  # 失敗したらstderrをProfilerErrorにする
+        )
+        if report.returncode != 0:
+            raise self.Exceptions.ProfilerError(report.stderr)
+        hot = []
+        for line in report.stdout.splitlines():
+            # ex: "    42.10%  [.] solve"
+            if m := re.match(r"\s*([\d.]+)%\s+(?:\[.\]\s+)?(.+)", line):
+                hot.append(HotFunction(m.group(2).strip(), float(m.group(1)) / 100))
+            if len(hot) >= self.top:
+                break
+        return hot
@@ -0,0 +1,276 @@
+import json
+import xml.etree.ElementTree as ET
+from logging import getLogger
+from pathlib import Path
+from typing import Any, NamedTuple
+
+from acp.atcoder.judge import JudgeResult
+
+logger = getLogger(__name__)
+
+
+__all__ = ["REPORT_FORMATS", "CaseReport", "JudgeReport", "write_reports"]
+
+REPORT_FORMATS = ("json", "junit")
+"""
+書き出せるレポートの形式 (json: JSON Lines, junit: JUnit XML)
+"""
+
+STDERR_SIZE = 4096
+"""
+レポートに含める標準エラー出力の上限 [文字]
+"""
+
+_FAILURES = (JudgeResult.WA, JudgeResult.TLE, JudgeResult.MLE, JudgeResult.OLE)
+
+
+class CaseReport(NamedTuple):
+    """
+    テストケース1つの判定結果
+    """
+
+    number: int  # テストケースの番号
+    name: str  # テストケースの名前 (ex: sample-0)
+    verdict: JudgeResult
+    time: float  # 実時間 [sec]
+    cpu_time: float  # ユーザー + システムCPU時間 [sec]
+    memory: int  # 最大RSS [KB]
+    return_code: int
+    output_size: int  # 出力のサイズ [byte]
+    expected_size: int | None  # 期待される出力のサイズ [byte] (ないならNone)
+    mismatch: str | None = None  # 最初の不一致箇所 (ex: line 1, column 3)
+    stderr: str = ""  # 標準エラー出力 (インタラクティブな問題はインタラクタの出力)
+    cached: bool = False  # 前回の判定結果を使ったか
+    bench: dict[str, Any] | None = None  # 繰り返し実行したときの統計
+
+    @classmethod
+    def from_meta(
+        cls,
+        number: int,
+        code: JudgeResult,
+        meta: dict[str, Any],
+        output_testcase_file: Path | None = None,
+    ) -> "CaseReport":
+        """
+        JudgeRunnerの実行結果から作る
+
+        Args:
+            number (int): テストケースの番号
+            code (JudgeResult): 判定結果
+            meta (dict[str, Any]): 実行結果
+            output_testcase_file (Path | None, optional): 期待される出力. Defaults to None.
+
+        Returns:
+            CaseReport: 判定結果
+        """
+        bench = meta.get("bench")
+        return cls(
+            number=number,
+            name=f"sample-{number}",
+            verdict=code,
+            time=meta["time"],
+            cpu_time=meta["cpu_time"],
+            memory=meta["memory"],
+            return_code=meta["return_code"],
+            output_size=meta["output_size"],
+            expected_size=(
+                output_testcase_file.stat().st_size
+                if output_testcase_file is not None and output_testcase_file.exists()
+                else None
+            ),
+            mismatch=None if meta.get("mismatch") is None else str(meta["mismatch"]),
+            stderr=(meta.get("interactor_stderr") or meta["stderr"])[:STDERR_SIZE],
+            cached=meta.get("cached", False),
+            bench=None
+            if bench is None
+            else {
+                "repeat": bench["repeat"],
+                "time": bench["time"]._asdict(),
+                "cpu_time": bench["cpu_time"]._asdict(),
+                "near_limit": bench["near_limit"],
+            },
+        )
+
+    def to_dict(self) -> dict[str, Any]:
+        """
+        JSONにできる形にする
+        """
+        return {**self._asdict(), "verdict": self.verdict.value}
+
+
+class JudgeReport(NamedTuple):
+    """
+    AtCoder.testの1回分の判定結果
+    """
+
+    problem: str  # 問題名
+    command: list[str]  # 実行コマンド
+    cases: list[CaseReport]  # 実行順
+    error: str | None = None  # テストできなかった理由 (コンパイルエラーなど)
+    wall_time: float = 0.0  # テスト全体にかかった時間 [sec]
+
+    @property
+    def verdicts(self) -> dict[int, JudgeResult]:
+        """
+        テストケースの番号ごとの判定結果
+        """
+        return {case.number: case.verdict for case in self.cases}
+
+    @property
+    def passed(self) -> bool:
+        """
+        全てのテストケースがACだったか
+        """
+        return (
+            self.error is None
+            and bool(self.cases)
+            and all(case.verdict == JudgeResult.AC for case in self.cases)
+        )
+
+    def summary(self) -> dict[str, Any]:
+        """
+        全体の集計
+        """
+        counts = {code.value: 0 for code in JudgeResult}
+        for case in self.cases:
+            counts[case.verdict.value] += 1
+        return {
+            "problem": self.problem,
+            "command": self.command,
+            "cases": len(self.cases),
+            "passed": self.passed,
+            "verdicts": {k: v for k, v in counts.items() if v},
+            "total_time": sum(case.time for case in self.cases),
+            "total_cpu_time": sum(case.cpu_time for case in self.cases),
+            "max_time": max((case.time for case in self.cases), default=0.0),
+            "max_memory": max((case.memory for case in self.cases), default=0),
+            "wall_time": self.wall_time,
+            "error": self.error,
+        }
+
+    def to_json_lines(self) -> str:
+        """
+        テストケースごとに1行、最後に集計を1行書いたJSON Lines
+        """
+        records = [
+            {"type": "case", "problem": self.problem, **case.to_dict()}
+            for case in self.cases
+        ]
+        records.append({"type": "summary", **self.summary()})
+        return "".join(json.dumps(record) + "\n" for record in records)
+
+    def to_junit(self) -> str:
+        """
+        JUnit XML (WA・TLE・MLE・OLEはfailure, RE・IEとテストできなかった場合はerror)
+        """
+        suite = self.junit_suite()
+        ET.indent(suite)
+        return ET.tostring(suite, encoding="unicode", xml_declaration=True) + "\n"
+
+    def junit_suite(self) -> ET.Element:
+        """
+        JUnit XMLのtestsuite要素
+        """
+        summary = self.summary()
+        suite = ET.Element(
+            "testsuite",
+            name=self.problem,
+            tests=str(len(self.cases) + (self.error is not None)),
+            failures=str(sum(case.verdict in _FAILURES for case in self.cases)),
+            errors=str(
+                sum(
+                    case.verdict not in _FAILURES and case.verdict != JudgeResult.AC
+                    for case in self.cases
+                )
+                + (self.error is not None)
+            ),
+            time=f"{summary['wall_time']:.3f}",
+        )
+        if self.error is not None:
+            testcase = ET.SubElement(
+                suite, "testcase", classname=self.problem, name="setup", time="0"
+            )
+            element = ET.SubElement(
+                testcase, "error", message=self.error.splitlines()[0]
+            )
+            element.text = self.error
+        for case in self.cases:
+            testcase = ET.SubElement(
+                suite,
+                "testcase",
+                classname=self.problem,
+                name=case.name,
+                time=f"{case.time:.3f}",
+            )
+            properties = ET.SubElement(testcase, "properties")
+            for name, value in [
+                ("cpu_time", f"{case.cpu_time:.3f}"),
+                ("memory_kb", case.memory),
+                ("return_code", case.return_code),
+                ("output_size", case.output_size),
+                ("expected_size", case.expected_size),
+                ("cached", case.cached),
+            ]:
+                if value is not None:
+                    ET.SubElement(properties, "property", name=name, value=str(value))
+            if case.verdict == JudgeResult.AC:
+                continue
+            message = case.verdict.value + (
+                f": first mismatch at {case.mismatch}"
+                if case.mismatch is not None
+                else f": return code {case.return_code}"
+                if case.verdict == JudgeResult.RE
+                else ""
+            )
+            element = ET.SubElement(
+                testcase,
+                "failure" if case.verdict in _FAILURES else "error",
+                type=case.verdict.value,
+                message=message,
+            )
+            element.text = case.stderr or None
+        return suite
+
+    def write(self, fmt: str, path: Path) -> None:
+        """
+        レポートをファイルに書き出す
+
+        Args:
+            fmt (str): 形式 ("json" または "junit")
+            path (Path): 書き出すファイル
+
+        Raises:
+            ValueError: 未対応の形式
+        """
+        write_reports([self], fmt, path)
+
+
+def write_reports(reports: list[JudgeReport], fmt: str, path: Path) -> None:
+    """
+    複数の問題のレポートを1つのファイルに書き出す
+
+    Args:
+        reports (list[JudgeReport]): 問題ごとのレポート
+        fmt (str): 形式 ("json": 問題ごとのJSON Linesを連結, "junit": testsuitesにまとめる)
+        path (Path): 書き出すファイル
+
+    Raises:
+        ValueError: 未対応の形式
+    """
+    if fmt == "json":
+        text = "".join(report.to_json_lines() for report in reports)
+    elif fmt == "junit":
+        if len(reports) == 1:
+            text = reports[0].to_junit()
+        else:
+            suites = ET.Element("testsuites")
+            suites.extend(report.junit_suite() for report in reports)
+            ET.indent(suites)
+            text = ET.tostring(suites, encoding="unicode", xml_declaration=True) + "\n"
+    else:
+        raise ValueError(
+            f"Unknown report format: {fmt} (choose from {', '.join(REPORT_FORMATS)})"
+        )
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text)
+    logger.info("Wrote a %s report to %s", fmt, path)
@@ -0,0 +1,104 @@
+import hashlib
+import json
+import os
+import threading
+from logging import getLogger
+from pathlib import Path
+from typing import Any
+
+from acp.atcoder.checker import CHUNK_SIZE, Checker, Mismatch
+from acp.atcoder.judge import JudgeResult
+
+logger = getLogger(__name__)
+
+
+__all__ = ["ResultCache"]
+
+
+def _file_digest(path: Path) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as f:
+        while chunk := f.read(CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """
+    テストケースの判定結果をキャッシュするクラス
+    実行コマンド (とコマンドに含まれるファイルの内容)・入力・期待される出力・制限・判定方法のハッシュをキーにし、
+    どれも変わっていなければ実行せずに前回の判定結果を返す
+
+    解答がimportしている別のファイルの変更は検出しない
+    """
+
+    def __init__(self, cache_dir: Path) -> None:
+        """
+        Args:
+            cache_dir (Path): 判定結果を置くディレクトリ
+        """
+        self.cache_dir = cache_dir
+
+    def key(
+        self,
+        command: list[str],
+        cd: Path,
+        input_testcase_file: Path,
+        output_testcase_file: Path,
+        checker: Checker | None = None,
+        **limits: Any,
+    ) -> str:
+        """
+        キャッシュのキー
+
+        Args:
+            command (list[str]): 実行コマンド
+            cd (Path): 実行ディレクトリ
+            input_testcase_file (Path): 入力ファイル
+            output_testcase_file (Path): 期待される出力
+            checker (Checker | None, optional): 出力の判定方法. Defaults to None.
+            **limits (Any): 実行時間制限などの判定に影響するパラメータ
+
+        Returns:
+            str: キー
+        """
+        files = {arg: _file_digest(cd / arg) for arg in command if (cd / arg).is_file()}
+        key = {
+            "command": command,
+            "files": files,
+            "input": _file_digest(input_testcase_file),
+            "output": _file_digest(output_testcase_file),
+            "checker": None
+            if checker is None
+            else [type(checker).__name__, vars(checker)],
+            "limits": limits,
+        }
+        return hashlib.sha256(json.dumps(key, sort_keys=True).encode()).hexdigest()[:32]
+
+    def get(self, key: str) -> tuple[JudgeResult, dict[str, Any]] | None:
+        """
+        キャッシュされた判定結果を返す (なければNone)
+        """
+        path = self.cache_dir / f"{key}.json"
+        try:
+            data = json.loads(path.read_text())
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        meta = data["meta"]
+        if meta.get("mismatch") is not None:
+            meta["mismatch"] = Mismatch(*meta["mismatch"])
+        meta["cached"] = True
+        return JudgeResult(data["code"]), meta
+
+    def put(self, key: str, code: JudgeResult, meta: dict[str, Any]) -> None:
+        """
+        判定結果をキャッシュする (内部エラーはキャッシュしない)
+        """
+        if code == JudgeResult.IE:
+            return
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        path = self.cache_dir / f"{key}.json"
+        # 並列に書き込んでも壊れないように、一時ファイルに書いてからrenameする
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp.write_text(json.dumps({"code": code.value, "meta": meta}))
+        tmp.replace(path)
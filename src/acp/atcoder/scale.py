@@ -0,0 +1,155 @@
+import hashlib
+import math
+import os
+from collections.abc import Callable
+from logging import getLogger
+from pathlib import Path
+from typing import NamedTuple
+
+from acp.atcoder.judge import JudgeRunner
+
+logger = getLogger(__name__)
+
+
+__all__ = [
+    "COMPLEXITIES",
+    "MIN_SIZES",
+    "ComplexityFit",
+    "InputCache",
+    "fit_complexities",
+]
+
+COMPLEXITIES: dict[str, Callable[[float], float]] = {
+    "O(n)": lambda n: n,
+    "O(n log n)": lambda n: n * math.log2(n),
+    "O(n sqrt n)": lambda n: n * math.sqrt(n),
+    "O(n^2)": lambda n: n * n,
+    "O(n^2 log n)": lambda n: n * n * math.log2(n),
+    "O(n^3)": lambda n: n * n * n,
+}
+"""
+当てはめる計算量の候補
+"""
+
+MIN_SIZES = 3
+"""
+計算量を推定するのに必要なサイズの種類数
+(係数と切片の2つを当てはめるので、2種類ではどの計算量でも誤差0で当てはまってしまう)
+"""
+
+
+class ComplexityFit(NamedTuple):
+    """
+    実行時間を t = intercept + coef * f(n) で当てはめた結果
+    """
+
+    name: str  # 計算量 (ex: O(n log n))
+    coef: float
+    intercept: float  # インタプリタの起動などの定数時間 [sec]
+    error: float  # 相対誤差の二乗平均平方根
+
+    def predict(self, n: int) -> float:
+        """
+        サイズnのときの実行時間を外挿する [sec]
+        """
+        return self.intercept + self.coef * COMPLEXITIES[self.name](n)
+
+
+def fit_complexities(samples: list[tuple[int, float]]) -> list[ComplexityFit]:
+    """
+    (サイズ, 実行時間) の組に各計算量を最小二乗法で当てはめる
+
+    Args:
+        samples (list[tuple[int, float]]): (サイズ, 実行時間 [sec]) の組 (サイズは1以上でMIN_SIZES種類以上)
+
+    Returns:
+        list[ComplexityFit]: 当てはまりが良い順の結果
+
+    Raises:
+        ValueError: サイズが1未満か、種類が足りない場合
+    """
+    if any(n < 1 for n, _ in samples):
+        msg = f"Sizes must be at least 1: {sorted(n for n, _ in samples)}"
+        raise ValueError(msg)
+    if len({n for n, _ in samples}) < MIN_SIZES:
+        msg = f"At least {MIN_SIZES} different sizes are needed to estimate the complexity"
+        raise ValueError(msg)
+    fits = []
+    for name, f in COMPLEXITIES.items():
+        xs = [f(n) for n, _ in samples]
+        ts = [t for _, t in samples]
+        x_mean, t_mean = sum(xs) / len(xs), sum(ts) / len(ts)
+        var = sum((x - x_mean) ** 2 for x in xs)
+        coef = sum((x - x_mean) * (t - t_mean) for x, t in zip(xs, ts)) / var
+        intercept = t_mean - coef * x_mean
+        if coef <= 0 or intercept < 0:
+            # 負の係数・切片は物理的にありえないので、原点を通る直線で当てはめ直す
+            coef = max(sum(x * t for x, t in zip(xs, ts)) / sum(x * x for x in xs), 0)
+            intercept = 0.0
+        error = math.sqrt(
+            sum(((intercept + coef * x - t) / t) ** 2 for x, t in zip(xs, ts)) / len(xs)
+        )
+        fits.append(ComplexityFit(name, coef, intercept, error))
+    return sorted(fits, key=lambda fit: fit.error)
+
+
+class InputCache:
+    """
+    生成器で作った大きな入力をディスクにキャッシュするクラス
+    生成器 (コマンドと、コマンドに含まれるファイルの内容) のハッシュ・サイズ・シードをキーにする
+    """
+
+    class Exceptions:
+        class GeneratorError(Exception):
+            pass
+
+    def __init__(self, cache_dir: Path) -> None:
+        """
+        Args:
+            cache_dir (Path): 入力を置くディレクトリ
+        """
+        self.cache_dir = cache_dir
+
+    def key(self, generator: list[str], cd: Path) -> str:
+        """
+        生成器のハッシュ (生成器のスクリプトを書き換えたらキャッシュを使わない)
+        """
+        digest = hashlib.sha256("\0".join(generator).encode())
+        for arg in generator:
+            if (cd / arg).is_file():
+                digest.update(b"\0" + (cd / arg).read_bytes())
+        return digest.hexdigest()[:32]
+
+    def get(
+        self, generator: list[str], cd: Path, size: int, seed: int = 0
+    ) -> tuple[Path, bool]:
+        """
+        サイズsizeの入力を返す (キャッシュになければ `<generator> <size> <seed>` で生成する)
+
+        Args:
+            generator (list[str]): 生成器の実行コマンド
+            cd (Path): 実行ディレクトリ
+            size (int): サイズ
+            seed (int, optional): シード. Defaults to 0.
+
+        Returns:
+            tuple[Path, bool]: 入力ファイル, キャッシュを使ったか
+
+        Raises:
+            InputCache.Exceptions.GeneratorError: 生成器が異常終了した
+        """
+        path = self.cache_dir / f"{self.key(generator, cd)}-{size}-{seed}.in"
+        if path.exists():
+            return path, True
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        result = JudgeRunner([*generator, str(size), str(seed)], cd).run(
+            os.devnull, stdout_file=tmp
+        )
+        if result.return_code != 0:
+            tmp.unlink(missing_ok=True)
+            raise self.Exceptions.GeneratorError(
+                f"Generator failed (size={size}, return code {result.return_code}):\n{result.stderr}"
+            )
+        tmp.replace(path)
+        return path, False
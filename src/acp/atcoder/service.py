@@ -1,23 +1,52 @@
+import hashlib
+import os
 import re
+import shutil
 import subprocess
+import sys
+import tempfile
+import threading
+import time
 import weakref
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import nullcontext
 from logging import getLogger
 from pathlib import Path
 from typing import Any
+from urllib.parse import unquote
 
 import bs4
-from bs4 import BeautifulSoup
+import requests
 
+from acp.atcoder.bench import benchmark
+from acp.atcoder.build import Builder
+from acp.atcoder.checker import Checker
+from acp.atcoder.interactive import InteractiveRunner
 from acp.atcoder.judge import JudgeResult, JudgeRunner
+from acp.atcoder.memprofile import MemoryProfile, MemoryProfiler
 from acp.atcoder.models import AtCoderContest, AtCoderProblem
+from acp.atcoder.options import (
+    BenchOptions,
+    JudgeLimits,
+    ProfileOptions,
+    ReportOptions,
+)
+from acp.atcoder.prefork import PreforkError, PreforkServer
+from acp.atcoder.profiler import Profiler
+from acp.atcoder.report import CaseReport, JudgeReport, write_reports
+from acp.atcoder.result_cache import ResultCache
+from acp.atcoder.scale import MIN_SIZES, InputCache, fit_complexities
+from acp.atcoder.stress import StressTester
 from acp.general.service import WebService
 from acp.general.utils import (
     add_gitignore,
     bg_color,
+    clear_line,
     color,
     confirm_yn_input,
     reset_color,
 )
+from acp.general.watch import Watcher
 
 logger = getLogger(__name__)
 
@@ -28,6 +57,17 @@ logger = getLogger(__name__)
 
 __all__ = ["AtCoder"]
 
+VERDICT_COLORS = {
+    JudgeResult.AC: color(64, 255, 64),  # Green
+    JudgeResult.WA: color(255, 64, 64),  # Red
+    JudgeResult.RE: color(255, 255, 64),  # Yellow
+    JudgeResult.TLE: color(255, 192, 128),  # Orange
+    JudgeResult.MLE: color(255, 128, 192),  # Pink
+    JudgeResult.OLE: color(192, 128, 255),  # Purple
+    JudgeResult.CE: color(255, 255, 64),  # Yellow
+    JudgeResult.IE: color(64, 255, 255),  # Cyan
+}  # 判定結果の表示色
+
 
 class AtCoder(WebService):
     """
@@ -35,7 +75,6 @@ class AtCoder(WebService):
     """
 
     _cache: dict[str, dict[str | int, Any]] = {
-        "url": {},
         "lang": {
             5001: "C++ 20 (gcc 12.2)",
             5002: "Go (go 1.20.6)",
@@ -131,19 +170,31 @@ class AtCoder(WebService):
     }
     """
     キャッシュ
+    (ページのレスポンスはself.http_cacheが持つ)
     dict: {
-        "url": {
-            "example.com": {
-                "response": requests.Response,
-                "soup": BeautifulSoup
-            },
-        },
         "lang": {
             "language_id": "language_name"
         }
     }
     """
 
+    CACHE_TTLS = (
+        (r"/submissions", None),  # 提出結果は毎回取得する
+        (r"/(login|settings|submit)\b", None),
+        (r"/contests/[^/]+/tasks/[^/?]+", 7 * 24 * 60 * 60),  # 問題ページは変わらない
+        (r"/contests/[^/?]+/?(\?|$)", 0),  # コンテストのトップは毎回再検証する
+    )
+
+    SESSION_COOKIE = "REVEL_SESSION"
+    """
+    ログインの状態を持つクッキー (問題ページの提出フォームなどはログインしているかで変わる)
+    """
+
+    PROGRESS_INTERVAL = 0.1
+    """
+    テスト中に実行中のテストケースの経過時間を更新する間隔 [sec]
+    """
+
     class URLs(WebService.URLs):
         BASE = "https://atcoder.jp"
         LOGIN = f"{BASE}/login"
@@ -167,15 +218,15 @@ class AtCoder(WebService):
         *args: tuple[Any, ...],
         use_cache: bool = True,
         **kwargs: dict[str, Any],
-    ) -> BeautifulSoup:
+    ) -> requests.Response:
         """
         getメソッド
-        requests.getを実行し、BeautifulSoupオブジェクトを返す
+        requests.getを実行し、requests.Responseオブジェクトを返す
 
-        self._soupにBeautifulSoupオブジェクトを格納して、
         self._responseにrequests.Responseオブジェクトを格納する
+        (HTMLのパースはself.soupに初めてアクセスしたときに行う)
 
-        use_cacheがTrueの場合はキャッシュを使用する
+        use_cacheがTrueの場合はキャッシュ (メモリとディスク) を使用する
 
 
         Args:
@@ -187,19 +238,19 @@ class AtCoder(WebService):
             **kwargs (dict): requests.getのキーワード引数
 
         Returns:
-            BeautifulSoup: BeautifulSoupオブジェクト
+            requests.Response: レスポンス
         """
-        if use_cache and url in self._cache:
-            # キャッシュが存在する場合はキャッシュを返す
-            self._response = self._cache["url"][url]["response"]
-            self._soup = self._cache["url"][url]["soup"]
-            return self.soup
         params.update(
             {"lang": "ja"}
         )  # 言語を日本語に設定 (AtCoderでURLの最後に?lang=ja)
-        super().get(url, *args, params=params, headers=headers, **kwargs)
-        self._cache["url"][url] = dict(response=self.response, soup=self.soup)
-        return self.soup
+        return super().get(
+            url,
+            *args,
+            params=params,
+            headers=headers,
+            use_cache=use_cache,
+            **kwargs,
+        )
 
     def post(  # type: ignore
         self,
@@ -208,7 +259,7 @@ class AtCoder(WebService):
         headers: dict[str, str] = {},
         *args: tuple[Any, ...],
         **kwargs: dict[str, Any],
-    ) -> BeautifulSoup:
+    ) -> requests.Response:
         params.update({"lang": "ja"})  # 同上
         return super().post(url, *args, params=params, headers=headers, **kwargs)
 
@@ -227,12 +278,27 @@ class AtCoder(WebService):
             alerts[alert.attrs.get("class")[1].split("-")[1]].append(alert.text.strip())
         return alerts
 
+    def login_identity(self) -> str:
+        """
+        保存したページを分けるログインの識別子 (ログインしていなければ空文字列)
+        REVEL_SESSIONは `<署名>-<URLエンコードした "キー:値" の並び (NUL区切り)>` で、有効期限 (_TS) はアクセスのたびに変わるので除く
+        """
+        value = self.cookies.get(self.SESSION_COOKIE)
+        if not value:
+            return ""
+        fields = re.findall(
+            r"\x00([^:\x00]*):([^\x00]*)\x00", unquote(value.partition("-")[2])
+        )
+        session = "\0".join(f"{k}:{v}" for k, v in sorted(fields) if k != "_TS")
+        return hashlib.sha256((session or value).encode()).hexdigest()
+
     @property
     def is_logged_in(self) -> bool:
         """
         ログインしているかどうか
         settingsページにアクセスできるかで判断
         """
+        self.throttle(self.URLs.SETTINGS)
         return self._session.get(self.URLs.SETTINGS).url == self.URLs.SETTINGS
 
     def login(self, username: str, password: str) -> None:  # type: ignore
@@ -241,9 +307,8 @@ class AtCoder(WebService):
         # print("Logging in...")
         logger.info("Username: %s", username)
         logger.info("Password: %s", "*" * len(password))
-        res = self.get(self.URLs.LOGIN, use_cache=False)
-        self.wait(0.5)
-        form: bs4.Tag = res.find("form", action="")  # type: ignore
+        self.get(self.URLs.LOGIN, use_cache=False)
+        form: bs4.Tag = self.soup.find("form", action="")  # type: ignore
 
         *_, csrf_token = form.find_all("input")  # inputタグを取得
         data = {
@@ -257,18 +322,18 @@ class AtCoder(WebService):
         )
 
         self.save_session(self.session_path)
-        self.wait(0.5)  # 0.5秒待機
 
-        if self.alerts["danger"]:
+        alerts = self.alerts
+        if alerts["danger"]:
             raise self.AtCoderExceptions.LoginFailedError(
-                self.alerts["danger"]
+                alerts["danger"]
             )  # ログイン失敗時はraise
-        if self.alerts["warning"]:
-            logger.warning("Alerts: %s", self.alerts["warning"])
-        if self.alerts["info"]:
-            logger.info("Alerts: %s", self.alerts["info"])
-        if self.alerts["success"]:
-            logger.info("Alerts: %s", self.alerts["success"])
+        if alerts["warning"]:
+            logger.warning("Alerts: %s", alerts["warning"])
+        if alerts["info"]:
+            logger.info("Alerts: %s", alerts["info"])
+        if alerts["success"]:
+            logger.info("Alerts: %s", alerts["success"])
 
     def get_contest(self, contest: str, use_cache: bool = True) -> AtCoderContest:
         contest = (
@@ -336,7 +401,6 @@ class AtCoder(WebService):
             except KeyError:
                 pass
 
-        self.wait(0.25)
         title = self.soup.find("span", class_="h2")
         if title is None:
             msg = f"Title not found in {problem.url}. Is the problem ID correct?"
@@ -362,8 +426,12 @@ class AtCoder(WebService):
         (target_dir / "in").mkdir(exist_ok=True, parents=True)
         (target_dir / "out").mkdir(exist_ok=True, parents=True)
 
-        self.get(problem.url)
-        self.wait(0.1)
+        if (
+            self._response is None
+            or self._response.url.split("?")[0] != problem.url.split("?")[0]
+        ):
+            # get_problemで取得した直後なら、同じページを取得し直さない
+            self.get(problem.url)
 
         # Parse problem statement
         sample = re.compile(r"<h3>[入出]力例 \d+</h3><pre>([^<]+)[\n\r]</pre>").findall(
@@ -462,7 +530,23 @@ class AtCoder(WebService):
         *,
         target_dir: Path | str | None = None,
         command: list[str] = ["python", "main.py"],
-    ) -> None:
+        jobs: int | None = None,
+        limits: JudgeLimits | None = None,
+        checker: Checker | None = None,
+        build: Path | str | None = None,
+        build_command: str | None = None,
+        prefork: list[str] | None = None,
+        bench: BenchOptions | None = None,
+        order: list[int] | None = None,
+        cache: bool = True,
+        interactor: list[str] | None = None,
+        record_transcript: bool = False,
+        profile: ProfileOptions | None = None,
+        report: ReportOptions | None = None,
+        quiet: bool = False,
+        fail_fast: bool = False,
+        executor: ThreadPoolExecutor | None = None,
+    ) -> JudgeReport:
         """
         AtCoderの問題をテストする
 
@@ -470,23 +554,101 @@ class AtCoder(WebService):
             problem (AtCoderProblem): 問題
             target_dir (Path | str | None, optional): テストするディレクトリ. Defaults to None.
             command (list[str], optional): 実行コマンド. Defaults to ["python", "main.py"].
+            jobs (int | None, optional): 並列に実行するテストケース数. Defaults to None (CPUのコア数).
+            limits (JudgeLimits | None, optional): 実行時間・メモリ・出力サイズの制限. Defaults to None (2 sec / 1024 MB / 64 MB).
+            checker (Checker | None, optional): 出力の判定方法. Defaults to None (完全一致).
+            build (Path | str | None, optional): ビルドするソースファイル. 指定するとビルドした実行ファイルをテストする. Defaults to None.
+            build_command (str | None, optional): ビルドコマンド ({src}, {out}を置き換える). Defaults to None (拡張子から決める).
+            prefork (list[str] | None, optional): 指定するとこれらのモジュールをimportしたPythonを常駐させ、そこからforkして実行する. Defaults to None.
+            bench (BenchOptions | None, optional): 指定すると各テストケースを繰り返し実行し、実行時間の統計を表示する. Defaults to None.
+            order (list[int] | None, optional): 実行するテストケースの番号とその順番. Defaults to None (全てを番号順).
+            cache (bool, optional): 解答とテストケースが前回から変わっていなければ、実行せずに前回の判定結果を使う. Defaults to True.
+            interactor (list[str] | None, optional): インタラクティブな問題のインタラクタの実行コマンド (`<interactor> <入力ファイル>` として実行する). Defaults to None.
+            record_transcript (bool, optional): インタラクタとのやりとりを記録し、ACにならなかったテストケースで表示する (転送の分だけ遅くなる). Defaults to False.
+            profile (ProfileOptions | None, optional): 判定とは別にプロファイラの下で実行し直し、時間のかかった関数やメモリを多く確保している行を表示する. Defaults to None.
+            report (ReportOptions | None, optional): 判定結果をファイルに書き出す形式とファイル. Defaults to None.
+            quiet (bool, optional): 結果を表示しない (戻り値だけを使う場合). Defaults to False.
+            fail_fast (bool, optional): ACでないテストケースがあったら、まだ始まっていないテストケースを実行しない. Defaults to False.
+            executor (ThreadPoolExecutor | None, optional): テストケースを実行するスレッドプール (複数の問題で共有する場合). Defaults to None (jobsの数だけスレッドを作る).
+
+        Returns:
+            JudgeReport: テストケースごとの判定結果と実行時間・メモリ使用量など (ビルドなどに失敗した場合はerrorに理由が入る)
 
         Examples:
             >>> atcoder.test(problem)  # test in the problem's root directory
             >>> atcoder.test(problem, target_dir="contest")  # test in the "contest" directory
             >>> atcoder.test(problem, command=["python3", "main.py"])  # test with the command "python3 main.py"
+            >>> atcoder.test(problem, jobs=4)  # run 4 test cases concurrently
+            >>> atcoder.test(problem, limits=JudgeLimits(timelimit=4, memory_limit=256))  # 4 sec / 256 MB
+            >>> atcoder.test(problem, checker=FloatChecker(abs_eps=1e-9))  # allow an error of 1e-9
+            >>> atcoder.test(problem, build="main.cpp")  # build main.cpp (or reuse the cached binary) and test it
+            >>> atcoder.test(problem, prefork=["numpy"])  # import numpy once and fork for each test case
+            >>> atcoder.test(problem, bench=BenchOptions(20, warmup=2))  # run each case 20 times and show min/median/p95/stddev
+            >>> atcoder.test(problem, cache=False)  # run all cases even if nothing has changed
+            >>> atcoder.test(problem, interactor=["python3", "interactor.py"])  # judge an interactive problem locally
+            >>> atcoder.test(problem, interactor=["python3", "interactor.py"], record_transcript=True)  # show the exchange of non-AC cases
+            >>> atcoder.test(problem, profile=ProfileOptions("slowest"))  # profile the slowest case and show the hot functions
+            >>> atcoder.test(problem, profile=ProfileOptions(memory=True))  # show the peak traced memory and the top allocating lines
+            >>> atcoder.test(problem, report=ReportOptions("junit", Path("report.xml")))  # also write JUnit XML
+            >>> atcoder.test(problem, quiet=True).passed  # True if all cases are AC
+            >>> atcoder.test(problem, fail_fast=True)  # stop at the first non-AC case
         """
         target_dir = (
             Path(target_dir)
             if isinstance(target_dir, str)
             else target_dir or problem.root_dir
         )  # テストするディレクトリ
+        limits = limits or JudgeLimits()
+        profile = profile or ProfileOptions()
+        started = time.perf_counter()
+
+        built = None
+        if build is not None:
+            # ソースが変わっていなければキャッシュされた実行ファイルを使う
+            built = Builder(self._session_dir / "build").build(
+                target_dir / build, build_command
+            )
+            if built.binary is not None:
+                command = [str(built.binary)]
+
+        cases = (
+            order
+            if order is not None
+            else list(range(len(list((target_dir / "in").iterdir()))))
+        )
+        if bench is not None and jobs is None:
+            jobs = 1  # 並列に実行すると計測がぶれるので、指定がなければ逐次実行する
+        jobs = self.decide_jobs(jobs, len(cases))
+        server, error = None, None
+        if (
+            prefork is not None
+            and interactor is None
+            and (built is None or built.binary is not None)
+        ):
+            # インタプリタの起動とimportは計測前に済ませておく
+            try:
+                server = PreforkServer(command, target_dir, prefork)
+                server.prepare(jobs)
+            except PreforkError as e:
+                if server is not None:
+                    server.close()
+                server, error = None, str(e)
 
-        runner = JudgeRunner(
-            command=command, cd=target_dir
+        memprofiler = (
+            MemoryProfiler(command)
+            if profile.memory
+            and interactor is None
+            and MemoryProfiler.supported(command)
+            else None
+        )
+        runner = (
+            JudgeRunner(command=command, cd=target_dir, checker=checker, prefork=server)
+            if interactor is None
+            else InteractiveRunner(
+                command, interactor, target_dir, record=record_transcript
+            )
         )  # JudgeRunnerのインスタンス
-        lines = []
-        lines.append(
+        header = (
             color(255, 255, 255)
             + "-" * 32
             + " "
@@ -494,78 +656,1113 @@ class AtCoder(WebService):
             + " "
             + "-" * 32
             + f"\n- Execute Directory:  '{target_dir}'\n"
+            + (
+                f"- Build:              '{build}' "
+                + ("(cached)" if built.cached else f"({built.time:.2f} sec)")
+                + "\n"
+                if built is not None
+                else ""
+            )
+            + (
+                f"- Prefork:            {', '.join(server.preload) or '(no modules)'} "
+                + f"(startup: {server.startup:.2f} sec, excluded from time)\n"
+                if server is not None and server.startup is not None
+                else ""
+            )
             + '- Execute Command:    "'
             + " ".join(command)
             + '"\n'
+            + (
+                f'- Interactor:         "{" ".join(interactor)}"\n'
+                if interactor is not None
+                else ""
+            )
+            + (
+                "- Memory Profile:     "
+                + (
+                    "tracemalloc (each case runs again, not judged)\n"
+                    if memprofiler is not None
+                    else "not available (only for `python <script>` without an interactor)\n"
+                )
+                if profile.memory
+                else ""
+            )
             + "-" * (len(problem.name) + 66)
             + reset_color()
         )
-        colormap = {
-            JudgeResult.AC: color(64, 255, 64),  # Green
-            JudgeResult.WA: color(255, 64, 64),  # Red
-            JudgeResult.RE: color(255, 255, 64),  # Yellow
-            JudgeResult.TLE: color(255, 192, 128),  # Orange
-            JudgeResult.IE: color(64, 255, 255),  # Cyan
-        }  # 表示色
-        for i in range(len(list((target_dir / "in").iterdir()))):
-            code, meta = runner(
-                target_dir / "in" / f"sample-{i}.in",
-                target_dir / "out" / f"sample-{i}.out",
-            )  # JudgeRunnerで実行
-            line = (
-                bg_color(32, 32, 32)
-                + color(255, 255, 255)
-                + f" sample-{i}   "
-                + reset_color()
-                + color(255, 255, 255)
-                + bg_color(32, 32, 32)
-                + "["
-                + colormap[code]
-                + f" {code.value} "
+        footer = (
+            bg_color(32, 32, 32)
+            + color(255, 255, 255)
+            + "-" * (len(problem.name) + 64 + 2)
+            + reset_color()
+        )
+        # 端末に出力している場合は、実行中のテストケースの経過時間を1行で表示し続ける
+        live = not quiet and sys.stdout.isatty()
+
+        def emit(line: str) -> None:
+            # 結果はでき次第表示する (進捗の行は上書きする)
+            if not quiet:
+                print(clear_line() + line if live else line, flush=True)
+
+        def finish(cases: list[CaseReport], error: str | None = None) -> JudgeReport:
+            # 指定があれば結果をファイルにも書き出す
+            emit(footer)
+            judged = JudgeReport(
+                problem.name, command, cases, error, time.perf_counter() - started
+            )
+            if report is not None:
+                judged.write(report.format, report.file)
+            return judged
+
+        emit(header)
+        if built is not None and built.binary is None:
+            # コンパイルエラーの場合はテストしない
+            emit(
+                self.format_result(
+                    "build", JudgeResult.CE, {"stderr": built.output}, None
+                )
+            )
+            return finish([], f"CE: {built.output}")
+        if problem.is_interactive and interactor is None:
+            # インタラクティブな問題は、インタラクタがないと判定できない
+            emit(
+                color(255, 192, 128)
+                + "This problem is interactive. Specify an interactor with --interactor."
                 + reset_color()
-                + color(255, 255, 255)
-                + bg_color(32, 32, 32)
-                + "]"
+            )
+            return finish([], "This problem is interactive")
+        if error is not None:
+            # ワーカーを起動できなかった場合もテストしない
+            emit(self.format_result("prefork", JudgeResult.IE, {"stderr": error}, None))
+            return finish([], f"IE: {error}")
+
+        results_cache = (
+            ResultCache(self._session_dir / "results")
+            if cache and interactor is None
+            else None
+        )  # インタラクティブな問題は期待される出力がないのでキャッシュしない
+        cases_report: list[CaseReport] = []
+        try:
+            with (
+                ThreadPoolExecutor(max_workers=jobs)
+                if executor is None
+                else nullcontext(executor)
+            ) as pool:
+                runner_kwargs = limits.runner_kwargs()
+
+                def judge(i: int) -> tuple[JudgeResult, dict[str, Any]]:
+                    input_file = target_dir / "in" / f"sample-{i}.in"
+                    output_file = target_dir / "out" / f"sample-{i}.out"
+                    if bench is not None:
+                        # 繰り返し実行して統計をとる (計測が目的なのでキャッシュは使わない)
+                        return benchmark(
+                            runner,
+                            input_file,
+                            output_file,
+                            repeat=bench.repeat,
+                            warmup=bench.warmup,
+                            margin=bench.margin,
+                            **runner_kwargs,
+                        )
+                    if results_cache is None:
+                        return runner(input_file, output_file, **runner_kwargs)
+                    # 解答もテストケースも変わっていなければ前回の結果を使う
+                    key = results_cache.key(
+                        command,
+                        target_dir,
+                        input_file,
+                        output_file,
+                        checker,
+                        prefork=prefork,
+                        **runner_kwargs,
+                    )
+                    if (cached := results_cache.get(key)) is not None:
+                        return cached
+                    # JudgeRunnerで実行
+                    code, meta = runner(input_file, output_file, **runner_kwargs)
+                    results_cache.put(key, code, meta)
+                    return code, meta
+
+                def judge_with_memprofile(i: int) -> tuple[JudgeResult, dict[str, Any]]:
+                    assert memprofiler is not None
+                    code, meta = judge(i)
+                    # 計測が変わるので、判定とは別にtracemallocを仕込んで実行する
+                    memory = memprofiler.profile(
+                        target_dir / "in" / f"sample-{i}.in",
+                        target_dir,
+                        timeout=limits.timelimit * memprofiler.OVERHEAD + 1,
+                        address_limit=limits.address_limit,
+                    )
+                    return code, {**meta, "memprofile": memory}
+
+                running: dict[int, float] = {}  # 実行中のテストケースと開始時刻
+                stopping = threading.Event()  # fail_fastで打ち切った
+
+                def run_case(i: int) -> tuple[JudgeResult, dict[str, Any]] | None:
+                    if stopping.is_set():
+                        # 打ち切った後に取り出されたテストケースは実行しない
+                        return None
+                    running[i] = time.perf_counter()
+                    try:
+                        result = (
+                            judge if memprofiler is None else judge_with_memprofile
+                        )(i)
+                    finally:
+                        del running[i]
+                    if fail_fast and result[0] != JudgeResult.AC:
+                        # このスレッドが次のテストケースを取り出す前に止める
+                        stopping.set()
+                    return result
+
+                futures = {pool.submit(run_case, i): i for i in cases}
+                position = {i: k for k, i in enumerate(cases)}
+                pending = set(futures)
+                times: dict[int, float] = {}  # 実行時間 (profileで最も遅いケースを選ぶ)
+                while pending:
+                    done, pending = wait(
+                        pending,
+                        timeout=self.PROGRESS_INTERVAL if live else None,
+                        return_when=FIRST_COMPLETED,
+                    )
+                    # 終わったものから表示する (同時に終わったものは実行順に並べる)
+                    for future in sorted(done, key=lambda f: position[futures[f]]):
+                        if future.cancelled() or (result := future.result()) is None:
+                            continue
+                        i = futures[future]
+                        code, meta = result
+                        cases_report.append(
+                            CaseReport.from_meta(
+                                i, code, meta, target_dir / "out" / f"sample-{i}.out"
+                            )
+                        )
+                        times[i] = meta["time"]
+                        emit(
+                            self.format_result(
+                                f"sample-{i}",
+                                code,
+                                meta,
+                                target_dir / "out" / f"sample-{i}.out",
+                            )
+                        )
+                        if stopping.is_set():
+                            # まだ始まっていないテストケースは実行しない
+                            for f in pending:
+                                f.cancel()
+                    pending = {f for f in pending if not f.cancelled()}
+                    if live and pending:
+                        now = time.perf_counter()
+                        print(
+                            clear_line()
+                            + f"  [{len(cases_report)}/{len(cases)}] running "
+                            + ", ".join(
+                                f"sample-{i} ({now - t:.1f} sec)"
+                                for i, t in sorted(running.copy().items())
+                            ),
+                            end="",
+                            flush=True,
+                        )
+        finally:
+            if server is not None:
+                server.close()
+
+        if len(cases_report) < len(cases):
+            emit(
+                color(255, 192, 128)
+                + f"Stopped at the first failure ({len(cases) - len(cases_report)} cases skipped)"
                 + reset_color()
             )
-            if code == JudgeResult.AC:
-                line += f"        time: {meta['time']:.2f} [sec]"
-            elif code == JudgeResult.WA:
-                out = (target_dir / "out" / f"sample-{i}.out").read_text().strip()
+        cases_report.sort(key=lambda case: position[case.number])
+
+        if profile.case is not None and times:
+            case = (
+                max(times, key=times.__getitem__)
+                if profile.case == "slowest"
+                else int(profile.case)
+            )
+            if case not in times:
+                emit(f"--profile: sample-{case} was not run")
+            elif interactor is not None:
+                emit("--profile is not supported for interactive problems")
+            else:
+                # プロファイラの分遅くなるので、制限時間の2倍まで実行させる
+                emit(
+                    self.format_profile(
+                        f"sample-{case}",
+                        Profiler(command, target_dir, profile.top),
+                        target_dir / "in" / f"sample-{case}.in",
+                        timeout=limits.timelimit * 2,
+                        address_limit=limits.address_limit,
+                    )
+                )
+
+        return finish(cases_report)
+
+    def test_many(
+        self,
+        problems: list[tuple[AtCoderProblem, Path]],
+        *,
+        command: list[str] | None = None,
+        jobs: int | None = None,
+        build: Path | str | None = None,
+        report: ReportOptions | None = None,
+        quiet: bool = False,
+        **kwargs: Any,
+    ) -> dict[str, JudgeReport | None]:
+        """
+        複数の問題をまとめてテストし、問題ごとの判定結果を1行ずつ表にして表示する
+
+        全ての問題のテストケースを1つのスレッドプールで実行するので、問題をまたいでjobsの数だけ並列に実行される
+        解答のファイルがない問題は、ビルドもテストケースの読み込みもせずにスキップする
+
+        Args:
+            problems (list[tuple[AtCoderProblem, Path]]): 問題とテストするディレクトリ (この順に表示する)
+            command (list[str] | None, optional): 実行コマンド. Defaults to None (["python", "main.py"]).
+            jobs (int | None, optional): 全体で並列に実行するテストケース数. Defaults to None (CPUのコア数).
+            build (Path | str | None, optional): 各問題のディレクトリでビルドするソースファイル. Defaults to None.
+            report (ReportOptions | None, optional): 全ての問題の判定結果をまとめて書き出す形式とファイル. Defaults to None.
+            quiet (bool, optional): 結果を表示しない. Defaults to False.
+            **kwargs (Any): testに渡す引数 (limits, bench, fail_fastなど)
+
+        Returns:
+            dict[str, JudgeReport | None]: 問題名ごとの判定結果 (スキップした問題はNone)
+
+        Examples:
+            >>> problems = [(p, Path("contest") / p.root_dir) for p in contest_problems]
+            >>> reports = atcoder.test_many(problems, jobs=8)
+            >>> [name for name, report in reports.items() if report is not None and report.passed]
+        """
+        started = time.perf_counter()
+        command = command or ["python", "main.py"]
+        jobs = self.decide_jobs(jobs, os.cpu_count() or 1)
+        source = self.solution_file(command, build)
+        width = max((len(target_dir.name) for _, target_dir in problems), default=0)
+
+        def emit(line: str) -> None:
+            if not quiet:
+                print(line, flush=True)
+
+        def skip_reason(target_dir: Path) -> str | None:
+            # ファイルの有無だけを見るので、解答のない問題が多くても速い
+            if source is not None and not (target_dir / source).exists():
+                return f"no {source}"
+            if not (target_dir / "in").is_dir():
+                return "no test cases"
+            return None
+
+        title = f" {len(problems)} problems "
+        emit(
+            color(255, 255, 255)
+            + "-" * 32
+            + title
+            + "-" * 32
+            + '\n- Execute Command:    "'
+            + " ".join(command)
+            + '"\n'
+            + f"- Jobs:               {jobs} (shared by all problems)\n"
+            + "-" * (len(title) + 64)
+            + reset_color()
+        )
+        reports: dict[str, JudgeReport | None] = {}
+        # pool: テストケースを実行する (全体で共有), scheduler: 問題ごとにtestを呼んで待つ
+        with (
+            ThreadPoolExecutor(max_workers=jobs) as pool,
+            ThreadPoolExecutor(max_workers=jobs) as scheduler,
+        ):
+            futures = []
+            for problem, target_dir in problems:
+                reason = skip_reason(target_dir)
+                futures.append(
+                    (
+                        problem,
+                        target_dir,
+                        reason,
+                        None
+                        if reason is not None
+                        else scheduler.submit(
+                            self.test,
+                            problem,
+                            target_dir=target_dir,
+                            command=command,
+                            jobs=jobs,
+                            build=build,
+                            quiet=True,
+                            executor=pool,
+                            **kwargs,
+                        ),
+                    )
+                )
+            # 終わった問題から、問題の順番を保って表示する
+            for problem, target_dir, reason, future in futures:
+                judged = None if future is None else future.result()
+                reports[problem.name] = judged
+                emit(
+                    self.format_matrix_row(target_dir.name.ljust(width), judged, reason)
+                )
+
+        tested = [judged for judged in reports.values() if judged is not None]
+        emit(
+            bg_color(32, 32, 32)
+            + color(255, 255, 255)
+            + f" {sum(judged.passed for judged in tested)}/{len(tested)} passed, "
+            + f"{len(reports) - len(tested)} skipped "
+            + f"({time.perf_counter() - started:.2f} sec)"
+            + reset_color()
+        )
+        if report is not None:
+            write_reports(tested, report.format, report.file)
+        return reports
+
+    def compare(
+        self,
+        problem: AtCoderProblem,
+        *,
+        target_dir: Path | str | None = None,
+        commands: list[list[str]],
+        jobs: int | None = None,
+        bench: BenchOptions | None = None,
+        report: ReportOptions | None = None,
+        quiet: bool = False,
+        **kwargs: Any,
+    ) -> list[JudgeReport]:
+        """
+        複数の解答 (実行コマンド) を同じテストケースで実行し、判定と実行時間の中央値を表にして比べる
+
+        全てのコマンドのテストケースを1つのスレッドプールで実行し、全て通った中で最も速いものを強調する
+
+        Args:
+            problem (AtCoderProblem): 問題
+            target_dir (Path | str | None, optional): テストするディレクトリ. Defaults to None.
+            commands (list[list[str]]): 比べる実行コマンド
+            jobs (int | None, optional): 全体で並列に実行するテストケース数. Defaults to None (CPUのコア数).
+            bench (BenchOptions | None, optional): 各テストケースを繰り返し実行する回数など (中央値をとる). Defaults to None (3回).
+            report (ReportOptions | None, optional): 全てのコマンドの判定結果をまとめて書き出す形式とファイル. Defaults to None.
+            quiet (bool, optional): 結果を表示しない. Defaults to False.
+            **kwargs (Any): testに渡す引数 (limits, checker, orderなど)
+
+        Returns:
+            list[JudgeReport]: コマンドごとの判定結果 (commandsと同じ順番. 同じコマンドが複数あってもそれぞれ返す)
+
+        Examples:
+            >>> reports = atcoder.compare(problem, commands=[["python", "main.py"], ["pypy3", "main.py"]])
+            >>> min((r for r in reports if r.passed), key=AtCoder.total_time)
+        """
+        target_dir = (
+            Path(target_dir)
+            if isinstance(target_dir, str)
+            else target_dir or problem.root_dir
+        )
+        bench = bench or BenchOptions(3)
+        jobs = self.decide_jobs(jobs, os.cpu_count() or 1)
+        with (
+            ThreadPoolExecutor(max_workers=jobs) as pool,
+            ThreadPoolExecutor(max_workers=len(commands)) as scheduler,
+        ):
+            futures = [
+                scheduler.submit(
+                    self.test,
+                    problem,
+                    target_dir=target_dir,
+                    command=command,
+                    jobs=jobs,
+                    bench=bench,
+                    cache=False,  # 毎回計測する
+                    quiet=True,
+                    executor=pool,
+                    **kwargs,
+                )
+                for command in commands
+            ]
+            reports = [future.result() for future in futures]
+
+        if not quiet:
+            print(self.format_comparison(problem, target_dir, reports, bench.repeat))
+        if report is not None:
+            write_reports(reports, report.format, report.file)
+        return reports
+
+    def watch(
+        self,
+        problem: AtCoderProblem,
+        *,
+        target_dir: Path | str | None = None,
+        **kwargs: Any,
+    ) -> None:
+        """
+        問題のディレクトリを監視し、ファイルが変更されるたびにテストし直す (Ctrl-Cで終了)
+        入力が変更されたテストケースと、前回通らなかったテストケースを先に実行する
+
+        Args:
+            problem (AtCoderProblem): 問題
+            target_dir (Path | str | None, optional): テストするディレクトリ. Defaults to None.
+            **kwargs (Any): testに渡す引数 (command, jobs, limits など)
+
+        Examples:
+            >>> atcoder.watch(problem, command=["python3", "main.py"])
+        """
+        target_dir = (
+            Path(target_dir)
+            if isinstance(target_dir, str)
+            else target_dir or problem.root_dir
+        )  # テストするディレクトリ
+        sample = re.compile(r"sample-(\d+)\.(?:in|out)")
+        with Watcher(target_dir) as watcher:
+            verdicts = self.test(problem, target_dir=target_dir, **kwargs).verdicts
+            try:
+                while True:
+                    print(f"Watching '{target_dir}' for changes ... (Ctrl-C to quit)")
+                    changed = watcher.wait()
+                    n_cases = len(list((target_dir / "in").iterdir()))
+                    changed_cases = {
+                        int(m.group(1))
+                        for path in changed
+                        if (m := sample.fullmatch(path.name))
+                    }
+                    failed = {
+                        i for i, code in verdicts.items() if code != JudgeResult.AC
+                    }
+                    order = sorted(
+                        range(n_cases),
+                        key=lambda i: (i not in changed_cases, i not in failed, i),
+                    )
+                    print(
+                        "Changed: "
+                        + ", ".join(
+                            str(path.relative_to(target_dir))
+                            for path in sorted(changed)
+                        )
+                    )
+                    verdicts = self.test(
+                        problem, target_dir=target_dir, order=order, **kwargs
+                    ).verdicts
+            except KeyboardInterrupt:
+                pass
+
+    def stress(
+        self,
+        problem: AtCoderProblem,
+        *,
+        generator: list[str],
+        reference: list[str],
+        target_dir: Path | str | None = None,
+        command: list[str] | None = None,
+        jobs: int | None = None,
+        timelimit: float = 2,
+        memory_limit: int | None = 1024,
+        checker: Checker | None = None,
+        max_cases: int | None = None,
+        seed: int = 0,
+    ) -> None:
+        """
+        ランダムな入力で解答と愚直解の出力を比較し、通らなかった入力をテストケースとして保存する
+
+        Args:
+            problem (AtCoderProblem): 問題
+            generator (list[str]): 入力の生成器の実行コマンド (最後の引数にシードが渡される)
+            reference (list[str]): 愚直解の実行コマンド
+            target_dir (Path | str | None, optional): テストするディレクトリ. Defaults to None.
+            command (list[str] | None, optional): 実行コマンド. Defaults to None (["python", "main.py"]).
+            jobs (int | None, optional): 並列に実行するケース数. Defaults to None (CPUのコア数).
+            timelimit (float, optional): 実行時間制限 [sec]. Defaults to 2.
+            memory_limit (int | None, optional): メモリ制限 [MB]. Defaults to 1024.
+            checker (Checker | None, optional): 出力の判定方法. Defaults to None (完全一致).
+            max_cases (int | None, optional): 試すケース数の上限. Defaults to None (見つかるまで).
+            seed (int, optional): 最初のシード. Defaults to 0.
+
+        Examples:
+            >>> atcoder.stress(problem, generator=["python", "gen.py"], reference=["python", "naive.py"])
+            >>> atcoder.stress(problem, generator=["python", "gen.py"], reference=["python", "naive.py"], max_cases=1000)
+        """
+        target_dir = (
+            Path(target_dir)
+            if isinstance(target_dir, str)
+            else target_dir or problem.root_dir
+        )  # テストするディレクトリ
+        command = command or ["python", "main.py"]
+        tester = StressTester(
+            generator,
+            command,
+            reference,
+            target_dir,
+            checker=checker,
+            timelimit=timelimit,
+            memory_limit=memory_limit,
+        )
+        jobs = self.decide_jobs(jobs, max_cases if max_cases is not None else 1 << 30)
+        print(
+            color(255, 255, 255)
+            + "-" * 32
+            + " "
+            + problem.name
+            + " "
+            + "-" * 32
+            + f"\n- Execute Directory:  '{target_dir}'\n"
+            + f'- Generator:          "{" ".join(generator)}"\n'
+            + f'- Reference:          "{" ".join(reference)}"\n'
+            + f'- Execute Command:    "{" ".join(command)}"\n'
+            + "-" * (len(problem.name) + 66)
+            + reset_color()
+        )
+        footer = (
+            bg_color(32, 32, 32)
+            + color(255, 255, 255)
+            + "-" * (len(problem.name) + 64 + 2)
+            + reset_color()
+        )
+
+        start = time.perf_counter()
+        last_update = 0.0
+
+        def progress(done: int) -> None:
+            nonlocal last_update
+            now = time.perf_counter()
+            if now - last_update >= 0.2:
+                last_update = now
+                print(
+                    f"\r  {done} cases ({done / (now - start):.1f} cases/sec)",
+                    end="",
+                    flush=True,
+                )
+
+        with tempfile.TemporaryDirectory() as work_dir:
+            try:
+                case = tester.run(
+                    Path(work_dir),
+                    jobs=jobs,
+                    start=seed,
+                    max_cases=max_cases,
+                    on_progress=progress,
+                )
+            except StressTester.Exceptions.CommandFailedError as e:
+                print()
+                print(
+                    self.format_result(
+                        "stress", JudgeResult.IE, {"stderr": str(e)}, None
+                    )
+                )
+                print(footer)
+                return
+            print()
+            if case is None:
+                print(f"  No failing case found in {max_cases} cases.")
+                print(footer)
+                return
+
+            # AtCoder.testがそのまま読める sample-N の形式で保存する
+            (target_dir / "in").mkdir(parents=True, exist_ok=True)
+            (target_dir / "out").mkdir(parents=True, exist_ok=True)
+            n = len(list((target_dir / "in").iterdir()))
+            shutil.copyfile(case.input_file, target_dir / "in" / f"sample-{n}.in")
+            shutil.copyfile(case.output_file, target_dir / "out" / f"sample-{n}.out")
+        print(f"  Found a failing case with seed {case.seed}. Saved as sample-{n}.")
+        print(
+            self.format_result(
+                f"sample-{n}",
+                case.code,
+                case.meta,
+                target_dir / "out" / f"sample-{n}.out",
+            )
+        )
+        print(footer)
+
+    def scale(
+        self,
+        problem: AtCoderProblem,
+        *,
+        generator: list[str],
+        sizes: list[int],
+        max_size: int | None = None,
+        target_dir: Path | str | None = None,
+        command: list[str] | None = None,
+        limits: JudgeLimits | None = None,
+        repeat: int = 3,
+        seed: int = 0,
+    ) -> None:
+        """
+        サイズを変えた入力で実行時間を測り、計算量を推定して最大ケースでの実行時間を外挿する
+
+        Args:
+            problem (AtCoderProblem): 問題
+            generator (list[str]): 入力の生成器の実行コマンド (最後の引数にサイズとシードが渡される)
+            sizes (list[int]): 計測するサイズ (1以上でMIN_SIZES種類以上)
+            max_size (int | None, optional): 問題の制約の最大サイズ. 指定するとその実行時間を外挿する. Defaults to None.
+            target_dir (Path | str | None, optional): テストするディレクトリ. Defaults to None.
+            command (list[str] | None, optional): 実行コマンド. Defaults to None (["python", "main.py"]).
+            limits (JudgeLimits | None, optional): 実行時間制限 (外挿した時間と比べる) とアドレス空間の上限. Defaults to None (2 sec).
+            repeat (int, optional): サイズごとの実行回数 (最小値を使う). Defaults to 3.
+            seed (int, optional): 生成器に渡すシード. Defaults to 0.
+
+        Examples:
+            >>> atcoder.scale(problem, generator=["python", "gen.py"], sizes=[1000, 10000, 100000], max_size=200000)
+        """
+        target_dir = (
+            Path(target_dir)
+            if isinstance(target_dir, str)
+            else target_dir or problem.root_dir
+        )  # テストするディレクトリ
+        command = command or ["python", "main.py"]
+        limits = limits or JudgeLimits()
+        if any(size < 1 for size in sizes) or len(set(sizes)) < MIN_SIZES:
+            print(
+                f"At least {MIN_SIZES} different sizes (each at least 1) are needed "
+                f"to estimate the complexity: {sizes}"
+            )
+            return
+        inputs = InputCache(self._session_dir / "scale")
+        runner = JudgeRunner(command=command, cd=target_dir)
+        print(
+            color(255, 255, 255)
+            + "-" * 32
+            + " "
+            + problem.name
+            + " "
+            + "-" * 32
+            + f"\n- Execute Directory:  '{target_dir}'\n"
+            + f'- Generator:          "{" ".join(generator)}"\n'
+            + f'- Execute Command:    "{" ".join(command)}"\n'
+            + "-" * (len(problem.name) + 66)
+            + reset_color()
+        )
+        footer = (
+            bg_color(32, 32, 32)
+            + color(255, 255, 255)
+            + "-" * (len(problem.name) + 64 + 2)
+            + reset_color()
+        )
+
+        samples: list[tuple[int, float]] = []
+        for size in sorted(set(sizes)):
+            try:
+                input_file, cached = inputs.get(generator, target_dir, size, seed)
+            except InputCache.Exceptions.GeneratorError as e:
+                print(
+                    self.format_result(
+                        f"n={size}", JudgeResult.IE, {"stderr": str(e)}, None
+                    )
+                )
+                break
+            times = []
+            for _ in range(repeat):
+                # 制限時間を超えても外挿に使えるように、killするまでの時間は長めにとる
+                result = runner.run(
+                    input_file,
+                    timeout=limits.timelimit * 5,
+                    address_limit=limits.address_limit,
+                )
+                if result.timed_out or result.return_code != 0:
+                    break
+                times.append(result.time)
+            if len(times) < repeat:
+                reason = (
+                    "timed out"
+                    if result.timed_out
+                    else f"return code {result.return_code}"
+                )
+                print(f"  n={size:<12} {reason}, stop here")
+                break
+            samples.append((size, min(times)))
+            print(
+                f"  n={size:<12} time: {min(times):.3f} [sec]"
+                + ("  (cached input)" if cached else "")
+            )
+
+        if len(samples) < MIN_SIZES:
+            print(
+                f"  At least {MIN_SIZES} sizes are needed to estimate the complexity"
+                f" (measured {len(samples)})."
+            )
+            print(footer)
+            return
+        fits = fit_complexities(samples)
+        best = fits[0]
+        print(f"  Estimated complexity: {best.name}  (error: {best.error:.1%})")
+        print(
+            "  Other candidates:     "
+            + ", ".join(f"{fit.name} ({fit.error:.1%})" for fit in fits[1:3])
+        )
+        if max_size is not None:
+            predicted = best.predict(max_size)
+            verdict = (
+                color(64, 255, 64) + "OK" + reset_color()
+                if predicted <= limits.timelimit
+                else color(255, 192, 128) + "TLE" + reset_color()
+            )
+            print(
+                f"  Estimated time at n={max_size}: {predicted:.3f} [sec]"
+                f" / {limits.timelimit} [sec] ... {verdict}"
+            )
+        print(footer)
+
+    @staticmethod
+    def solution_file(
+        command: list[str], build: Path | str | None = None
+    ) -> Path | None:
+        """
+        実行コマンドから解答のファイルを推測する (推測できなければNone)
+
+        Args:
+            command (list[str]): 実行コマンド
+            build (Path | str | None, optional): ビルドするソースファイル. Defaults to None.
+
+        Returns:
+            Path | None: 解答のファイル (テストするディレクトリからの相対パス)
+
+        Examples:
+            >>> AtCoder.solution_file(["python", "main.py"])  # main.py
+            >>> AtCoder.solution_file(["./a.out"], build="main.cpp")  # main.cpp
+            >>> AtCoder.solution_file(["python", "-m", "main"])  # None
+        """
+        if build is not None:
+            return Path(build)
+        if "/" in command[0] and not Path(command[0]).is_absolute():
+            return Path(command[0])  # ex: ./a.out
+        for arg in command[1:]:
+            if arg.startswith("-"):
+                # オプションの後の引数はファイルとは限らない (ex: python -m main)
+                return None
+            if Path(arg).suffix:
+                return Path(arg)
+        return None
+
+    @staticmethod
+    def decide_jobs(jobs: int | None, n_cases: int) -> int:
+        """
+        テストの並列数を決める
+        計測時間が正確になるように、CPUのコア数を超えないようにする
+
+        Args:
+            jobs (int | None): 指定された並列数 (Noneの場合はCPUのコア数)
+            n_cases (int): テストケース数
+
+        Returns:
+            int: 並列数
+        """
+        cpu_count = os.cpu_count() or 1
+        return max(1, min(jobs or cpu_count, cpu_count, n_cases))
+
+    def format_result(
+        self,
+        name: str,
+        code: JudgeResult,
+        meta: dict[str, Any],
+        output_testcase_file: Path | None,
+    ) -> str:
+        """
+        テストケース1つの判定結果を表示用の文字列にする
+
+        Args:
+            name (str): テストケースの名前 (ex: sample-0)
+            code (JudgeResult): 判定結果
+            meta (dict[str, Any]): JudgeRunnerの実行結果
+            output_testcase_file (Path | None): 期待される出力 (WAのときに表示する)
+
+        Returns:
+            str: 表示用の文字列
+        """
+        line = (
+            bg_color(32, 32, 32)
+            + color(255, 255, 255)
+            + f" {name}   "
+            + reset_color()
+            + color(255, 255, 255)
+            + bg_color(32, 32, 32)
+            + "["
+            + VERDICT_COLORS[code]
+            + f" {code.value} "
+            + reset_color()
+            + color(255, 255, 255)
+            + bg_color(32, 32, 32)
+            + "]"
+            + reset_color()
+        )
+        if meta.get("cached"):
+            line += " (cached)"
+        if code == JudgeResult.AC and "bench" in meta:
+            stats = meta["bench"]
+            line += (
+                f"        memory: {meta['memory']} [KB]  ({stats['repeat']} runs)"
+                f"\n    time [sec]: {stats['time']}"
+                f"\n    cpu  [sec]: {stats['cpu_time']}"
+            )
+            if stats["near_limit"]:
                 line += (
-                    color(255, 255, 255)
-                    + bg_color(32, 64, 32)
-                    + "\nExpected:\n"
-                    + out
+                    color(255, 192, 128)
+                    + "\n    warning: the median time is close to the time limit"
                     + reset_color()
-                    + color(255, 255, 255)
-                    + bg_color(64, 32, 32)
-                    + "\nGot:\n"
-                    + meta["answer"]
-                    + reset_color()
-                )
-            elif code == JudgeResult.RE:
-                err = meta["stderr"].strip()
-                line += f" return code: {meta['return_code']}" + (
-                    (bg_color(64, 64, 32) + err + reset_color()) if err else ""
                 )
-            elif code == JudgeResult.TLE:
+        elif code == JudgeResult.AC:
+            line += (
+                f"        time: {meta['time']:.2f} [sec]"
+                f"  cpu: {meta['cpu_time']:.2f} [sec]"
+                f"  memory: {meta['memory']} [KB]"
+            )
+        elif code == JudgeResult.WA and "interactor_stderr" in meta:
+            err = meta["interactor_stderr"].strip()
+            line += f" interactor return code: {meta['interactor_return_code']}" + (
+                "\n" + bg_color(64, 64, 32) + err + reset_color() if err else ""
+            )
+        elif (
+            code == JudgeResult.WA
+            and output_testcase_file is not None
+            and output_testcase_file.exists()
+        ):
+            with output_testcase_file.open("rb") as f:
+                out = f.read(JudgeRunner.PREVIEW_SIZE).decode(errors="replace").strip()
+            if meta["mismatch"] is not None:
+                line += f" first mismatch at {meta['mismatch']}"
+            line += (
+                color(255, 255, 255)
+                + bg_color(32, 64, 32)
+                + "\nExpected:\n"
+                + out
+                + reset_color()
+                + color(255, 255, 255)
+                + bg_color(64, 32, 32)
+                + "\nGot:\n"
+                + meta["answer"]
+                + reset_color()
+            )
+        elif code == JudgeResult.RE:
+            err = meta["stderr"].strip()
+            line += f" return code: {meta['return_code']}" + (
+                (bg_color(64, 64, 32) + err + reset_color()) if err else ""
+            )
+        elif code == JudgeResult.TLE:
+            line += (
+                bg_color(32, 32, 64)
+                + f"        time: {meta['time']:.2f} sec"
+                + f"  cpu: {meta['cpu_time']:.2f} sec"
+                + reset_color()
+            )
+        elif code in (JudgeResult.CE, JudgeResult.IE):
+            line += "\n" + bg_color(64, 64, 32) + meta["stderr"].strip() + reset_color()
+        elif code == JudgeResult.OLE:
+            line += f"        output: {meta['output_size']} bytes"
+        elif code == JudgeResult.MLE:
+            line += (
+                bg_color(32, 32, 64)
+                + f"        memory: {meta['memory']} KB"
+                + reset_color()
+            )
+        if "memprofile" in meta:
+            line += self.format_memprofile(meta["memprofile"])
+        if code != JudgeResult.AC and meta.get("transcript"):
+            # インタラクティブな問題のやりとり (> 解答の出力, < インタラクタの出力)
+            line += (
+                color(255, 255, 255)
+                + bg_color(32, 32, 32)
+                + "\nTranscript:\n"
+                + meta["transcript"].rstrip("\n")
+                + reset_color()
+            )
+        return line
+
+    @staticmethod
+    def median_time(case: CaseReport) -> float:
+        """
+        テストケースの実行時間の中央値 (繰り返し実行していなければその1回の時間) [sec]
+        """
+        return case.bench["time"]["median"] if case.bench is not None else case.time
+
+    @classmethod
+    def total_time(cls, report: JudgeReport) -> float:
+        """
+        全てのテストケースの実行時間の中央値の合計 [sec]
+        """
+        return sum(cls.median_time(case) for case in report.cases)
+
+    def format_comparison(
+        self,
+        problem: AtCoderProblem,
+        target_dir: Path,
+        reports: list[JudgeReport],
+        repeat: int,
+    ) -> str:
+        """
+        コマンドごとの判定結果を、コマンド × テストケースの表にする
+        同じコマンドが複数ある場合は、区別できるように何番目のコマンドかを付ける
+
+        Args:
+            problem (AtCoderProblem): 問題
+            target_dir (Path): テストしたディレクトリ
+            reports (list[JudgeReport]): コマンドごとの判定結果 (比べたコマンドの順番)
+            repeat (int): 各テストケースを実行した回数
+
+        Returns:
+            str: 表示用の文字列
+        """
+        names = [" ".join(report.command) for report in reports]
+        labels = [
+            name if names.count(name) == 1 else f"{name} (#{k + 1})"
+            for k, name in enumerate(names)
+        ]
+        passed = [k for k, report in enumerate(reports) if report.passed]
+        fastest = min(passed, key=lambda k: self.total_time(reports[k]), default=None)
+        numbers = sorted({case.number for r in reports for case in r.cases})
+        width = max(len(label) for label in labels) + 2
+        lines = [
+            color(255, 255, 255)
+            + "-" * 32
+            + " "
+            + problem.name
+            + " "
+            + "-" * 32
+            + f"\n- Execute Directory:  '{target_dir}'\n"
+            + f"- Time:               median of {repeat} runs [sec]\n"
+            + "-" * (len(problem.name) + 66)
+            + reset_color(),
+            " " * width
+            + "".join(f"{f'sample-{i}':>11}" for i in numbers)
+            + f"{'total':>11}",
+        ]
+        for k, report in enumerate(reports):
+            label = ("* " if k == fastest else "  ") + labels[k]
+            line = (
+                color(64, 255, 64) + label.ljust(width) + reset_color()
+                if k == fastest
+                else label.ljust(width)
+            )
+            cases = {case.number: case for case in report.cases}
+            for i in numbers:
+                if i not in cases:
+                    line += f"{'-':>11}"
+                    continue
+                case = cases[i]
                 line += (
-                    bg_color(32, 32, 64)
-                    + f"        time: {meta['time']:.2f} sec"
+                    "  "
+                    + VERDICT_COLORS[case.verdict]
+                    + f"{case.verdict.value:<3}"
                     + reset_color()
+                    + f"{self.median_time(case):6.3f}"
                 )
+            if report.error is not None:
+                line += color(255, 192, 128) + report.error.splitlines()[0][:80]
+                line += reset_color()
+            else:
+                line += f"{self.total_time(report):11.3f}"
             lines.append(line)
-
-        lines[-1].strip()
         lines.append(
             bg_color(32, 32, 32)
             + color(255, 255, 255)
-            + "-" * (len(problem.name) + 64 + 2)
+            + (
+                f' Fastest correct: "{labels[fastest]}" ({self.total_time(reports[fastest]):.3f} sec)'
+                if fastest is not None
+                else " No command passed all cases"
+            )
+            + reset_color()
+        )
+        return "\n".join(lines)
+
+    def format_matrix_row(
+        self, label: str, report: JudgeReport | None, reason: str | None = None
+    ) -> str:
+        """
+        問題1つの判定結果を表の1行にする (集計の後にテストケースごとの判定を並べる)
+
+        Args:
+            label (str): 問題の表示名
+            report (JudgeReport | None): 判定結果 (スキップした場合はNone)
+            reason (str | None, optional): スキップした理由. Defaults to None.
+
+        Returns:
+            str: 表示用の文字列
+        """
+        line = (
+            bg_color(32, 32, 32) + color(255, 255, 255) + f" {label} " + reset_color()
+        )
+        if report is None:
+            return line + color(128, 128, 128) + f" skipped ({reason})" + reset_color()
+        if report.error is not None:
+            return (
+                line
+                + color(255, 192, 128)
+                + f" {report.error.splitlines()[0][:80]}"
+                + reset_color()
+            )
+        summary = report.summary()
+        passed = summary["verdicts"].get(JudgeResult.AC.value, 0)
+        return (
+            line
+            + f" {passed:>3}/{summary['cases']:<3}"
+            + f" {summary['max_time']:6.2f} sec {summary['max_memory']:>8} KB  "
+            + " ".join(
+                VERDICT_COLORS[case.verdict]
+                + f"{case.verdict.value:<3}"
+                + reset_color()
+                for case in report.cases
+            )
+        )
+
+    def format_memprofile(self, report: MemoryProfile | None) -> str:
+        """
+        tracemallocで計測したメモリの使用状況を表示用の文字列にする
+
+        Args:
+            report (MemoryProfile | None): メモリの使用状況 (killされた場合はNone)
+
+        Returns:
+            str: 表示用の文字列 (改行から始まる)
+        """
+        if report is None:
+            return "\n    memory profile: not available (killed before the report)"
+        line = f"\n    peak traced memory: {report.peak // 1024} [KB]"
+        if not report.top:
+            line += "  (too many small objects to break down by line)"
+        for top in report.top:
+            line += (
+                f"\n    {top.size // 1024:>10} [KB]  {top.blocks:>9} blocks"
+                f"  {top.filename}:{top.lineno}"
+            )
+        return line
+
+    def format_profile(
+        self,
+        testcase_name: str,
+        profiler: Profiler,
+        input_testcase_file: Path,
+        timeout: float,
+        address_limit: int | None,
+    ) -> str:
+        """
+        テストケースをプロファイラの下で実行し、時間のかかった関数を表示用の文字列にする
+        プロファイルはテストケースの名前で実行ディレクトリに保存する (ex: sample-0.prof)
+
+        Args:
+            testcase_name (str): テストケースの名前
+            profiler (Profiler): Profilerのインスタンス
+            input_testcase_file (Path): 入力ファイル
+            timeout (float): この秒数を超えたら中断する
+            address_limit (int | None): アドレス空間の上限 [MB]
+
+        Returns:
+            str: 表示用の文字列
+        """
+        try:
+            result = profiler.profile(
+                input_testcase_file,
+                profiler.cd / testcase_name,
+                timeout=timeout,
+                address_limit=address_limit,
+            )
+        except (
+            Profiler.Exceptions.UnsupportedCommandError,
+            Profiler.Exceptions.ProfilerError,
+        ) as e:
+            return (
+                color(255, 192, 128) + f"Profile ({testcase_name}): {e}" + reset_color()
+            )
+        line = (
+            color(255, 255, 255)
+            + f"Profile ({testcase_name}, {result.tool}"
+            + (f", interrupted after {timeout:.1f} sec" if result.timed_out else "")
+            + f"): {result.profile_file}"
             + reset_color()
         )
-        for line in lines:
-            print(line)
+        for hot in result.hot:
+            line += f"\n    {hot.share * 100:5.1f}%"
+            if hot.self_time is not None:
+                line += f"  {hot.self_time:8.3f} sec  {hot.calls:>9} calls"
+            line += f"  {hot.name}"
+        return line
 
     def guess_directory(self, problem: AtCoderProblem) -> Path:
         """
@@ -629,7 +1826,6 @@ class AtCoder(WebService):
         submit_url = problem.contest.url + "/submit"
 
         self.get(submit_url)
-        self.wait(0.1)
 
         # 提出フォームを取得
         form: bs4.Tag = self.soup.find(
@@ -643,14 +1839,13 @@ class AtCoder(WebService):
             "csrf_token": csrf_token,
         }
         self.post(submit_url, data=data)
-        self.wait(1)
 
         submittion_result_url = problem.contest.url + "/submissions/me"
         # 提出結果のURL
         for i in range(12):  # 5秒 * 12 = 60秒待機
             # 5秒ごとに提出結果を取得
             self.get(submittion_result_url, use_cache=False)
-            latest = BeautifulSoup(self.response.text, self.parser)
+            latest = self.soup
             judge = latest.find("span", class_="label").attrs["title"]  # type: ignore
             status = [
                 td.text.strip() for td in latest.find_all("tr")[1].find_all("td")
@@ -0,0 +1,173 @@
+import itertools
+import os
+import threading
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from logging import getLogger
+from pathlib import Path
+from typing import Any, NamedTuple
+
+from acp.atcoder.checker import Checker
+from acp.atcoder.judge import JudgeResult, JudgeRunner
+
+logger = getLogger(__name__)
+
+
+__all__ = ["StressCase", "StressTester"]
+
+
+class StressCase(NamedTuple):
+    """
+    ランダムケース1つ分の結果
+    """
+
+    seed: int  # 生成器に渡したシード
+    input_file: Path  # 生成した入力
+    output_file: Path  # 愚直解の出力 (期待される出力)
+    code: JudgeResult  # 解答の判定結果
+    meta: dict[str, Any]  # JudgeRunnerの実行結果
+
+
+class StressTester:
+    """
+    生成器で作ったランダムな入力に対して、解答と愚直解の出力を比較するクラス
+    生成器にはシードがコマンドライン引数の最後に渡される (ex: python gen.py 42)
+    """
+
+    class Exceptions:
+        class CommandFailedError(Exception):
+            """
+            生成器か愚直解が異常終了した
+            """
+
+    def __init__(
+        self,
+        generator: list[str],
+        solution: list[str],
+        reference: list[str],
+        cd: Path,
+        checker: Checker | None = None,
+        timelimit: float = 2,
+        memory_limit: int | None = 1024,
+    ) -> None:
+        """
+        Args:
+            generator (list[str]): 入力の生成器の実行コマンド
+            solution (list[str]): 解答の実行コマンド
+            reference (list[str]): 愚直解の実行コマンド
+            cd (Path): 実行ディレクトリ
+            checker (Checker | None, optional): 出力の判定方法. Defaults to None (完全一致).
+            timelimit (float, optional): 解答の実行時間制限 [sec]. Defaults to 2.
+            memory_limit (int | None, optional): 解答のメモリ制限 [MB]. Defaults to 1024.
+
+        Examples:
+            >>> tester = StressTester(["python", "gen.py"], ["python", "main.py"], ["python", "naive.py"], Path("."))
+            >>> failed = tester.run(Path("/tmp/stress"), jobs=8)
+        """
+        self.generator = generator
+        self.cd = cd
+        self.solution = JudgeRunner(solution, cd, checker=checker)
+        self.reference = JudgeRunner(reference, cd)
+        self.timelimit = timelimit
+        self.memory_limit = memory_limit
+
+    def check(self, seed: int, work_dir: Path) -> StressCase:
+        """
+        シード1つ分の入力を生成し、解答を愚直解の出力で判定する
+
+        Args:
+            seed (int): 生成器に渡すシード
+            work_dir (Path): 入出力を書き出すディレクトリ
+
+        Returns:
+            StressCase: 判定結果
+        """
+        input_file = work_dir / f"{seed}.in"
+        output_file = work_dir / f"{seed}.out"
+        generated = JudgeRunner([*self.generator, str(seed)], self.cd).run(
+            os.devnull,
+            timeout=self.timelimit * 10,
+            stdout_file=input_file,
+        )
+        if generated.return_code != 0:
+            raise self.Exceptions.CommandFailedError(
+                f"Generator failed (seed={seed}, return code {generated.return_code}):\n{generated.stderr}"
+            )
+        expected = self.reference.run(
+            input_file,
+            timeout=self.timelimit * 10,  # 愚直解は遅くてもよい
+            stdout_file=output_file,
+        )
+        if expected.return_code != 0:
+            raise self.Exceptions.CommandFailedError(
+                f"Reference failed (seed={seed}, return code {expected.return_code}):\n{expected.stderr}"
+            )
+        code, meta = self.solution(
+            input_file,
+            output_file,
+            timelimit=self.timelimit,
+            memory_limit=self.memory_limit,
+        )
+        if code == JudgeResult.AC:
+            # 通ったケースは残さない
+            input_file.unlink()
+            output_file.unlink()
+        return StressCase(seed, input_file, output_file, code, meta)
+
+    def run(
+        self,
+        work_dir: Path,
+        jobs: int = 1,
+        start: int = 0,
+        max_cases: int | None = None,
+        on_progress: Callable[[int], None] | None = None,
+    ) -> StressCase | None:
+        """
+        シードを1つずつ増やしながら並列に判定し、最初に通らなかったケースを返す
+
+        Args:
+            work_dir (Path): 入出力を書き出すディレクトリ
+            jobs (int, optional): 並列数. Defaults to 1.
+            start (int, optional): 最初のシード. Defaults to 0.
+            max_cases (int | None, optional): 試すケース数の上限. Defaults to None (見つかるまで).
+            on_progress (Callable[[int], None] | None, optional): ケースを1つ判定するたびに、判定済みのケース数を渡して呼ぶ. Defaults to None.
+
+        Returns:
+            StressCase | None: 通らなかったケース (上限まで試して見つからなければNone)
+        """
+        seeds = itertools.count(start)
+        lock = threading.Lock()
+        stop = threading.Event()
+        failed: list[StressCase] = []
+        done = 0
+
+        def worker() -> None:
+            nonlocal done
+            while not stop.is_set():
+                with lock:
+                    seed = next(seeds)
+                    if max_cases is not None and seed >= start + max_cases:
+                        return
+                try:
+                    case = self.check(seed, work_dir)
+                except BaseException:
+                    stop.set()
+                    raise
+                with lock:
+                    done += 1
+                    if case.code != JudgeResult.AC:
+                        failed.append(case)
+                        stop.set()
+                    if on_progress is not None:
+                        on_progress(done)
+
+        with ThreadPoolExecutor(max_workers=jobs) as executor:
+            futures = [executor.submit(worker) for _ in range(jobs)]
+            try:
+                for future in futures:
+                    future.result()  # 生成器・愚直解のエラーを呼び出し側に伝える
+            finally:
+                stop.set()  # Ctrl-Cで中断されたときも他のスレッドを止める
+
+        # 並列に見つかった場合は、シードが小さい方を返す
+        return min(failed, key=lambda case: case.seed) if failed else None
@@ -0,0 +1,109 @@
+"""
+プログラムを起動するための常駐プロセス (acp.atcoder.preforkから起動される)
+
+テストするプログラムと同じインタプリタでスクリプトとして実行されるので、標準ライブラリ以外をimportしないこと
+
+usage: python worker.py <socket fd> [<module> ...]
+"""
+
+import importlib
+import json
+import os
+import resource
+import runpy
+import socket
+import sys
+import time
+import traceback
+from typing import Any, NoReturn
+
+
+def _run_script(request: dict[str, Any], fds: list[int]) -> NoReturn:
+    """
+    fork直後の子プロセスで、標準入出力を付け替えてPythonスクリプトを実行する
+    """
+    os.setsid()  # 子孫プロセスごとkillできるようにする
+    if request["address_limit"] is not None:
+        limit = request["address_limit"] * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    if request["output_limit"] is not None:
+        limit = request["output_limit"] + 1  # 1byteでも超えたら書き込みに失敗させる
+        resource.setrlimit(resource.RLIMIT_FSIZE, (limit, limit))
+    for target, fd in enumerate(fds):
+        os.dup2(fd, target)
+        os.close(fd)
+    os.chdir(request["cwd"])
+    # スクリプトの終了まで開いたままにする (閉じるのはos._exit)
+    sys.stdin = open(0, "r", closefd=False)  # noqa: SIM115
+    sys.stdout = open(1, "w", closefd=False)  # noqa: SIM115
+    sys.stderr = open(2, "w", closefd=False)  # noqa: SIM115
+    script = request["argv"][0]
+    sys.argv = request["argv"]
+    sys.path[0] = os.path.dirname(os.path.abspath(script))
+
+    code = 0
+    try:
+        runpy.run_path(script, run_name="__main__")
+    except SystemExit as e:
+        if e.code is None:
+            code = 0
+        elif isinstance(e.code, int):
+            code = e.code
+        else:
+            print(e.code, file=sys.stderr)
+            code = 1
+    except BaseException:  # noqa: BLE001 (解答の例外はREとして報告する)
+        traceback.print_exc()
+        code = 1
+    for stream in (sys.stdout, sys.stderr):
+        try:
+            stream.flush()
+        except BrokenPipeError:
+            pass
+    os._exit(code)
+
+
+def _send(sock: socket.socket, message: dict[str, Any]) -> None:
+    sock.sendall(json.dumps(message).encode() + b"\n")
+
+
+def serve(sock: socket.socket, modules: list[str]) -> None:
+    """
+    リクエストを受け取るたびにforkしてスクリプトを実行し、終了を待って結果を返す
+
+    Args:
+        sock (socket.socket): acpとの通信用のソケット
+        modules (list[str]): 事前にimportしておくモジュール
+    """
+    start = time.perf_counter()
+    # このファイルのディレクトリではなく、問題のディレクトリから探す
+    sys.path[0] = os.getcwd()
+    for module in modules:
+        importlib.import_module(module)
+    _send(sock, {"ready": True, "import_time": time.perf_counter() - start})
+
+    while True:
+        data, fds, _, _ = socket.recv_fds(sock, 1 << 16, 3)
+        if not data:
+            break  # acpが終了した
+        request = json.loads(data)
+        pid = os.fork()
+        if pid == 0:
+            sock.close()
+            _run_script(request, fds)
+        for fd in fds:
+            os.close(fd)
+        _send(sock, {"pid": pid})
+        _, status, rusage = os.wait4(pid, 0)
+        _send(
+            sock,
+            {
+                "return_code": os.waitstatus_to_exitcode(status),
+                "cpu_time": rusage.ru_utime + rusage.ru_stime,
+                "max_rss": rusage.ru_maxrss,
+            },
+        )
+
+
+if __name__ == "__main__":
+    serve(socket.socket(fileno=int(sys.argv[1])), sys.argv[2:])
@@ -1,9 +1,23 @@
 import argparse
 from pathlib import Path
+from typing import Any
 
+from acp.atcoder.checker import CHECKERS, make_checker
+from acp.atcoder.options import (
+    BenchOptions,
+    JudgeLimits,
+    ProfileOptions,
+    ReportOptions,
+)
+from acp.atcoder.scale import MIN_SIZES
 from acp.atcoder.service import AtCoder
 from acp.core.__version__ import __version__
-from acp.core.service import AtCoderProblems
+from acp.core.service import (
+    DOWNLOAD_BURST,
+    DOWNLOAD_JOBS,
+    DOWNLOAD_RATE,
+    AtCoderProblems,
+)
 
 # TODO: コンフィグファイルで設定できるようにする
 DEFAULT_EXEC_COMMAND = "python main.py"
@@ -11,6 +25,346 @@ DEFAULT_SUBMIT_FILE = "main.py"
 DEFAULT_SUBMIT_LANG = 5055
 
 
+def positive_int(value: str) -> int:
+    """
+    1以上の整数を受け取るargparseの型
+    """
+    n = int(value)
+    if n < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1: {value}")
+    return n
+
+
+def non_negative_int(value: str) -> int:
+    """
+    0以上の整数を受け取るargparseの型
+    """
+    n = int(value)
+    if n < 0:
+        raise argparse.ArgumentTypeError(f"must not be negative: {value}")
+    return n
+
+
+COMPARE_OPTIONS = ("jobs", "limits", "checker", "report")
+"""
+複数のコマンドを比べるとき (AtCoder.compare) にも渡すtestのオプション
+"""
+
+
+COMPARE_CONFLICTS = {
+    "watch": "--watch",
+    "scale": "--scale",
+    "interactor": "--interactor",
+    "profile": "--profile",
+    "memprofile": "--memprofile",
+    "build": "--build",
+    "prefork": "--prefork",
+    "fail_fast": "--fail-fast",
+    "cache": "--no-cache",
+    "bench_margin": "--bench-margin",
+}
+"""
+複数のコマンドを比べるときに使えないオプション (dest: オプション名)
+比べるときは毎回計測して全てのテストケースを実行し、中央値だけを表示するので、キャッシュや打ち切り、警告の設定は効かない
+"""
+
+
+def compare_conflict(
+    parser: argparse.ArgumentParser, args: argparse.Namespace
+) -> str | None:
+    """
+    複数のコマンドを比べるときに使えないオプションを探す
+
+    Args:
+        parser (argparse.ArgumentParser): デフォルト値を調べるパーサ
+        args (argparse.Namespace): oj test・testのコマンドライン引数
+
+    Returns:
+        str | None: デフォルト値から変えられていた使えないオプション (なければNone)
+    """
+    for dest, option in COMPARE_CONFLICTS.items():
+        if getattr(args, dest, None) != parser.get_default(dest):
+            return option
+    return None
+
+
+def test_options(
+    parser: argparse.ArgumentParser, args: argparse.Namespace
+) -> tuple[list[list[str]], dict[str, Any]]:
+    """
+    oj test・testのコマンドライン引数を確かめ、AtCoder.testに渡す引数を一度だけ組み立てる
+    不正な組み合わせの場合はparser.errorで終了する
+
+    Args:
+        parser (argparse.ArgumentParser): エラーを表示するパーサ
+        args (argparse.Namespace): oj test・testのコマンドライン引数
+
+    Returns:
+        tuple[list[list[str]], dict[str, Any]]: 実行コマンド (複数なら比べる), AtCoder.testに渡す引数
+    """
+    commands = [c.split() for c in args.command or [DEFAULT_EXEC_COMMAND]]
+    if len(commands) > 1 and (option := compare_conflict(parser, args)) is not None:
+        parser.error(f"{option} cannot be used with multiple --command")
+    if args.record_transcript and args.interactor is None:
+        parser.error("--record-transcript requires --interactor")
+    if args.scale is not None and len(set(args.sizes)) < MIN_SIZES:
+        parser.error(f"--sizes: at least {MIN_SIZES} different sizes are needed")
+    try:
+        report = (
+            ReportOptions(args.report[0], Path(args.report[1])) if args.report else None
+        )
+    except ValueError as e:
+        parser.error(f"--report: {e}")
+    return commands, {
+        "jobs": args.jobs,
+        "limits": JudgeLimits(
+            args.timelimit, args.memory_limit, args.output_limit, args.address_limit
+        ),
+        "checker": make_checker(args.checker, args.eps),
+        "build": args.build,
+        "build_command": args.build_command,
+        "prefork": args.prefork,
+        "bench": (
+            BenchOptions(args.bench, args.warmup, args.bench_margin)
+            if args.bench is not None
+            else None
+        ),
+        "cache": args.cache,
+        "interactor": args.interactor.split() if args.interactor else None,
+        "record_transcript": args.record_transcript,
+        "profile": ProfileOptions(args.profile, args.profile_top, args.memprofile),
+        "report": report,
+        "fail_fast": args.fail_fast,
+    }
+
+
+def test_parser() -> argparse.ArgumentParser:
+    """
+    oj testとtestで共通のオプションを持つ親のパーサを作る
+
+    Returns:
+        argparse.ArgumentParser: add_parserのparentsに渡すパーサ
+    """
+    parser = argparse.ArgumentParser(add_help=False)
+    parser.add_argument(
+        "--command",
+        "-c",
+        metavar="<Command>",
+        help=(
+            "Bind the command to test the solution. Tester will run"
+            "`<Command> **/sample-*.in **/sample-*.out`)"
+            f"ex: {DEFAULT_EXEC_COMMAND}"
+            "**/<Problem_DIR>/sample-*.in **/<Problem_DIR>/sample-*.out. "
+            "Repeat it to compare the commands on the same cases "
+            "(verdict and median time of --bench runs, default 3)"
+        ),
+        action="append",
+        default=None,
+    )
+    parser.add_argument(
+        "--jobs",
+        "-j",
+        metavar="<Jobs>",
+        help="The number of test cases to run concurrently. default: the number of CPU cores",
+        default=None,
+        type=int,
+    )
+    parser.add_argument(
+        "--timelimit",
+        "-t",
+        metavar="<Seconds>",
+        help="Time limit per test case. The process is killed shortly after it. default: 2",
+        default=2.0,
+        type=float,
+    )
+    parser.add_argument(
+        "--memory-limit",
+        "-m",
+        metavar="<MB>",
+        help="Memory limit per test case, compared with the peak RSS (MLE if exceeded). default: 1024",
+        default=1024,
+        type=int,
+    )
+    parser.add_argument(
+        "--address-limit",
+        metavar="<MB>",
+        help=(
+            "Also cap the virtual address space (RLIMIT_AS) of the solution. "
+            "JVM, Go and PyPy reserve much more than they use, so give it plenty of headroom. "
+            "default: no limit"
+        ),
+        default=None,
+        type=positive_int,
+    )
+    parser.add_argument(
+        "--output-limit",
+        metavar="<MB>",
+        help="Output size limit per test case (OLE if exceeded). default: 64",
+        default=64,
+        type=int,
+    )
+    parser.add_argument(
+        "--checker",
+        metavar="<Checker>",
+        help=(
+            "How to compare the output with the expected one. "
+            "exact: line by line, token: ignore whitespaces, "
+            "float: allow an absolute/relative error of --eps, "
+            "yesno: case-insensitive Yes/No. default: exact"
+        ),
+        choices=list(CHECKERS),
+        default="exact",
+    )
+    parser.add_argument(
+        "--eps",
+        metavar="<Epsilon>",
+        help="Allowed absolute/relative error for --checker float. default: 1e-6",
+        default=1e-6,
+        type=float,
+    )
+    parser.add_argument(
+        "--build",
+        "-b",
+        metavar="<Source File>",
+        help=(
+            "Build the source file (C/C++/Rust/Go) and test the binary. "
+            "The binary is cached and reused until the source or the build command changes."
+        ),
+        default=None,
+    )
+    parser.add_argument(
+        "--build-command",
+        metavar="<Build Command>",
+        help="The build command. {src} and {out} are replaced. ex: 'g++ -O2 -o {out} {src}'",
+        default=None,
+    )
+    parser.add_argument(
+        "--bench",
+        metavar="<Runs>",
+        help=(
+            "Run each test case this many times and show min/median/p95/stddev of the time. "
+            "Test cases run one by one unless --jobs is given."
+        ),
+        default=None,
+        type=positive_int,
+    )
+    parser.add_argument(
+        "--warmup",
+        metavar="<Runs>",
+        help="Discard this many runs before measuring with --bench. default: 0",
+        default=0,
+        type=non_negative_int,
+    )
+    parser.add_argument(
+        "--bench-margin",
+        metavar="<Ratio>",
+        help="Warn if the median time is within this ratio of the time limit. default: 0.1",
+        default=0.1,
+        type=float,
+    )
+    parser.add_argument(
+        "--scale",
+        metavar="<Generator Command>",
+        help=(
+            "Estimate the time complexity instead of testing the samples. "
+            "The generator is run as '<Generator Command> <size> <seed>' for each of --sizes "
+            "and the inputs are cached. ex: 'python gen.py'"
+        ),
+        default=None,
+    )
+    parser.add_argument(
+        "--sizes",
+        metavar="<Size>",
+        nargs="+",
+        help="Input sizes for --scale (at least 3 different sizes). default: 1000 10000 100000",
+        default=[1000, 10000, 100000],
+        type=positive_int,
+    )
+    parser.add_argument(
+        "--max-size",
+        metavar="<Size>",
+        help="The maximum size in the constraints. The time at this size is extrapolated with --scale.",
+        default=None,
+        type=int,
+    )
+    parser.add_argument(
+        "--no-cache",
+        help="Run all test cases even if neither the solution nor the test case has changed.",
+        dest="cache",
+        action="store_false",
+    )
+    parser.add_argument(
+        "--profile",
+        metavar="<Case>",
+        nargs="?",
+        const="slowest",
+        help=(
+            "Re-run a test case (default: the slowest one) under cProfile for Python, or perf otherwise, "
+            "show the hot functions and save the profile in the directory."
+        ),
+        default=None,
+    )
+    parser.add_argument(
+        "--profile-top",
+        metavar="<N>",
+        type=int,
+        help="The number of hot functions to show with --profile.",
+        default=10,
+    )
+    parser.add_argument(
+        "-x",
+        "--fail-fast",
+        help="Stop at the first test case that is not AC (cases already running are still shown).",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--report",
+        metavar=("<Format>", "<Path>"),
+        nargs=2,
+        help=(
+            "Also write the results to a file: 'json' for JSON Lines (one record per case and a summary) "
+            "or 'junit' for JUnit XML."
+        ),
+        default=None,
+    )
+    parser.add_argument(
+        "--memprofile",
+        help=(
+            "Run each case of a Python solution again with tracemalloc "
+            "and show the peak traced memory and the top allocating lines."
+        ),
+        action="store_true",
+    )
+    parser.add_argument(
+        "--interactor",
+        metavar="<Command>",
+        help=(
+            "Judge an interactive problem: connect the solution to this interactor, "
+            "run as '<Command> <input file>'. The interactor exits with 0 to accept."
+        ),
+        default=None,
+    )
+    parser.add_argument(
+        "--record-transcript",
+        help=(
+            "Relay the exchange between the solution and the interactor through acp "
+            "and show it for non-AC cases (slightly slower than the direct pipes)."
+        ),
+        action="store_true",
+    )
+    parser.add_argument(
+        "--prefork",
+        metavar="<Module>",
+        nargs="*",
+        help=(
+            "Keep a Python interpreter with these modules imported and fork it for each test case. "
+            "The interpreter startup and the imports are excluded from the measured time."
+        ),
+        default=None,
+    )
+    return parser
+
+
 def main() -> None:
     parser = argparse.ArgumentParser("AtCoder Problems command line tools")
     parser.add_argument(
@@ -61,23 +415,13 @@ def main() -> None:
         ),
         default=DEFAULT_EXEC_COMMAND,
     )
+    test_parent = test_parser()  # oj testとtestで共通のオプション
     oj_t = oj_parsers.add_parser(
         "test",
         description="Test the solution",
         help="Require the file to test",
         aliases=["t"],
-    )
-    oj_t.add_argument(
-        "--command",
-        "-c",
-        metavar="<Command>",
-        help=(
-            "Bind the command to test the solution. Tester will run"
-            "`<Command> **/sample-*.in **/sample-*.out`)"
-            f"ex: {DEFAULT_EXEC_COMMAND}"
-            "**/<Problem_DIR>/sample-*.in **/<Problem_DIR>/sample-*.out"
-        ),
-        default=DEFAULT_EXEC_COMMAND,
+        parents=[test_parent],
     )
     oj_s = oj_parsers.add_parser(
         "submit",
@@ -111,12 +455,33 @@ def main() -> None:
         atc.download_problem(p)
 
     def oj_test_hook(args: argparse.Namespace) -> None:
-        atc = AtCoderProblems().login_atcoder(args.directory)
+        commands, options = test_options(oj_t, args)
+        # 問題ページを読むだけなのでログインは確かめない
+        atc = AtCoderProblems().atcoder()
         p = atc.get_problem(args.url)
-        atc.test(p, command=args.command.split())
+        if len(commands) > 1:
+            atc.compare(
+                p,
+                commands=commands,
+                bench=BenchOptions(args.bench or 3, args.warmup),
+                **{key: options[key] for key in COMPARE_OPTIONS},
+            )
+            return
+        if args.scale is not None:
+            atc.scale(
+                p,
+                generator=args.scale.split(),
+                sizes=args.sizes,
+                max_size=args.max_size,
+                command=commands[0],
+                limits=options["limits"],
+            )
+            return
+        atc.test(p, command=commands[0], **options)
 
     def oj_run_hook(args: argparse.Namespace) -> None:
-        atc = AtCoderProblems().login_atcoder(args.directory)
+        # 問題ページを読むだけなのでログインは確かめない
+        atc = AtCoderProblems().atcoder()
         p = atc.get_problem(args.url)
         atc.run(p, command=args.command.split())
 
@@ -151,11 +516,42 @@ def main() -> None:
             default: currnet directory ({Path.cwd() / '<Virtual Contest Name>'})",
         default=Path.cwd(),
     )
+    d.add_argument(
+        "--jobs",
+        "-j",
+        metavar="<Jobs>",
+        help=f"The number of problems to download concurrently. default: {DOWNLOAD_JOBS}",
+        default=DOWNLOAD_JOBS,
+        type=int,
+    )
+    d.add_argument(
+        "--rate",
+        metavar="<Requests/sec>",
+        help=(
+            "Sustained number of requests per second to atcoder.jp, shared by all jobs. "
+            f"default: {DOWNLOAD_RATE}"
+        ),
+        default=DOWNLOAD_RATE,
+        type=float,
+    )
+    d.add_argument(
+        "--burst",
+        metavar="<Requests>",
+        help=f"The number of requests allowed at once before --rate applies. default: {DOWNLOAD_BURST}",
+        default=DOWNLOAD_BURST,
+        type=int,
+    )
 
     def download_hook(args: argparse.Namespace) -> None:
+        if args.rate <= 0 or args.burst < 1:
+            d.error("--rate must be positive and --burst must be at least 1")
         contest = acp.get_contest(args.url)
         acp.download_problems(
-            contest, Path(args.directory).resolve() / contest.info.title
+            contest,
+            Path(args.directory).resolve() / contest.info.title,
+            jobs=args.jobs,
+            rate=args.rate,
+            burst=args.burst,
         )
 
     d.set_defaults(func=download_hook)
@@ -202,37 +598,179 @@ def main() -> None:
         description="Test the solution",
         help="Require the file to test",
         aliases=["t"],
+        parents=[test_parent],
     )
     t.add_argument(
         "problem",
         metavar="<Problem Index> OR <Problem ID>",
         help=" (Allow ambiguous input)\n  The problem index or ID to test. (ex: if the directory is '01-abc001_a', \
-            the problem index is '01' and the problem ID is 'abc001_a')",
+            the problem index is '01' and the problem ID is 'abc001_a')\n  'all' or a wildcard pattern \
+            (ex: '*_a') tests every matching problem and shows a summary table",
+    )
+    t.add_argument(
+        "--directory",
+        "-d",
+        metavar="<Directory Path>",
+        help="The directory of the contest",
+        default=None,
     )
     t.add_argument(
+        "--watch",
+        "-w",
+        help=(
+            "Keep running and re-test whenever a file in the problem directory changes. "
+            "Changed and previously failed test cases run first."
+        ),
+        action="store_true",
+    )
+
+    def test_hook(args: argparse.Namespace) -> None:
+        commands, options = test_options(t, args)
+        if acp.is_pattern(args.problem):
+            # 全ての問題をまとめてテストする (問題ごとの詳しい表示はしない)
+            if len(commands) > 1:
+                t.error(f"Multiple --command cannot be used with '{args.problem}'")
+            for option in ("watch", "scale", "interactor", "profile", "memprofile"):
+                if getattr(args, option):
+                    t.error(
+                        f"--{option} cannot be used with '{args.problem}' (test one problem)"
+                    )
+            acp.test_all(args.problem, commands[0], args.directory, **options)
+            return
+        if len(commands) > 1:
+            acp.compare(
+                args.problem,
+                commands,
+                args.directory,
+                bench=BenchOptions(args.bench or 3, args.warmup),
+                **{key: options[key] for key in COMPARE_OPTIONS},
+            )
+            return
+        if args.scale is not None:
+            acp.scale(
+                args.problem,
+                commands[0],
+                args.directory,
+                generator=args.scale.split(),
+                sizes=args.sizes,
+                max_size=args.max_size,
+                limits=options["limits"],
+            )
+            return
+        (acp.watch if args.watch else acp.test)(
+            args.problem, commands[0], args.directory, **options
+        )
+
+    t.set_defaults(func=test_hook)
+
+    st = subparsers.add_parser(
+        "stress",
+        description="Compare the solution with a naive reference on randomly generated inputs",
+        help="Require the problem, the generator and the reference",
+    )
+    st.add_argument(
+        "problem",
+        metavar="<Problem Index> OR <Problem ID>",
+        help="The problem index or ID to test. (Allow ambiguous input)",
+    )
+    st.add_argument(
+        "--generator",
+        "-g",
+        metavar="<Generator Command>",
+        help="The command to generate an input. The seed is passed as the last argument. ex: 'python gen.py'",
+        required=True,
+    )
+    st.add_argument(
+        "--reference",
+        "-r",
+        metavar="<Reference Command>",
+        help="The command of the naive (but correct) solution. ex: 'python naive.py'",
+        required=True,
+    )
+    st.add_argument(
         "--command",
         "-c",
         metavar="<Command>",
-        help=(
-            "Bind the command to test the solution. Tester will run"
-            "`<Command> **/sample-*.in **/sample-*.out`)"
-            f"ex: {DEFAULT_EXEC_COMMAND}"
-            "**/<Problem_DIR>/sample-*.in **/<Problem_DIR>/sample-*.out"
-        ),
+        help=f"The command of the solution to test. default: {DEFAULT_EXEC_COMMAND}",
         default=DEFAULT_EXEC_COMMAND,
     )
-    t.add_argument(
+    st.add_argument(
         "--directory",
         "-d",
         metavar="<Directory Path>",
         help="The directory of the contest",
         default=None,
     )
+    st.add_argument(
+        "--jobs",
+        "-j",
+        metavar="<Jobs>",
+        help="The number of cases to run concurrently. default: the number of CPU cores",
+        default=None,
+        type=int,
+    )
+    st.add_argument(
+        "--count",
+        "-n",
+        metavar="<Cases>",
+        help="Stop after this many cases. default: run until a failing case is found",
+        default=None,
+        type=int,
+    )
+    st.add_argument(
+        "--seed",
+        metavar="<Seed>",
+        help="The first seed. default: 0",
+        default=0,
+        type=int,
+    )
+    st.add_argument(
+        "--timelimit",
+        "-t",
+        metavar="<Seconds>",
+        help="Time limit of the solution per case. default: 2",
+        default=2.0,
+        type=float,
+    )
+    st.add_argument(
+        "--memory-limit",
+        "-m",
+        metavar="<MB>",
+        help="Memory limit of the solution per case. default: 1024",
+        default=1024,
+        type=int,
+    )
+    st.add_argument(
+        "--checker",
+        metavar="<Checker>",
+        help="How to compare the output with the reference one. default: exact",
+        choices=list(CHECKERS),
+        default="exact",
+    )
+    st.add_argument(
+        "--eps",
+        metavar="<Epsilon>",
+        help="Allowed absolute/relative error for --checker float. default: 1e-6",
+        default=1e-6,
+        type=float,
+    )
 
-    def test_hook(args: argparse.Namespace) -> None:
-        acp.test(args.problem, args.command.split(), args.directory)
+    def stress_hook(args: argparse.Namespace) -> None:
+        acp.stress(
+            args.problem,
+            args.command.split(),
+            args.directory,
+            generator=args.generator.split(),
+            reference=args.reference.split(),
+            jobs=args.jobs,
+            timelimit=args.timelimit,
+            memory_limit=args.memory_limit,
+            checker=make_checker(args.checker, args.eps),
+            max_cases=args.count,
+            seed=args.seed,
+        )
 
-    t.set_defaults(func=test_hook)
+    st.set_defaults(func=stress_hook)
 
     s = subparsers.add_parser(
         "submit",
@@ -1,17 +1,22 @@
+import fnmatch
 import getpass
 import json
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from logging import getLogger
 from pathlib import Path
 from typing import Any
 
 from acp.atcoder.models import AtCoderProblem
+from acp.atcoder.report import JudgeReport
 from acp.atcoder.service import AtCoder
 from acp.core.models import (
     AtCoderProblemsAPIResponse,
     AtCoderProblemsInnerProblem,
     AtCoderProblemsMetadata,
 )
+from acp.general.ratelimit import HostRateLimiter
 from acp.general.service import WebService
 from acp.general.utils import confirm_yn_input
 
@@ -19,6 +24,21 @@ from acp.general.utils import confirm_yn_input
 
 logger = getLogger(__name__)
 
+DOWNLOAD_JOBS = 4
+"""
+並行してダウンロードする問題数のデフォルト
+"""
+
+DOWNLOAD_RATE = 2.0
+"""
+ダウンロード中のatcoder.jpへの持続的なリクエスト数のデフォルト [回/sec]
+"""
+
+DOWNLOAD_BURST = 4
+"""
+ダウンロード中に待たずに続けて送れるリクエスト数のデフォルト
+"""
+
 
 class AtCoderProblems(WebService):
     """
@@ -49,11 +69,18 @@ class AtCoderProblems(WebService):
         # print(f"Detected Session directory: {self._session_dir}")
         self.problems_metadata: dict[str, AtCoderProblemsMetadata] = {}
 
+    def atcoder(self) -> AtCoder:
+        """
+        ログインを確かめずにAtCoderのクライアントを作る (保存したセッションは使う)
+        問題ページを読むだけの場合 (テストなど) に使うと、ログインの確認のための通信をしない
+        """
+        return AtCoder(session_dir=self._session_dir)
+
     def login_atcoder(self, root_dir: Path, retry_count: int = 3) -> AtCoder:
         """
         AtCoderにログインする
         """
-        atcoder_client = AtCoder(session_dir=self._session_dir)
+        atcoder_client = self.atcoder()
         if atcoder_client.is_logged_in:
             return atcoder_client
 
@@ -158,11 +185,9 @@ class AtCoderProblems(WebService):
             return {x["id"]: AtCoderProblemsMetadata(**x) for x in cache}
         else:
             # キャッシュがなければAPIから取得 (巨大)
-            self.get(url)
-            metadata = {
-                x["id"]: AtCoderProblemsMetadata(**x) for x in self.response.json()
-            }
-            self.write_cache(cache_dir, self.response.json(), "metadata.json")
+            problems = self.get(url).json()  # 巨大なのでJSONとして1回だけ読む
+            metadata = {x["id"]: AtCoderProblemsMetadata(**x) for x in problems}
+            self.write_cache(cache_dir, problems, "metadata.json")
             return metadata
 
     def get_contest(self, url: str) -> AtCoderProblemsAPIResponse:
@@ -212,13 +237,22 @@ class AtCoderProblems(WebService):
         self,
         contest_data: AtCoderProblemsAPIResponse,
         target_dir: Path | str | None = None,
+        jobs: int = DOWNLOAD_JOBS,
+        rate: float = DOWNLOAD_RATE,
+        burst: int = DOWNLOAD_BURST,
     ) -> None:
         """
         問題をダウンロードする
 
+        jobs個のスレッドで並行してダウンロードし、atcoder.jpへのリクエストは全体で1つのトークンバケットで制限する
+        info.jsonは終わった順ではなく、コンテストの問題の順に書き出す
+
         Args:
             contest_data (AtCoderProblemsAPIResponse): AtCoder Problemsのコンテスト情報
             target_dir (Path | str | None): ダウンロード先ディレクトリ
+            jobs (int, optional): 並行してダウンロードする問題数. Defaults to DOWNLOAD_JOBS.
+            rate (float, optional): atcoder.jpへの持続的なリクエスト数 [回/sec]. Defaults to DOWNLOAD_RATE.
+            burst (int, optional): 待たずに続けて送れるリクエスト数. Defaults to DOWNLOAD_BURST.
         """
         if target_dir is None:
             target_dir = (
@@ -230,26 +264,43 @@ class AtCoderProblems(WebService):
             "Do you want to download problems in this directory? [y/n]: "
         ):
             atcoder = self.login_atcoder(self.guess_cache_dir().parent)
+            # 全てのスレッド (と同時に動いている他のacp) で1つのバケットを共有する (設定が違えば厳しい方に合わせる)
+            atcoder.rate_limiter = HostRateLimiter(
+                rate, burst, self._session_dir / "ratelimit"
+            )
 
             target_dir.mkdir(parents=True, exist_ok=True)
-            problems = {}
-            for i, problem in enumerate(contest_data.problems):
+            local = threading.local()
+
+            def download(
+                i: int, problem: AtCoderProblemsInnerProblem
+            ) -> dict[str, Any]:
+                client: AtCoder | None = getattr(local, "atcoder", None)
+                if client is None:
+                    # 取得中のページはクライアントが持っているので、スレッドごとに分ける
+                    client = local.atcoder = atcoder.fork()
                 # 問題のメタデータを取得して、問題をダウンロード
                 metadata = self.problems_metadata[problem.id]
                 problem_dir = target_dir / f"{i:02d}-{metadata.id}"
                 problem_dir.mkdir(parents=True, exist_ok=True)
 
-                problem_data = atcoder.get_problem(metadata.url)
+                problem_data = client.get_problem(metadata.url)
 
-                problems[problem_data.name] = (
-                    problem_data.model_dump()
-                )  # pydanticのモデルをdictに変換
-                problems[problem_data.name]["root_dir"] = str(
-                    problem_dir.relative_to(target_dir)
-                )
-                atcoder.download_problem(problem_data, problem_dir)
+                data = problem_data.model_dump()  # pydanticのモデルをdictに変換
+                data["root_dir"] = str(problem_dir.relative_to(target_dir))
+                client.download_problem(problem_data, problem_dir)
                 print(f"Downloaded {metadata.id} to {problem_dir}")
-                self.wait(0.1)
+                return data
+
+            with ThreadPoolExecutor(max_workers=max(1, jobs)) as executor:
+                futures = [
+                    executor.submit(download, i, problem)
+                    for i, problem in enumerate(contest_data.problems)
+                ]
+                problems = {}
+                for future in futures:
+                    data = future.result()
+                    problems[data["name"]] = data
 
             root_dir = self.guess_cache_dir()  # キャッシュディレクトリの推測
             self.write_cache(
@@ -308,12 +359,16 @@ class AtCoderProblems(WebService):
 
             return AtCoderProblem(**problem_data)
 
-    def run(
-        self,
-        name: str,
-        command: list[str] = ["python", "main.py"],
-        target_dir: Path | str | None = None,
-    ) -> None:
+    def locate_contest(self, target_dir: Path | str | None = None) -> tuple[Path, Path]:
+        """
+        コンテストのディレクトリを探す
+
+        Args:
+            target_dir (Path | str | None, optional): コンテストのディレクトリ. Defaults to None (キャッシュから決める).
+
+        Returns:
+            tuple[Path, Path]: ルートディレクトリ, コンテストのディレクトリ (info.jsonがあることは確認済み)
+        """
         cache_path = self.guess_cache_dir()
         root_dir = cache_path.parent
         cache = self.read_cache(cache_path)
@@ -329,7 +384,60 @@ class AtCoderProblems(WebService):
             raise self.AtCoderProblemsExceptions.ProblemsNotFoundError(
                 f"Failed to find problems in {directory}"
             )
-        target_problem = self.guess_problem(name, info_file)
+        return root_dir, directory
+
+    def locate_problem(
+        self, name: str, target_dir: Path | str | None = None
+    ) -> tuple[Path, Path, AtCoderProblem]:
+        """
+        コンテストのディレクトリから問題を推測する
+
+        Args:
+            name (str): 問題名 or インデックス
+            target_dir (Path | str | None, optional): コンテストのディレクトリ. Defaults to None (キャッシュから決める).
+
+        Returns:
+            tuple[Path, Path, AtCoderProblem]: ルートディレクトリ, コンテストのディレクトリ, 問題
+        """
+        root_dir, directory = self.locate_contest(target_dir)
+        target_problem = self.guess_problem(name, directory / "info.json")
+        return root_dir, directory, target_problem
+
+    @staticmethod
+    def is_pattern(key: str) -> bool:
+        """
+        問題のキーが複数の問題を指すパターン ("all" またはワイルドカードを含む) か
+        """
+        return key == "all" or any(c in key for c in "*?[")
+
+    def find_problems(self, pattern: str, info_file: Path) -> list[AtCoderProblem]:
+        """
+        パターンに当てはまる問題をinfo.jsonの順に返す
+
+        Args:
+            pattern (str): "all" または問題名・ディレクトリ名に対するワイルドカード (ex: "*_a", "0?-*")
+            info_file (Path): 問題情報ファイル
+
+        Returns:
+            list[AtCoderProblem]: 問題
+        """
+        with info_file.open("r") as f:
+            data = json.load(f)
+        return [
+            AtCoderProblem(**problem_data)
+            for key, problem_data in data.items()
+            if pattern == "all"
+            or fnmatch.fnmatchcase(key, pattern)
+            or fnmatch.fnmatchcase(problem_data["root_dir"], pattern)
+        ]
+
+    def run(
+        self,
+        name: str,
+        command: list[str] = ["python", "main.py"],
+        target_dir: Path | str | None = None,
+    ) -> None:
+        root_dir, directory, target_problem = self.locate_problem(name, target_dir)
         self.login_atcoder(root_dir).run(
             problem=target_problem,
             target_dir=directory / target_problem.root_dir,
@@ -341,28 +449,170 @@ class AtCoderProblems(WebService):
         name: str,
         command: list[str] = ["python", "main.py"],
         target_dir: Path | str | None = None,
-    ) -> None:
-        cache_path = self.guess_cache_dir()
-        root_dir = cache_path.parent
-        cache = self.read_cache(cache_path)
-        directory = root_dir / cache["target_dir"] if target_dir is None else target_dir
-        directory = Path(directory)
-        if not directory.exists():
-            raise self.AtCoderProblemsExceptions.ProblemsNotFoundError(
-                f"Failed to find problems in {directory}"
-            )
+        **kwargs: Any,
+    ) -> JudgeReport:
+        """
+        問題を推測してテストする
 
-        info_file = directory / "info.json"
-        if not info_file.exists():
+        Args:
+            name (str): 問題名 or インデックス
+            command (list[str], optional): 実行コマンド. Defaults to ["python", "main.py"].
+            target_dir (Path | str | None, optional): コンテストのディレクトリ. Defaults to None.
+            **kwargs (Any): AtCoder.testに渡す引数 (jobs, limits, bench など)
+
+        Returns:
+            JudgeReport: テストケースごとの判定結果
+
+        Examples:
+            >>> report = acp.test("a", quiet=True)
+            >>> report.passed, report.summary()["max_time"]
+        """
+        _, directory, target_problem = self.locate_problem(name, target_dir)
+        # テストにはログインは不要
+        return self.atcoder().test(
+            target_problem,
+            target_dir=directory / target_problem.root_dir,
+            command=command,
+            **kwargs,
+        )
+
+    def test_all(
+        self,
+        pattern: str = "all",
+        command: list[str] | None = None,
+        target_dir: Path | str | None = None,
+        **kwargs: Any,
+    ) -> dict[str, JudgeReport | None]:
+        """
+        パターンに当てはまる問題をまとめてテストし、問題ごとの判定結果を表にして表示する
+
+        Args:
+            pattern (str, optional): "all" または問題名・ディレクトリ名のワイルドカード. Defaults to "all".
+            command (list[str] | None, optional): 実行コマンド. Defaults to None (["python", "main.py"]).
+            target_dir (Path | str | None, optional): コンテストのディレクトリ. Defaults to None.
+            **kwargs (Any): AtCoder.test_manyに渡す引数 (jobs, limits, report など)
+
+        Returns:
+            dict[str, JudgeReport | None]: 問題名ごとの判定結果 (解答のファイルがなくスキップした問題はNone)
+
+        Examples:
+            >>> reports = acp.test_all("all", jobs=8)
+            >>> reports = acp.test_all("*_a")  # only the A problems
+        """
+        _, directory = self.locate_contest(target_dir)
+        problems = self.find_problems(pattern, directory / "info.json")
+        if not problems:
             raise self.AtCoderProblemsExceptions.ProblemsNotFoundError(
-                f"Failed to find problems in {directory}"
+                f"No problems match {pattern} in {directory / 'info.json'}"
             )
-        target_problem = self.guess_problem(name, info_file)
+        # テストにはログインは不要
+        return self.atcoder().test_many(
+            [(problem, directory / problem.root_dir) for problem in problems],
+            command=command,
+            **kwargs,
+        )
+
+    def compare(
+        self,
+        name: str,
+        commands: list[list[str]],
+        target_dir: Path | str | None = None,
+        **kwargs: Any,
+    ) -> list[JudgeReport]:
+        """
+        問題を推測し、複数の解答 (実行コマンド) を同じテストケースで比べる
+
+        Args:
+            name (str): 問題名 or インデックス
+            commands (list[list[str]]): 比べる実行コマンド
+            target_dir (Path | str | None, optional): コンテストのディレクトリ. Defaults to None.
+            **kwargs (Any): AtCoder.compareに渡す引数 (jobs, bench, limits など)
+
+        Returns:
+            list[JudgeReport]: コマンドごとの判定結果 (commandsと同じ順番)
+
+        Examples:
+            >>> acp.compare("a", [["python", "main.py"], ["pypy3", "main.py"], ["./a.out"]])
+        """
+        _, directory, target_problem = self.locate_problem(name, target_dir)
+        return self.atcoder().compare(
+            target_problem,
+            target_dir=directory / target_problem.root_dir,
+            commands=commands,
+            **kwargs,
+        )
 
-        self.login_atcoder(root_dir).test(
+    def watch(
+        self,
+        name: str,
+        command: list[str] | None = None,
+        target_dir: Path | str | None = None,
+        **kwargs: Any,
+    ) -> None:
+        """
+        問題を推測し、ファイルが変更されるたびにテストし直す
+        問題の推測は最初に一度だけ行う
+
+        Args:
+            name (str): 問題名 or インデックス
+            command (list[str] | None, optional): 実行コマンド. Defaults to None (["python", "main.py"]).
+            target_dir (Path | str | None, optional): コンテストのディレクトリ. Defaults to None.
+            **kwargs (Any): AtCoder.testに渡す引数 (jobs, limits, bench など)
+        """
+        _, directory, target_problem = self.locate_problem(name, target_dir)
+        self.atcoder().watch(
+            target_problem,
+            target_dir=directory / target_problem.root_dir,
+            command=command or ["python", "main.py"],
+            **kwargs,
+        )
+
+    def stress(
+        self,
+        name: str,
+        command: list[str] | None = None,
+        target_dir: Path | str | None = None,
+        **kwargs: Any,
+    ) -> None:
+        """
+        問題を推測してストレステストする (AtCoderへのログインは不要)
+
+        Args:
+            name (str): 問題名 or インデックス
+            command (list[str] | None, optional): 実行コマンド. Defaults to None (["python", "main.py"]).
+            target_dir (Path | str | None, optional): コンテストのディレクトリ. Defaults to None.
+            **kwargs (Any): AtCoder.stressに渡す引数 (generator, reference, jobs など)
+        """
+        _, directory, target_problem = self.locate_problem(name, target_dir)
+        self.atcoder().stress(
+            target_problem,
+            target_dir=directory / target_problem.root_dir,
+            command=command,
+            **kwargs,
+        )
+
+    def scale(
+        self,
+        name: str,
+        command: list[str] | None = None,
+        target_dir: Path | str | None = None,
+        **kwargs: Any,
+    ) -> None:
+        """
+        問題を推測して計算量を推定する (AtCoderへのログインは不要)
+
+        Args:
+            name (str): 問題名 or インデックス
+            command (list[str] | None, optional): 実行コマンド. Defaults to None (["python", "main.py"]).
+            target_dir (Path | str | None, optional): コンテストのディレクトリ. Defaults to None.
+            **kwargs (Any): AtCoder.scaleに渡す引数 (generator, sizes, max_size など)
+        """
+        _, directory, target_problem = self.locate_problem(name, target_dir)
+        self.atcoder().scale(
             target_problem,
             target_dir=directory / target_problem.root_dir,
             command=command,
+            **kwargs,
         )
 
     def submit(
@@ -0,0 +1,306 @@
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from collections.abc import Sequence
+from logging import getLogger
+from pathlib import Path
+from typing import NamedTuple
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+logger = getLogger(__name__)
+
+
+__all__ = ["CacheStats", "CachedResponse", "HttpCache", "MemoryCache"]
+
+# 保存するレスポンスヘッダー (再検証と本文の解釈に必要なものだけ)
+_HEADERS = ("Content-Type", "ETag", "Last-Modified")
+
+
+class CachedResponse(NamedTuple):
+    """
+    ディスクに保存したGETのレスポンス
+    """
+
+    url: str  # クエリを含むURL
+    body: bytes
+    headers: dict[str, str]  # Content-Type, ETag, Last-Modified のうちあったもの
+    encoding: str | None
+    stored: float  # 保存 (または再検証) した時刻 [UNIX時間]
+    identity: str = ""  # 取得したときのログインの識別子 (ログインしていなければ空)
+
+    @property
+    def age(self) -> float:
+        """
+        保存 (または再検証) してからの経過時間 [sec]
+        """
+        return time.time() - self.stored
+
+    def validators(self) -> dict[str, str]:
+        """
+        再検証のための条件付きリクエストのヘッダー (検証に使える情報がなければ空)
+        """
+        headers = {}
+        if "ETag" in self.headers:
+            headers["If-None-Match"] = self.headers["ETag"]
+        if "Last-Modified" in self.headers:
+            headers["If-Modified-Since"] = self.headers["Last-Modified"]
+        return headers
+
+    def to_response(self) -> requests.Response:
+        """
+        requests.Responseに戻す (.text, .json() などが使える)
+        """
+        response = requests.Response()
+        response.status_code = 200
+        response.url = self.url
+        response._content = self.body
+        response.headers = CaseInsensitiveDict(self.headers)
+        response.encoding = self.encoding
+        return response
+
+
+class CacheStats(NamedTuple):
+    """
+    メモリ上のキャッシュの統計
+    """
+
+    hits: int
+    misses: int
+    entries: int
+    size: int  # 圧縮した本文の合計 [byte]
+
+    @property
+    def hit_rate(self) -> float:
+        return self.hits / (self.hits + self.misses) if self.hits + self.misses else 0.0
+
+
+class MemoryCache:
+    """
+    レスポンスをメモリに置くLRUキャッシュ (スレッドセーフ)
+
+    本文はzlibで圧縮したバイト列で持ち (パースしたBeautifulSoupは持たない)、
+    圧縮後の合計サイズとエントリ数のどちらかが上限を超えたら、最も長く使っていないものから捨てる
+    """
+
+    def __init__(self, max_bytes: int = 16 << 20, max_entries: int = 256) -> None:
+        """
+        Args:
+            max_bytes (int, optional): 圧縮した本文の合計サイズの上限 [byte]. Defaults to 16 MiB.
+            max_entries (int, optional): エントリ数の上限. Defaults to 256.
+
+        Examples:
+            >>> memory = MemoryCache(max_bytes=1 << 20, max_entries=64)
+            >>> memory.put(cached)
+            >>> memory.get(cached.url, cached.identity)  # CachedResponse with the decompressed body
+            >>> memory.stats  # CacheStats(hits=1, misses=0, entries=1, size=...)
+        """
+        if max_bytes < 0 or max_entries < 0:
+            raise ValueError(
+                f"Invalid cache size: max_bytes={max_bytes}, max_entries={max_entries}"
+            )
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self._entries: OrderedDict[tuple[str, str], CachedResponse] = OrderedDict()
+        self._size = 0
+        self._hits = 0
+        self._misses = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(self._hits, self._misses, len(self._entries), self._size)
+
+    def get(self, url: str, identity: str = "") -> CachedResponse | None:
+        """
+        URLのレスポンスを取り出す (本文は展開して返す, なければNone)
+        ログインの識別子が違うものは別のレスポンスとして扱う
+        """
+        with self._lock:
+            entry = self._entries.get((url, identity))
+            if entry is None:
+                self._misses += 1
+                return None
+            self._entries.move_to_end((url, identity))
+            self._hits += 1
+        return entry._replace(body=zlib.decompress(entry.body))
+
+    def put(self, cached: CachedResponse) -> None:
+        """
+        レスポンスを置く (同じURLとログインの識別子のものは置き換える)
+        """
+        entry = cached._replace(body=zlib.compress(cached.body, 1))
+        key = (cached.url, cached.identity)
+        with self._lock:
+            self._discard(key)
+            if len(entry.body) > self.max_bytes or self.max_entries == 0:
+                return  # 1つで上限を超えるものは置かない
+            self._entries[key] = entry
+            self._size += len(entry.body)
+            while len(self._entries) > self.max_entries or self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted.body)
+
+    def touch(self, cached: CachedResponse) -> None:
+        """
+        置いてあるレスポンスの保存時刻を更新する
+        """
+        key = (cached.url, cached.identity)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries[key] = entry._replace(stored=cached.stored)
+                self._entries.move_to_end(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def _discard(self, key: tuple[str, str]) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._size -= len(entry.body)
+
+
+class HttpCache:
+    """
+    GETのレスポンスをディスクに保存するキャッシュ
+
+    URLのパターンごとに有効期間 (TTL) を決める
+    有効期間内なら通信せずに保存したレスポンスを使い、過ぎていればETag / Last-Modifiedで再検証する (304なら本文は保存したものを使う)
+    プロセスをまたいで使えるように、`<ディレクトリ>/<URLのハッシュ>.json` (メタデータ) と `.body` (本文) に保存する
+    ログインの前後やユーザーによって内容が変わるページを混ぜないように、ログインの識別子ごとに分けて保存する
+    最近使ったものはメモリ (MemoryCache) にも置き、ディスクを読まずに返す
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        ttls: Sequence[tuple[str, float | None]] | None = None,
+        default_ttl: float | None = None,
+        memory: MemoryCache | None = None,
+    ) -> None:
+        """
+        Args:
+            directory (Path): 保存先のディレクトリ
+            ttls (Sequence[tuple[str, float | None]] | None, optional): URLの正規表現と有効期間 [sec] (最初に一致したものを使う). Defaults to None.
+                有効期間が0なら毎回再検証し、Noneなら保存しない
+            default_ttl (float | None, optional): どのパターンにも一致しないURLの有効期間. Defaults to None (保存しない).
+            memory (MemoryCache | None, optional): ディスクの前に使うメモリ上のキャッシュ. Defaults to None (ディスクだけ使う).
+
+        Examples:
+            >>> cache = HttpCache(Path(".acp/http"), [(r"/tasks/", 86400), (r"/submissions/me", None)])
+            >>> cache.ttl("https://atcoder.jp/contests/abc300/tasks/abc300_a")  # 86400
+        """
+        self.directory = directory
+        self.ttls = [(re.compile(pattern), ttl) for pattern, ttl in ttls or ()]
+        self.default_ttl = default_ttl
+        self.memory = memory
+
+    def ttl(self, url: str) -> float | None:
+        """
+        URLの有効期間 [sec] (保存しないならNone)
+        """
+        for pattern, ttl in self.ttls:
+            if pattern.search(url):
+                return ttl
+        return self.default_ttl
+
+    def _path(self, url: str, identity: str) -> Path:
+        key = f"{url}\0{identity}" if identity else url
+        return self.directory / hashlib.sha256(key.encode()).hexdigest()
+
+    def get(self, url: str, identity: str = "") -> CachedResponse | None:
+        """
+        保存したレスポンスを読む (有効期間は確かめない, なければNone)
+
+        Args:
+            url (str): クエリを含むURL
+            identity (str, optional): ログインの識別子 (同じ識別子で保存したものだけを返す). Defaults to "" (ログインしていない).
+        """
+        if self.memory is not None:
+            cached = self.memory.get(url, identity)
+            if cached is not None:
+                return cached
+        path = self._path(url, identity)
+        try:
+            meta = json.loads(path.with_suffix(".json").read_text())
+            body = path.with_suffix(".body").read_bytes()
+        except (OSError, ValueError):
+            return None
+        if meta.get("url") != url or meta.get("identity", "") != identity:
+            return None  # ハッシュの衝突
+        cached = CachedResponse(
+            url, body, meta["headers"], meta["encoding"], meta["stored"], identity
+        )
+        if self.memory is not None:
+            self.memory.put(cached)
+        return cached
+
+    def put(
+        self, url: str, response: requests.Response, identity: str = ""
+    ) -> CachedResponse:
+        """
+        レスポンスを保存する
+
+        Args:
+            url (str): クエリを含むURL
+            response (requests.Response): 保存するレスポンス
+            identity (str, optional): 取得したときのログインの識別子. Defaults to "" (ログインしていない).
+        """
+        cached = CachedResponse(
+            url,
+            response.content,
+            {k: response.headers[k] for k in _HEADERS if k in response.headers},
+            response.encoding,
+            time.time(),
+            identity,
+        )
+        self._write(cached, body=True)
+        if self.memory is not None:
+            self.memory.put(cached)
+        return cached
+
+    def touch(self, cached: CachedResponse) -> CachedResponse:
+        """
+        再検証できた (304が返った) レスポンスの保存時刻を更新する
+        """
+        cached = cached._replace(stored=time.time())
+        self._write(cached, body=False)
+        if self.memory is not None:
+            self.memory.touch(cached)
+        return cached
+
+    def _write(self, cached: CachedResponse, body: bool) -> None:
+        """
+        途中で読まれても壊れないように、一時ファイルに書いてから置き換える (本文を先に書く)
+        """
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self._path(cached.url, cached.identity)
+        meta = {
+            "url": cached.url,
+            "identity": cached.identity,
+            "headers": cached.headers,
+            "encoding": cached.encoding,
+            "stored": cached.stored,
+        }
+        files = [(path.with_suffix(".json"), json.dumps(meta).encode())]
+        if body:
+            files.insert(0, (path.with_suffix(".body"), cached.body))
+        for file, data in files:
+            fd, tmp = tempfile.mkstemp(dir=self.directory)
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, file)
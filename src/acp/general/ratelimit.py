@@ -0,0 +1,172 @@
+import fcntl
+import json
+import os
+import threading
+import time
+from logging import getLogger
+from pathlib import Path
+from urllib.parse import urlsplit
+
+logger = getLogger(__name__)
+
+
+__all__ = ["HostRateLimiter", "TokenBucket"]
+
+
+class TokenBucket:
+    """
+    トークンバケットによるレート制限 (スレッドセーフ)
+
+    capacity回までは待たずに続けて通し、それを使い切ったら平均でrate回/秒になるように待たせる
+    待つ順番は呼び出した順になる (先に来た呼び出しが先にトークンを予約する)
+    state_fileを指定すると、残りのトークンをファイルに置いてロックするので、同じファイルを使うプロセス間でも共有される
+    共有している相手とrate・capacityが違う場合は厳しい方に合わせ、満タンに戻るまで使われなければ自分の設定に戻す
+    """
+
+    def __init__(
+        self, rate: float, capacity: float = 1, state_file: Path | None = None
+    ) -> None:
+        """
+        Args:
+            rate (float): 1秒あたりに補充するトークン数 (持続的に許すリクエスト数/秒)
+            capacity (float, optional): 貯められるトークン数 (続けて送れるリクエスト数). Defaults to 1.
+            state_file (Path | None, optional): プロセス間で共有する状態のファイル (ロックにも使う). Defaults to None (このインスタンスだけで持つ).
+
+        Examples:
+            >>> bucket = TokenBucket(rate=2, capacity=4)  # 4 requests at once, then 2 per second
+            >>> bucket.acquire()  # returns the seconds it waited
+            >>> shared = TokenBucket(2, 4, Path(".acp/ratelimit/atcoder.jp"))  # shared by all acp processes
+        """
+        if rate <= 0 or capacity < 1:
+            raise ValueError(f"Invalid rate limit: rate={rate}, capacity={capacity}")
+        self.rate = rate
+        self.capacity = capacity
+        self.state_file = state_file
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens: float = 1) -> float:
+        """
+        トークンを取り出す (足りなければ貯まるまで待つ)
+
+        Args:
+            tokens (float, optional): 取り出すトークン数. Defaults to 1.
+
+        Returns:
+            float: 待った時間 [sec]
+        """
+        with self._lock:
+            if self.state_file is None:
+                delay = self._take(tokens, time.monotonic(), self.rate, self.capacity)
+            else:
+                delay = self._take_shared(tokens, self.state_file)
+        if delay > 0:
+            logger.debug("Rate limited: waiting %.2f sec", delay)
+            time.sleep(delay)
+        return delay
+
+    def _take(self, tokens: float, now: float, rate: float, capacity: float) -> float:
+        """
+        rate・capacityで補充してからトークンを取り出し、待つべき時間を返す
+        """
+        self._tokens = min(
+            capacity, self._tokens + max(0.0, now - self._updated) * rate
+        )
+        self._updated = now
+        # 足りない分は前借りして、貯まるまでの時間だけ待つ
+        self._tokens -= tokens
+        return -self._tokens / rate if self._tokens < 0 else 0.0
+
+    def _take_shared(self, tokens: float, state_file: Path) -> float:
+        """
+        ファイルをロックして、他のプロセスと共有している状態からトークンを取り出す
+        (プロセス間で比べられるように、時刻はmonotonicではなくUNIX時間を使う)
+        """
+        state_file.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(state_file, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)  # closeで解放される
+            now = time.time()
+            try:
+                state = json.loads(os.read(fd, 4096))
+                self._tokens, self._updated = state["tokens"], state["updated"]
+                # 別の設定で使っているプロセスがあれば、厳しい方に合わせる
+                rate = min(self.rate, state.get("rate", self.rate))
+                capacity = min(self.capacity, state.get("capacity", self.capacity))
+            except (ValueError, KeyError, TypeError):
+                # 初めて使う (または壊れている) 場合は満タンから始める
+                self._tokens, self._updated = float(self.capacity), now
+                rate, capacity = self.rate, self.capacity
+            if self._tokens + max(0.0, now - self._updated) * rate >= capacity:
+                # 満タンに戻るまで誰も使っていなければ、自分の設定に戻す
+                rate, capacity = self.rate, self.capacity
+            delay = self._take(tokens, now, rate, capacity)
+            state = {
+                "tokens": self._tokens,
+                "updated": now,
+                "rate": rate,
+                "capacity": capacity,
+            }
+            os.lseek(fd, 0, os.SEEK_SET)
+            os.ftruncate(fd, 0)
+            os.write(fd, json.dumps(state).encode())
+        finally:
+            os.close(fd)
+        return delay
+
+
+class HostRateLimiter:
+    """
+    ホストごとのトークンバケット
+
+    state_dirを指定すると、ホストごとの状態を `<state_dir>/<ホスト名>` に置き、同じディレクトリを使う全てのプロセスで共有する
+    """
+
+    def __init__(
+        self, rate: float, capacity: float = 1, state_dir: Path | None = None
+    ) -> None:
+        """
+        Args:
+            rate (float): ホストごとの持続的なリクエスト数 [回/sec]
+            capacity (float, optional): ホストごとに待たずに続けて送れるリクエスト数. Defaults to 1.
+            state_dir (Path | None, optional): プロセス間で共有する状態を置くディレクトリ. Defaults to None (このインスタンスだけで持つ).
+
+        Examples:
+            >>> limiter = HostRateLimiter(2, 4, Path(".acp/ratelimit"))
+            >>> limiter.acquire("https://atcoder.jp/contests/abc300")  # limited per host
+        """
+        if rate <= 0 or capacity < 1:
+            raise ValueError(f"Invalid rate limit: rate={rate}, capacity={capacity}")
+        self.rate = rate
+        self.capacity = capacity
+        self.state_dir = state_dir
+        self._buckets: dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    def bucket(self, host: str) -> TokenBucket:
+        """
+        ホストのトークンバケット
+        """
+        with self._lock:
+            if host not in self._buckets:
+                self._buckets[host] = TokenBucket(
+                    self.rate,
+                    self.capacity,
+                    None if self.state_dir is None else self.state_dir / host,
+                )
+            return self._buckets[host]
+
+    def acquire(self, url: str) -> float:
+        """
+        URLのホストのトークンを取り出す (足りなければ貯まるまで待つ)
+
+        Args:
+            url (str): リクエストするURL
+
+        Returns:
+            float: 待った時間 [sec]
+        """
+        # ポート番号などはファイル名に使えるように置き換える
+        host = urlsplit(url).netloc.replace(":", "_") or "localhost"
+        return self.bucket(host).acquire()
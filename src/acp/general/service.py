@@ -1,3 +1,4 @@
+import hashlib
 import pickle
 import time
 from logging import getLogger
@@ -7,7 +8,10 @@ from typing import Any
 import requests
 import requests.cookies
 from bs4 import BeautifulSoup
+from typing_extensions import Self
 
+from acp.general.http_cache import HttpCache, MemoryCache
+from acp.general.ratelimit import HostRateLimiter
 from acp.general.utils import HttpStatusCode
 
 logger = getLogger(__name__)
@@ -31,6 +35,42 @@ class WebService:
         class ProblemsNotFoundError(Exception):
             pass
 
+    RATE_LIMIT = 2.0
+    """
+    ホストごとの持続的なリクエスト数 [回/sec] (同じセッションディレクトリを使う全てのプロセスの合計)
+    """
+
+    RATE_BURST = 4
+    """
+    しばらくリクエストしていなければ、待たずに続けて送れるリクエスト数
+    """
+
+    CACHE_TTLS: tuple[tuple[str, float | None], ...] = ()
+    """
+    GETのレスポンスをディスクに保存する期間 [sec] (URLの正規表現と期間の組, 最初に一致したものを使う)
+    0なら保存したものを毎回ETag / Last-Modifiedで再検証し、Noneなら保存しない
+    """
+
+    CACHE_DEFAULT_TTL: float | None = None
+    """
+    CACHE_TTLSのどれにも一致しないURLの保存期間 (Noneなら保存しない)
+    """
+
+    SESSION_COOKIE: str | None = None
+    """
+    ログインの状態を持つクッキーの名前 (保存したページはこのクッキーの値ごとに分ける, Noneなら分けない)
+    """
+
+    CACHE_MEMORY_BYTES = 16 << 20
+    """
+    ディスクに保存するレスポンスのうち、最近使ったものをメモリにも置く上限 (圧縮した本文の合計) [byte]
+    """
+
+    CACHE_MEMORY_ENTRIES = 256
+    """
+    メモリに置くレスポンスの数の上限
+    """
+
     def __init__(self, parser: str = "lxml", session_dir: Path | None = None) -> None:
         self._session: requests.Session = requests.Session()
         self._response: requests.Response | None = None
@@ -38,10 +78,54 @@ class WebService:
         self._session_dir = session_dir or (Path.cwd() / ".session")
         self.parser = parser
         self._session_dir.mkdir(parents=True, exist_ok=True)
+        # リクエストの前にホストのトークンを取り出す (状態はセッションディレクトリに置いてプロセス間で共有する)
+        self.rate_limiter: HostRateLimiter | None = HostRateLimiter(
+            self.RATE_LIMIT, self.RATE_BURST, self._session_dir / "ratelimit"
+        )
+        # GETのレスポンスを保存し、別のプロセスからも使う (最近使ったものは圧縮してメモリにも置く)
+        self.http_cache: HttpCache | None = HttpCache(
+            self._session_dir / "http",
+            self.CACHE_TTLS,
+            self.CACHE_DEFAULT_TTL,
+            MemoryCache(self.CACHE_MEMORY_BYTES, self.CACHE_MEMORY_ENTRIES),
+        )
+
+    def fork(self) -> Self:
+        """
+        ログインセッション (クッキー), レート制限, レスポンスのキャッシュを共有する別のクライアントを作る
+        取得したページ (response, soup) はクライアントごとに持つので、スレッドごとに作って使う
+
+        Examples:
+            >>> local = threading.local()
+            >>> local.client = client.fork()  # in each worker thread
+        """
+        client = type(self)(self.parser, self._session_dir)
+        client._session.cookies = self._session.cookies
+        client._session.headers.update(self._session.headers)
+        client.rate_limiter = self.rate_limiter
+        client.http_cache = self.http_cache
+        return client
+
+    def login_identity(self) -> str:
+        """
+        保存したページを分けるログインの識別子 (ログインしていなければ空文字列)
+        ログインの前後で提出フォームやCSRFトークンが変わるページを、別のログインの状態で使わないようにする
+        """
+        if self.SESSION_COOKIE is None:
+            return ""
+        value = self.cookies.get(self.SESSION_COOKIE)
+        return hashlib.sha256(value.encode()).hexdigest() if value else ""
 
     def wait(self, seconds: float) -> None:
         time.sleep(seconds)
 
+    def throttle(self, url: str) -> None:
+        """
+        URLのホストへのリクエストの予算を使い切っていたら、貯まるまで待つ
+        """
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire(url)
+
     @property
     def session(self) -> requests.Session:
         return self._session
@@ -56,43 +140,106 @@ class WebService:
 
     @property
     def soup(self) -> BeautifulSoup:
-        return self._soup if self._soup else BeautifulSoup()
+        """
+        最後に取得したレスポンスのBeautifulSoupオブジェクト
+        初めてアクセスしたときにパースする (HTML / XML以外のレスポンスはパースせず、空のBeautifulSoupを返す)
+        """
+        if self._soup is None:
+            if self._response is None or not self.is_markup(self._response):
+                return BeautifulSoup()
+            self._soup = BeautifulSoup(self._response.text, self.parser)
+        return self._soup
+
+    @staticmethod
+    def is_markup(response: requests.Response) -> bool:
+        """
+        レスポンスがHTML / XMLか (Content-Typeがなければパースしてみる)
+
+        Examples:
+            >>> WebService.is_markup(response)  # False for "application/json"
+        """
+        content_type = response.headers.get("Content-Type", "")
+        mime = content_type.split(";")[0].strip().lower()
+        return not mime or "html" in mime or "xml" in mime
 
     def get(
-        self, url: str, *args: tuple[Any, ...], **kwargs: dict[str, Any]
-    ) -> BeautifulSoup:
+        self,
+        url: str,
+        *args: tuple[Any, ...],
+        use_cache: bool = True,
+        **kwargs: dict[str, Any],
+    ) -> requests.Response:
         """
         getメソッド
-        requests.getを実行し、BeautifulSoupオブジェクトを返す
-        self._soupにBeautifulSoupオブジェクトを格納して、
+        requests.getを実行し、requests.Responseオブジェクトを返す
         self._responseにrequests.Responseオブジェクトを格納する
+        (HTMLのパースはself.soupに初めてアクセスしたときに行う)
+
+        CACHE_TTLSで保存する期間が決まっているURLは、ディスクに保存したレスポンスを使う
+        期間内なら通信せず、過ぎていれば条件付きリクエストで再検証する
+        保存したレスポンスは、同じログインの状態 (login_identity) で取得したものだけを使う
 
         Args:
             url (str): URL
             *args (tuple): requests.getの引数
+            use_cache (bool, optional): ディスクに保存したレスポンスを使うか. Defaults to True.
             **kwargs (dict): requests.getのキーワード引数
 
         Returns:
-            BeautifulSoup: BeautifulSoupオブジェクト
+            requests.Response: レスポンス
         """
 
         logger.info("GET: %s", url)
-        self._response = self._session.get(url, *args, **kwargs)  # type: ignore
-        self.wait(0.25)
+        self._soup = None
+        cache = self.http_cache if use_cache else None
+        # クエリも含めたURLごとに保存する
+        cache_url = (
+            requests.Request("GET", url, params=kwargs.get("params")).prepare().url
+            or url
+        )
+        ttl = None if cache is None else cache.ttl(cache_url)
+        identity = "" if cache is None or ttl is None else self.login_identity()
+        cached = (
+            None if cache is None or ttl is None else cache.get(cache_url, identity)
+        )
+        if cached is not None and ttl is not None and cached.age < ttl:
+            logger.info("Cached: %s (%.0f sec ago)", url, cached.age)
+            self._response = cached.to_response()
+        else:
+            if cached is not None:
+                kwargs["headers"] = {
+                    **(kwargs.get("headers") or {}),
+                    **cached.validators(),
+                }
+            self.throttle(url)
+            self._response = self._session.get(url, *args, **kwargs)  # type: ignore
+            if (
+                cache is not None
+                and cached is not None
+                and self.response.status_code == HttpStatusCode.NOT_MODIFIED.value
+            ):
+                # 変わっていないので保存した本文を使う
+                self._response = cache.touch(cached).to_response()
+            elif (
+                cache is not None
+                and ttl is not None
+                and self.response.status_code == HttpStatusCode.OK.value
+                and not self.response.history  # リダイレクト (ログインページなど) は保存しない
+            ):
+                cache.put(cache_url, self.response, identity)
         if self.response.status_code != HttpStatusCode.OK.value:
             msg = f"Failed to get {url}. Status code: {self.response.status_code}"
             raise self.Exceptions.AccessError(msg)
-        self._soup = BeautifulSoup(self.response.text, self.parser)
-        return self.soup
+        return self.response
 
     def post(
         self, url: str, *args: tuple[Any, ...], **kwargs: dict[str, Any]
-    ) -> BeautifulSoup:
+    ) -> requests.Response:
         """
         postメソッド
-        requests.postを実行し、BeautifulSoupオブジェクトを返す
-        self._soupにBeautifulSoupオブジェクトを格納して、
+        requests.postを実行し、requests.Responseオブジェクトを返す
         self._responseにrequests.Responseオブジェクトを格納する
+        (HTMLのパースはself.soupに初めてアクセスしたときに行う)
 
         Args:
             url (str): URL
@@ -100,15 +247,16 @@ class WebService:
             **kwargs (dict): requests.postのキーワード引数
 
         Returns:
-            BeautifulSoup: BeautifulSoupオブジェクト
+            requests.Response: レスポンス
         """
         logger.info("POST: %s", url)
+        self._soup = None
+        self.throttle(url)
         self._response = self._session.post(url, *args, **kwargs)  # type: ignore
         if self.response.status_code != HttpStatusCode.OK.value:
             msg = f"Failed to post {url}. Status code: {self.response.status_code}"
             raise self.Exceptions.AccessError(msg)
-        self._soup = BeautifulSoup(self.response.text, self.parser)
-        return self.soup
+        return self.response
 
     def login(self, data: dict[Any, Any]) -> None:
         """
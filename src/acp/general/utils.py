@@ -72,6 +72,7 @@ class HttpStatusCode(Enum):
     """
 
     OK = 200
+    NOT_MODIFIED = 304
     BAD_REQUEST = 400
     UNAUTHORIZED = 401
     FORBIDDEN = 403
@@ -114,6 +115,13 @@ def reset_color() -> str:
     return "\033[0m"
 
 
+def clear_line() -> str:
+    """
+    カーソルを行頭に戻して行を消すためのANSIエスケープシーケンスを生成する (進捗の表示を上書きする)
+    """
+    return "\r\033[K"
+
+
 def confirm_yn_input(msg: str = "") -> bool:
     """
     ユーザーにy/nで確認する
@@ -0,0 +1,199 @@
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import time
+from logging import getLogger
+from pathlib import Path
+
+from typing_extensions import Self
+
+logger = getLogger(__name__)
+
+
+__all__ = ["Watcher"]
+
+# <sys/inotify.h>
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_IN_ISDIR = 0x40000000
+_IN_MASK = _IN_CLOSE_WRITE | _IN_MOVED_FROM | _IN_MOVED_TO | _IN_CREATE | _IN_DELETE
+_EVENT = struct.Struct("iIII")  # wd, mask, cookie, len
+
+
+class Watcher:
+    """
+    ディレクトリ以下のファイルの変更を待つクラス
+    Linuxではinotifyを使い、使えない環境ではファイルの更新時刻をポーリングする
+
+    隠しファイル・__pycache__・エディタの一時ファイル・プロファイルの結果は無視する
+    """
+
+    def __init__(
+        self,
+        root: Path,
+        poll_interval: float = 0.5,
+        debounce: float = 0.1,
+        force_polling: bool = False,
+    ) -> None:
+        """
+        Args:
+            root (Path): 監視するディレクトリ
+            poll_interval (float, optional): ポーリングの間隔 [sec]. Defaults to 0.5.
+            debounce (float, optional): 最初の変更の後、まとめて拾うために待つ時間 [sec]. Defaults to 0.1.
+            force_polling (bool, optional): inotifyを使わない. Defaults to False.
+
+        Examples:
+            >>> watcher = Watcher(Path("abc300/a"))
+            >>> changed = watcher.wait()  # {PosixPath('abc300/a/main.py')}
+        """
+        self.root = root
+        self.poll_interval = poll_interval
+        self.debounce = debounce
+        self._fd: int | None = None
+        self._dirs: dict[int, Path] = {}  # inotifyのwatch descriptor -> ディレクトリ
+        self._snapshot: dict[Path, tuple[int, int]] = {}
+        if not force_polling:
+            self._fd = _inotify_init()
+        if self._fd is not None:
+            for directory in [root, *(p for p in root.rglob("*") if p.is_dir())]:
+                if not self.ignored(directory):
+                    self._add_watch(directory)
+        else:
+            self._snapshot = self._scan()
+        logger.info("Watch %s (%s)", root, self.backend)
+
+    @property
+    def backend(self) -> str:
+        return "inotify" if self._fd is not None else "polling"
+
+    def ignored(self, path: Path) -> bool:
+        """
+        変更を無視するファイルか
+        """
+        parts = path.relative_to(self.root).parts
+        return any(
+            part.startswith(".") or part == "__pycache__" for part in parts
+        ) or path.name.endswith(("~", ".swp", ".swx", ".tmp", ".prof", ".perf.data"))
+
+    def wait(self, timeout: float | None = None) -> set[Path]:
+        """
+        ファイルが変更されるまで待つ
+
+        Args:
+            timeout (float | None, optional): 待つ時間の上限 [sec]. Defaults to None (無制限).
+
+        Returns:
+            set[Path]: 変更 (作成・削除を含む) されたファイル (タイムアウトした場合は空)
+        """
+        if self._fd is not None:
+            return self._wait_inotify(timeout)
+        return self._wait_polling(timeout)
+
+    def close(self) -> None:
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+    def _add_watch(self, directory: Path) -> None:
+        assert self._fd is not None and _libc is not None
+        wd = _libc.inotify_add_watch(self._fd, os.fsencode(directory), _IN_MASK)
+        if wd >= 0:
+            self._dirs[wd] = directory
+
+    def _wait_inotify(self, timeout: float | None) -> set[Path]:
+        assert self._fd is not None
+        changed: set[Path] = set()
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            if changed:
+                wait = self.debounce  # 続けて来るイベントもまとめる
+            elif deadline is None:
+                wait = None
+            else:
+                wait = max(deadline - time.monotonic(), 0)
+            readable, _, _ = select.select([self._fd], [], [], wait)
+            if not readable:
+                return changed
+            data = os.read(self._fd, 1 << 16)
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, length = _EVENT.unpack_from(data, offset)
+                name = data[offset + _EVENT.size : offset + _EVENT.size + length]
+                offset += _EVENT.size + length
+                if wd not in self._dirs:
+                    continue
+                path = self._dirs[wd] / os.fsdecode(name.rstrip(b"\0"))
+                if self.ignored(path):
+                    continue
+                if mask & _IN_ISDIR:
+                    if mask & (_IN_CREATE | _IN_MOVED_TO):
+                        self._add_watch(path)
+                    continue
+                changed.add(path)
+
+    def _scan(self) -> dict[Path, tuple[int, int]]:
+        snapshot = {}
+        for path in self.root.rglob("*"):
+            if self.ignored(path):
+                continue
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            if path.is_file():
+                snapshot[path] = (stat.st_mtime_ns, stat.st_size)
+        return snapshot
+
+    def _wait_polling(self, timeout: float | None) -> set[Path]:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            time.sleep(self.poll_interval)
+            snapshot = self._scan()
+            changed = {
+                path
+                for path in snapshot.keys() | self._snapshot.keys()
+                if snapshot.get(path) != self._snapshot.get(path)
+            }
+            if changed:
+                time.sleep(self.debounce)
+                snapshot = self._scan()
+            self._snapshot = snapshot
+            if changed or (deadline is not None and time.monotonic() >= deadline):
+                return changed
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        self.close()
+
+
+def _load_libc() -> ctypes.CDLL | None:
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        return ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+    except OSError:
+        return None
+
+
+_libc = _load_libc()
+
+
+def _inotify_init() -> int | None:
+    """
+    inotifyのファイルディスクリプタを作る (使えなければNone)
+    """
+    if _libc is None or not hasattr(_libc, "inotify_init1"):
+        return None
+    fd = _libc.inotify_init1(os.O_CLOEXEC)
+    if fd < 0:
+        logger.info("inotify is not available: %s", os.strerror(ctypes.get_errno()))
+        return None
+    return int(fd)
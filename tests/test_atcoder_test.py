@@ -0,0 +1,136 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+from acp.atcoder.judge import JudgeResult
+from acp.atcoder.models import AtCoderProblem
+from acp.atcoder.options import BenchOptions, JudgeLimits, ReportOptions
+from acp.atcoder.service import AtCoder
+
+
+def make_problem(tmp_path: Path, answers: list[int]) -> AtCoderProblem:
+    # 入力をそのまま出力する解答に対して、answersと異なるケースがWAになる
+    (tmp_path / "in").mkdir()
+    (tmp_path / "out").mkdir()
+    for i, answer in enumerate(answers):
+        (tmp_path / "in" / f"sample-{i}.in").write_text(f"{i}\n")
+        (tmp_path / "out" / f"sample-{i}.out").write_text(f"{answer}\n")
+    return AtCoderProblem.model_construct(name="test", root_dir=tmp_path)
+
+
+def test_fail_fast(tmp_path: Path, capsys: pytest.CaptureFixture[str]) -> None:
+    problem = make_problem(tmp_path, [0, 100, 2, 3])
+    report = AtCoder(session_dir=tmp_path / ".session").test(
+        problem,
+        command=[sys.executable, "-c", "print(input())"],
+        jobs=1,
+        cache=False,
+        fail_fast=True,
+    )
+    assert report.verdicts == {0: JudgeResult.AC, 1: JudgeResult.WA}
+    out = capsys.readouterr().out
+    assert "Stopped at the first failure (2 cases skipped)" in out
+    assert "\r" not in out  # 端末でなければ進捗は表示しない
+
+
+def test_quiet(tmp_path: Path, capsys: pytest.CaptureFixture[str]) -> None:
+    problem = make_problem(tmp_path, [0, 1, 2])
+    report = AtCoder(session_dir=tmp_path / ".session").test(
+        problem, command=[sys.executable, "-c", "print(input())"], quiet=True
+    )
+    assert report.passed
+    assert [case.name for case in report.cases] == ["sample-0", "sample-1", "sample-2"]
+    assert capsys.readouterr().out == ""
+
+
+def test_test_many(tmp_path: Path, capsys: pytest.CaptureFixture[str]) -> None:
+    problems = []
+    for name, answers, solved in [
+        ("00-a", [0, 1], True),
+        ("01-b", [0, 100, 2], True),
+        ("02-c", [0], False),  # 解答のファイルがない
+    ]:
+        (tmp_path / name).mkdir()
+        problem = make_problem(tmp_path / name, answers)
+        if solved:
+            (tmp_path / name / "main.py").write_text("print(input())\n")
+        problems.append((problem.model_copy(update={"name": name}), tmp_path / name))
+
+    reports = AtCoder(session_dir=tmp_path / ".session").test_many(
+        problems, command=[sys.executable, "main.py"], jobs=2, cache=False
+    )
+    assert reports["00-a"] is not None and reports["00-a"].passed
+    assert reports["01-b"] is not None and reports["01-b"].verdicts == {
+        0: JudgeResult.AC,
+        1: JudgeResult.WA,
+        2: JudgeResult.AC,
+    }
+    assert reports["02-c"] is None
+    out = capsys.readouterr().out
+    assert "skipped (no main.py)" in out
+    assert "1/2 passed, 1 skipped" in out
+    assert out.index("00-a") < out.index("01-b") < out.index("02-c")
+
+
+def test_solution_file() -> None:
+    assert AtCoder.solution_file(["python", "main.py"]) == Path("main.py")
+    assert AtCoder.solution_file(["./a.out"]) == Path("a.out")
+    assert AtCoder.solution_file(["./a.out"], build="main.cpp") == Path("main.cpp")
+    assert AtCoder.solution_file(["python", "-m", "main"]) is None
+
+
+def test_compare(tmp_path: Path, capsys: pytest.CaptureFixture[str]) -> None:
+    problem = make_problem(tmp_path, [0, 1])
+    slow = [sys.executable, "-c", "import time; time.sleep(0.2); print(input())"]
+    fast = [sys.executable, "-c", "print(input())"]
+    wrong = [sys.executable, "-c", "print(1)"]
+    reports = AtCoder(session_dir=tmp_path / ".session").compare(
+        problem, commands=[slow, fast, wrong], bench=BenchOptions(2)
+    )
+    assert [report.command for report in reports] == [slow, fast, wrong]
+    assert reports[2].verdicts == {0: JudgeResult.WA, 1: JudgeResult.AC}
+    case = reports[1].cases[0]
+    assert case.bench is not None and case.bench["repeat"] == 2
+    out = capsys.readouterr().out
+    assert f'Fastest correct: "{" ".join(fast)}"' in out
+
+
+def test_compare_same_command(
+    tmp_path: Path, capsys: pytest.CaptureFixture[str]
+) -> None:
+    # 同じコマンドを複数指定しても、それぞれの結果を返す
+    problem = make_problem(tmp_path, [0])
+    command = [sys.executable, "-c", "print(input())"]
+    reports = AtCoder(session_dir=tmp_path / ".session").compare(
+        problem, commands=[command, command], bench=BenchOptions(1)
+    )
+    assert len(reports) == 2 and all(report.passed for report in reports)
+    out = capsys.readouterr().out
+    assert f"{' '.join(command)} (#1)" in out and f"{' '.join(command)} (#2)" in out
+
+
+def test_options(tmp_path: Path) -> None:
+    assert JudgeLimits(output_limit=1).runner_kwargs() == {
+        "timelimit": 2,
+        "memory_limit": 1024,
+        "output_limit": 1024 * 1024,
+        "address_limit": None,
+    }
+    with pytest.raises(ValueError):
+        BenchOptions(0)
+    with pytest.raises(ValueError):
+        BenchOptions(1, warmup=-1)
+    with pytest.raises(ValueError):
+        ReportOptions("xml", tmp_path / "report.xml")
+
+    problem = make_problem(tmp_path, [0])
+    report = AtCoder(session_dir=tmp_path / ".session").test(
+        problem,
+        command=[sys.executable, "-c", "print(input())"],
+        limits=JudgeLimits(timelimit=4),
+        report=ReportOptions("json", tmp_path / "report.jsonl"),
+        quiet=True,
+    )
+    assert report.passed
+    assert (tmp_path / "report.jsonl").exists()
@@ -0,0 +1,65 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+from acp.atcoder.bench import TimingStats, benchmark
+from acp.atcoder.judge import JudgeResult, JudgeRunner
+
+
+def test_timing_stats() -> None:
+    stats = TimingStats.from_samples([float(x) for x in range(1, 21)])
+    assert stats.min == 1
+    assert stats.median == 10.5
+    assert stats.p95 == 19
+    assert abs(stats.stddev - 5.916) < 1e-3
+    assert TimingStats.from_samples([0.5]) == TimingStats(0.5, 0.5, 0.5, 0.0)
+
+
+def test_benchmark(tmp_path: Path) -> None:
+    (tmp_path / "sample-0.in").write_text("")
+    (tmp_path / "sample-0.out").write_text("1\n")
+    runner = JudgeRunner([sys.executable, "-c", "print(1)"], tmp_path)
+    code, meta = benchmark(
+        runner, tmp_path / "sample-0.in", tmp_path / "sample-0.out", repeat=3, warmup=1
+    )
+    assert code == JudgeResult.AC
+    assert meta["bench"]["repeat"] == 3
+    assert meta["bench"]["time"].min > 0
+    assert not meta["bench"]["near_limit"]
+
+    # 中央値が制限に近ければ警告する
+    _, meta = benchmark(
+        runner,
+        tmp_path / "sample-0.in",
+        tmp_path / "sample-0.out",
+        repeat=3,
+        margin=1.0,
+    )
+    assert meta["bench"]["near_limit"]
+
+
+def test_benchmark_stops_on_failure(tmp_path: Path) -> None:
+    (tmp_path / "sample-0.in").write_text("")
+    (tmp_path / "sample-0.out").write_text("2\n")
+    runner = JudgeRunner([sys.executable, "-c", "print(1)"], tmp_path)
+    code, meta = benchmark(
+        runner, tmp_path / "sample-0.in", tmp_path / "sample-0.out", repeat=3
+    )
+    assert code == JudgeResult.WA
+    assert "bench" not in meta
+
+
+def test_benchmark_invalid_repeat(tmp_path: Path) -> None:
+    runner = JudgeRunner([sys.executable, "-c", "print(1)"], tmp_path)
+    for repeat, warmup in [(0, 0), (0, 1), (1, -1)]:
+        with pytest.raises(ValueError):
+            benchmark(
+                runner,
+                tmp_path / "sample-0.in",
+                tmp_path / "sample-0.out",
+                repeat=repeat,
+                warmup=warmup,
+            )
+    with pytest.raises(ValueError):
+        TimingStats.from_samples([])
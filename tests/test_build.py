@@ -0,0 +1,26 @@
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+
+from acp.atcoder.build import Builder
+
+
+@pytest.mark.skipif(shutil.which("gcc") is None, reason="gcc is not installed")
+def test_build_relative_paths_in_threads(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    # 相対パスのソースとキャッシュでも、同じソースを別スレッドから同時にビルドできる
+    (tmp_path / "src").mkdir()
+    (tmp_path / "src" / "main.c").write_text("int main(void) { return 0; }\n")
+    monkeypatch.chdir(tmp_path)
+    builder = Builder(Path(".acp/build"))
+    with ThreadPoolExecutor(4) as pool:
+        results = list(pool.map(lambda _: builder.build(Path("src/main.c")), range(4)))
+    binaries = {r.binary for r in results}
+    assert len(binaries) == 1
+    binary = binaries.pop()
+    assert binary is not None and binary.is_absolute() and binary.exists()
+    # 一時ディレクトリは残らない
+    assert [p.resolve() for p in Path(".acp/build").iterdir()] == [binary]
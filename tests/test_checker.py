@@ -0,0 +1,55 @@
+from acp.atcoder.checker import Checker, FloatChecker, TokenChecker, YesNoChecker
+
+
+def test_exact_checker_ignores_trailing_whitespace() -> None:
+    assert Checker().compare([b"1 2\n3  \n\n"], [b"1 2\n", b"3\n"]) is None
+    mismatch = Checker().compare([b"1 2\n3\n"], [b"1 2\n", b"4\n"])
+    assert mismatch is not None
+    assert (mismatch.line, mismatch.column) == (2, 1)
+
+
+def test_token_checker_across_chunks() -> None:
+    assert TokenChecker().compare([b"1 2 3\n"], [b"1\n2", b"\n3"]) is None
+    mismatch = TokenChecker().compare([b"1 2 3\n"], [b"1\n2 ", b"34"])
+    assert mismatch is not None
+    assert (mismatch.line, mismatch.column, mismatch.got) == (2, 3, "34")
+    mismatch = TokenChecker().compare([b"1 2"], [b"1"])
+    assert mismatch is not None
+    assert mismatch.got == "(EOF)"
+
+
+def test_float_checker_tolerance() -> None:
+    checker = FloatChecker(abs_eps=1e-6, rel_eps=1e-6)
+    assert checker.compare([b"1.0 2000000\n"], [b"1.0000001 2000001.5"]) is None
+    assert checker.compare([b"1.0 2.0\n"], [b"1.0 2.1"]) is not None
+
+
+def test_yesno_checker() -> None:
+    assert YesNoChecker().compare([b"Yes\nNo\n"], [b"YES\nno\n"]) is None
+    assert YesNoChecker().compare([b"Yes\nabc\n"], [b"yes\nABC\n"]) is not None
+
+
+def test_long_line_is_compared_in_bounded_slices() -> None:
+    # 改行のない長い出力でも行全体を持たずに比較し、行の途中の位置を返す
+    tokens = b" ".join(b"%d" % i for i in range(200000))
+    chunks = [tokens[i : i + 1000] for i in range(0, len(tokens), 1000)]
+    assert Checker().compare(chunks, [tokens]) is None
+    assert TokenChecker().compare(chunks, [tokens + b"\n"]) is None
+    wrong = tokens[:-1] + b"0"
+    mismatch = Checker().compare(chunks, [wrong])
+    assert mismatch is not None
+    assert (mismatch.line, mismatch.column) == (1, len(tokens))
+    mismatch = TokenChecker().compare(chunks, [wrong])
+    assert mismatch is not None
+    assert (mismatch.line, mismatch.column) == (1, len(tokens) - 5)
+    assert (mismatch.expected, mismatch.got) == ("199999", "199990")
+
+
+def test_long_token_across_chunks() -> None:
+    # 空白のない長いトークンがチャンクをまたいでも、トークンとして比較する
+    checker = FloatChecker(abs_eps=1e-6, rel_eps=1e-6)
+    expected = b"1." + b"0" * 100000 + b"1"
+    output = b"1." + b"0" * 100000 + b"2"
+    chunks = [output[i : i + 100] for i in range(0, len(output), 100)]
+    assert checker.compare([expected], chunks) is None
+    assert YesNoChecker().compare([b"1 Yes"], [b"1 Y", b"ES"]) is None
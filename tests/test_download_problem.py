@@ -1,6 +1,88 @@
+import json
+import time
+from pathlib import Path
+
+import pytest
+
+from acp.atcoder.models import AtCoderContest, AtCoderProblem
 from acp.atcoder.service import AtCoder
+from acp.core.models import (
+    AtCoderProblemsAPIResponse,
+    AtCoderProblemsInfo,
+    AtCoderProblemsInnerProblem,
+    AtCoderProblemsMetadata,
+)
+from acp.core.service import AtCoderProblems
 
 
 def test_atcoder() -> None:
     atc = AtCoder()
     assert atc is not None
+
+
+def test_download_problems_keeps_order(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    ids = [f"abc001_{c}" for c in "abcd"]
+
+    class FakeAtCoder:
+        # 後の問題ほど早く取得が終わる
+        rate_limiter = None
+
+        def fork(self) -> "FakeAtCoder":
+            return self
+
+        def get_problem(self, url: str) -> AtCoderProblem:
+            name = url.split("/")[-1]
+            time.sleep(0.05 * (len(ids) - ids.index(name)))
+            contest = AtCoderContest(
+                name="abc001", url="https://atcoder.jp/contests/abc001"
+            )
+            return AtCoderProblem(
+                difficulty="", url=url, contest=contest, point=100, name=name
+            )
+
+        def download_problem(self, problem: AtCoderProblem, target_dir: Path) -> None:
+            (target_dir / "in").mkdir()
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr("acp.core.service.confirm_yn_input", lambda _: True)
+    acp = AtCoderProblems(session_dir=tmp_path / ".acp")
+    monkeypatch.setattr(acp, "login_atcoder", lambda _: FakeAtCoder())
+    acp.problems_metadata = {
+        i: AtCoderProblemsMetadata.model_validate(
+            {
+                "id": i,
+                "contest_id": "abc001",
+                "problem_index": i[-1],
+                "name": i,
+                "title": i,
+                "url": f"https://atcoder.jp/contests/abc001/tasks/{i}",
+            }
+        )
+        for i in ids
+    }
+    contest = AtCoderProblemsAPIResponse(
+        info=AtCoderProblemsInfo(
+            id="x",
+            title="contest",
+            memo="",
+            owner_user_id=0,
+            start_epoch_second=0,
+            duration_second=0,
+            mode=None,
+            is_public=True,
+            penalty_second=0,
+        ),
+        problems=[
+            AtCoderProblemsInnerProblem(id=i, point=None, order=k)
+            for k, i in enumerate(ids)
+        ],
+    )
+    acp.download_problems(contest, tmp_path / "contest", jobs=4)
+
+    info = json.loads((tmp_path / "contest" / "info.json").read_text())
+    assert list(info) == ids
+    assert [p["root_dir"] for p in info.values()] == [
+        f"{k:02d}-{i}" for k, i in enumerate(ids)
+    ]
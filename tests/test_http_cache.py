@@ -0,0 +1,177 @@
+import threading
+from collections.abc import Iterator
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import ClassVar
+from urllib.parse import quote
+
+import pytest
+
+from acp.atcoder.service import AtCoder
+from acp.general.http_cache import CachedResponse, HttpCache, MemoryCache
+from acp.general.service import WebService
+
+
+class Handler(BaseHTTPRequestHandler):
+    # ETagを返し、If-None-Matchが一致すれば304を返すサーバー
+    requests: ClassVar[list[str]] = []
+
+    def do_GET(self) -> None:
+        self.requests.append(self.path)
+        if self.headers.get("If-None-Match") == '"v1"':
+            self.send_response(304)
+            self.end_headers()
+            return
+        if self.path.startswith("/api"):
+            body, content_type = b'{"p": 1}', "application/json"
+        else:
+            body, content_type = f"<p>{self.path}</p>".encode(), "text/html"
+        self.send_response(200)
+        self.send_header("Content-Type", f"{content_type}; charset=utf-8")
+        self.send_header("ETag", '"v1"')
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args: object) -> None:
+        pass
+
+
+@pytest.fixture
+def server() -> Iterator[str]:
+    Handler.requests = []
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+
+
+class Service(WebService):
+    CACHE_TTLS = ((r"/tasks/", 3600), (r"/top", 0), (r"/me", None))
+    SESSION_COOKIE = "session"
+
+
+def test_ttl(tmp_path: Path) -> None:
+    cache = HttpCache(tmp_path, Service.CACHE_TTLS, default_ttl=None)
+    assert cache.ttl("https://atcoder.jp/contests/abc300/tasks/abc300_a") == 3600
+    assert cache.ttl("https://atcoder.jp/contests/abc300/submissions/me") is None
+    assert cache.ttl("https://atcoder.jp/") is None
+
+
+def test_fresh_and_revalidate(tmp_path: Path, server: str) -> None:
+    # 有効期間内なら新しいプロセス (インスタンス) でも通信しない
+    Service(session_dir=tmp_path).get(f"{server}/tasks/a", params={"lang": "ja"})
+    service = Service(session_dir=tmp_path)
+    service.get(f"{server}/tasks/a", params={"lang": "ja"})
+    soup = service.soup
+    assert soup.p is not None and soup.p.text == "/tasks/a?lang=ja"
+    assert Handler.requests == ["/tasks/a?lang=ja"]
+
+    # 有効期間が0なら毎回再検証し、304なら保存した本文を使う
+    service = Service(session_dir=tmp_path)
+    service.get(f"{server}/top")
+    service.get(f"{server}/top")
+    soup = service.soup
+    assert soup.p is not None and soup.p.text == "/top"
+    assert service.response.status_code == 200
+    assert Handler.requests[1:] == ["/top", "/top"]
+
+    # 保存しないURLとuse_cache=Falseは毎回取得する
+    service.get(f"{server}/me")
+    service.get(f"{server}/me")
+    service.get(f"{server}/tasks/a", params={"lang": "ja"}, use_cache=False)
+    assert Handler.requests[3:] == ["/me", "/me", "/tasks/a?lang=ja"]
+
+
+def test_cache_per_login(tmp_path: Path, server: str) -> None:
+    # ログインしていないときに保存したページは、ログインした後には使わない (逆も同じ)
+    service = Service(session_dir=tmp_path)
+    service.get(f"{server}/tasks/a")
+    service.cookies.set("session", "alice")
+    client = service.fork()
+    client.get(f"{server}/tasks/a")
+    Service(session_dir=tmp_path).get(f"{server}/tasks/a")
+    assert Handler.requests == ["/tasks/a", "/tasks/a"]
+
+    # 同じログインの状態なら、別のプロセス (インスタンス) でも保存したものを使う
+    service = Service(session_dir=tmp_path)
+    service.cookies.set("session", "alice")
+    service.get(f"{server}/tasks/a")
+    assert Handler.requests == ["/tasks/a", "/tasks/a"]
+
+
+def test_atcoder_login_identity(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    # REVEL_SESSIONの有効期限 (_TS) が変わっても同じログインとみなす
+    monkeypatch.chdir(tmp_path)
+    atcoder = AtCoder(session_dir=tmp_path / ".ac")
+    assert atcoder.login_identity() == ""
+
+    def session(user: str, ts: int) -> str:
+        data = f"\x00csrf_token:x\x00\x00UserScreenName:{user}\x00\x00_TS:{ts}\x00"
+        return f"{ts:x}-{quote(data)}"
+
+    atcoder.cookies.set("REVEL_SESSION", session("alice", 1))
+    identity = atcoder.login_identity()
+    atcoder.cookies.set("REVEL_SESSION", session("alice", 2))
+    assert atcoder.login_identity() == identity != ""
+    atcoder.cookies.set("REVEL_SESSION", session("bob", 2))
+    assert atcoder.login_identity() != identity
+
+
+def test_memory_cache_lru() -> None:
+    def response(url: str, body: bytes) -> CachedResponse:
+        return CachedResponse(url, body, {}, "utf-8", 0.0)
+
+    # エントリ数の上限を超えたら最も長く使っていないものを捨てる
+    memory = MemoryCache(max_bytes=1 << 20, max_entries=2)
+    memory.put(response("a", b"A" * 1000))
+    memory.put(response("b", b"B"))
+    assert memory.get("a") == response("a", b"A" * 1000)
+    memory.put(response("c", b"C"))
+    assert memory.get("b") is None
+    assert memory.get("c") is not None
+    stats = memory.stats
+    assert (stats.hits, stats.misses, stats.entries) == (2, 1, 2)
+    assert stats.size < 1000  # 圧縮して持つ
+
+    # サイズの上限を超えたら捨て、1つで超えるものは置かない
+    memory = MemoryCache(max_bytes=100, max_entries=10)
+    data = [bytes(range(i, i + 40)) for i in range(3)]  # 圧縮されにくい
+    for i, body in enumerate(data):
+        memory.put(response(str(i), body))
+    assert memory.get("0") is None and memory.get("2") is not None
+    assert memory.stats.size <= 100
+    memory.put(response("big", bytes(range(256))))
+    assert memory.get("big") is None and len(memory) == 2
+
+
+def test_memory_cache_shared(tmp_path: Path, server: str) -> None:
+    # ディスクに保存したものはメモリからも返し、forkしたクライアントとも共有する
+    service = Service(session_dir=tmp_path)
+    service.get(f"{server}/tasks/a")
+    for path in tmp_path.glob("http/*"):
+        path.unlink()
+    client = service.fork()
+    client.get(f"{server}/tasks/a")
+    soup = client.soup
+    assert soup.p is not None and soup.p.text == "/tasks/a"
+    assert Handler.requests == ["/tasks/a"]
+    assert service.http_cache is not None and service.http_cache.memory is not None
+    assert service.http_cache.memory.stats.hits == 1
+
+
+def test_lazy_soup(tmp_path: Path, server: str) -> None:
+    # soupに初めてアクセスしたときにパースし、JSONはパースしない
+    service = Service(session_dir=tmp_path)
+    response = service.get(f"{server}/api/problems.json")
+    assert response.json() == {"p": 1}
+    assert service.soup.find("p") is None and service._soup is None
+
+    service.get(f"{server}/tasks/a")
+    assert service._soup is None
+    soup = service.soup
+    assert soup.p is not None and soup.p.text == "/tasks/a"
+    assert service.soup is soup
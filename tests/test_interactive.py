@@ -0,0 +1,94 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+from acp.atcoder.interactive import InteractiveRunner
+from acp.atcoder.judge import JudgeResult
+
+# 入力ファイルの数を当てさせるインタラクタ (質問 "? x" に ">=" か "<" で答え、"! x" で判定する)
+INTERACTOR = """
+import sys
+secret = int(open(sys.argv[1]).read())
+for _ in range(20):
+    kind, x = input().split()
+    if kind == "!":
+        if int(x) != secret:
+            print("wrong answer", file=sys.stderr)
+            sys.exit(1)
+        sys.exit(0)
+    print(">=" if secret >= int(x) else "<", flush=True)
+print("too many queries", file=sys.stderr)
+sys.exit(1)
+"""
+
+BINARY_SEARCH = """
+lo, hi = 1, 101
+while hi - lo > 1:
+    mid = (lo + hi) // 2
+    print("?", mid, flush=True)
+    if input() == ">=":
+        lo = mid
+    else:
+        hi = mid
+print("!", lo, flush=True)
+"""
+
+
+def make_runner(
+    tmp_path: Path, solution: str, record: bool = False
+) -> InteractiveRunner:
+    (tmp_path / "interactor.py").write_text(INTERACTOR)
+    (tmp_path / "main.py").write_text(solution)
+    (tmp_path / "sample.in").write_text("42\n")
+    return InteractiveRunner(
+        [sys.executable, "main.py"],
+        [sys.executable, "interactor.py"],
+        tmp_path,
+        record=record,
+    )
+
+
+def test_interactive_ac(tmp_path: Path) -> None:
+    runner = make_runner(tmp_path, BINARY_SEARCH)
+    code, meta = runner(tmp_path / "sample.in")
+    assert code == JudgeResult.AC
+    assert meta["interactor_return_code"] == 0
+    assert meta["transcript"] is None  # ACなら記録しない
+
+
+def test_interactive_wa_records_transcript(tmp_path: Path) -> None:
+    # 判定した実行のやりとりを記録する (もう一度実行しない)
+    solution = (
+        'open("runs", "a").write("x")\n'
+        'print("? 50", flush=True); input(); print("! 1", flush=True)'
+    )
+    runner = make_runner(tmp_path, solution, record=True)
+    code, meta = runner(tmp_path / "sample.in")
+    assert code == JudgeResult.WA
+    assert "wrong answer" in meta["interactor_stderr"]
+    assert meta["transcript"] == "> ? 50\n< <\n> ! 1\n"
+    assert (tmp_path / "runs").read_text() == "x"
+
+
+def test_interactive_direct_pipes_by_default(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    # 記録しない場合は解答とインタラクタを直接つなぎ、転送するスレッドを作らない
+    relays: list[object] = []
+    monkeypatch.setattr(
+        "acp.atcoder.interactive._relay", lambda *args: relays.append(args)
+    )
+    runner = make_runner(tmp_path, 'print("? 50", flush=True); input(); print("! 1")')
+    code, meta = runner(tmp_path / "sample.in")
+    assert code == JudgeResult.WA
+    assert meta["transcript"] is None
+    assert relays == []
+
+
+def test_interactive_re_before_interactor_fails(tmp_path: Path) -> None:
+    # 解答が異常終了するとインタラクタも入力が途切れて失敗するが、判定はRE
+    runner = make_runner(tmp_path, "raise SystemExit(3)")
+    code, meta = runner(tmp_path / "sample.in")
+    assert code == JudgeResult.RE
+    assert meta["return_code"] == 3
@@ -0,0 +1,179 @@
+import sys
+import time
+from collections.abc import Iterable
+from pathlib import Path
+
+from acp.atcoder.checker import Checker, Mismatch
+from acp.atcoder.judge import JudgeResult, JudgeRunner
+from acp.atcoder.prefork import PreforkServer
+
+
+class SlowChecker(Checker):
+    """
+    比較を始める前に待つ (比較の途中で子プロセスが終了する状況を作る)
+    """
+
+    def __init__(self, delay: float) -> None:
+        self.delay = delay
+
+    def compare(
+        self, expected: Iterable[bytes], output: Iterable[bytes]
+    ) -> Mismatch | None:
+        time.sleep(self.delay)
+        return super().compare(expected, output)
+
+
+def write_case(tmp_path: Path, stdin: str, expected: str) -> tuple[Path, Path]:
+    (tmp_path / "sample-0.in").write_text(stdin)
+    (tmp_path / "sample-0.out").write_text(expected)
+    return tmp_path / "sample-0.in", tmp_path / "sample-0.out"
+
+
+def test_judge_runner_measures_rusage(tmp_path: Path) -> None:
+    runner = JudgeRunner(
+        [sys.executable, "-c", "print(sum(map(int, input().split())))"], tmp_path
+    )
+    code, meta = runner(*write_case(tmp_path, "1 2\n", "3\n"))
+    assert code == JudgeResult.AC
+    assert meta["time"] > 0
+    assert meta["cpu_time"] > 0
+    assert meta["memory"] > 0
+
+
+def test_judge_runner_wrong_answer(tmp_path: Path) -> None:
+    runner = JudgeRunner([sys.executable, "-c", "print(0)"], tmp_path)
+    code, meta = runner(*write_case(tmp_path, "", "1\n"))
+    assert code == JudgeResult.WA
+    assert meta["answer"] == "0"
+
+
+def test_judge_runner_runtime_error(tmp_path: Path) -> None:
+    runner = JudgeRunner([sys.executable, "-c", "raise SystemExit(3)"], tmp_path)
+    code, meta = runner(*write_case(tmp_path, "", ""))
+    assert code == JudgeResult.RE
+    assert meta["return_code"] == 3
+
+
+def test_judge_runner_kills_at_time_limit(tmp_path: Path) -> None:
+    runner = JudgeRunner(
+        [sys.executable, "-c", "import subprocess; subprocess.run(['sleep', '30'])"],
+        tmp_path,
+    )
+    code, meta = runner(*write_case(tmp_path, "", ""), timelimit=0.2, kill_margin=0.2)
+    assert code == JudgeResult.TLE
+    assert meta["time"] < 5
+
+
+def test_judge_runner_slow_comparison_is_not_tle(tmp_path: Path) -> None:
+    # 時間内に終了していれば、出力の比較がkillする時刻を過ぎてもTLEにしない
+    runner = JudgeRunner([sys.executable, "-c", "print(1)"], tmp_path, SlowChecker(2))
+    code, meta = runner(*write_case(tmp_path, "", "1\n"), timelimit=1, kill_margin=0.5)
+    assert code == JudgeResult.AC
+    assert meta["time"] < 1
+
+
+def test_judge_runner_memory_limit(tmp_path: Path) -> None:
+    runner = JudgeRunner(
+        [sys.executable, "-c", "x = bytearray(512 * 1024 * 1024)"], tmp_path
+    )
+    code, _ = runner(*write_case(tmp_path, "", ""), memory_limit=128)
+    assert code == JudgeResult.MLE
+
+
+def test_judge_runner_reserved_address_space(tmp_path: Path) -> None:
+    # 予約しただけで使っていないアドレス空間はメモリ制限に数えない (JVMやGoのヒープなど)
+    runner = JudgeRunner(
+        [sys.executable, "-c", "import mmap; m = mmap.mmap(-1, 2048 << 20)"], tmp_path
+    )
+    code, _ = runner(*write_case(tmp_path, "", ""), memory_limit=128)
+    assert code == JudgeResult.AC
+    code, _ = runner(
+        *write_case(tmp_path, "", ""), memory_limit=128, address_limit=1024
+    )
+    assert code != JudgeResult.AC
+
+
+def test_judge_runner_aborts_on_first_mismatch(tmp_path: Path) -> None:
+    runner = JudgeRunner(
+        [sys.executable, "-c", "print(1); print(3, flush=True); input()"], tmp_path
+    )
+    code, meta = runner(*write_case(tmp_path, "", "1\n2\n"), timelimit=10)
+    assert code == JudgeResult.WA
+    assert (meta["mismatch"].line, meta["mismatch"].column) == (2, 1)
+    assert meta["time"] < 5
+
+
+def test_judge_runner_crash_after_wrong_output(tmp_path: Path) -> None:
+    # 不一致が見つかる前に自分で異常終了していたら、killせずにそのリターンコードでREにする
+    runner = JudgeRunner(
+        [sys.executable, "-c", "print(3, flush=True); raise SystemExit(5)"],
+        tmp_path,
+        SlowChecker(1),
+    )
+    code, meta = runner(*write_case(tmp_path, "", "1\n2\n"), timelimit=10)
+    assert code == JudgeResult.RE
+    assert meta["return_code"] == 5
+
+
+def test_judge_runner_sleep_then_crash(tmp_path: Path) -> None:
+    # 不一致が見つかった時点でまだ実行中なら、異常終了を待たずにkillしてWAにする
+    runner = JudgeRunner(
+        [
+            sys.executable,
+            "-c",
+            "import time; print(3, flush=True); time.sleep(5); raise SystemExit(5)",
+        ],
+        tmp_path,
+    )
+    code, meta = runner(*write_case(tmp_path, "", "1\n2\n"), timelimit=10)
+    assert code == JudgeResult.WA
+    assert meta["time"] < 5
+
+
+def test_judge_runner_output_limit(tmp_path: Path) -> None:
+    runner = JudgeRunner(
+        [sys.executable, "-c", "while True: print('y' * 1000)"], tmp_path
+    )
+    expected = ("y" * 1000 + "\n") * 2000
+    code, meta = runner(*write_case(tmp_path, "", expected), output_limit=1 << 20)
+    assert code == JudgeResult.OLE
+    assert meta["output_size"] > 1 << 20
+
+
+def test_judge_runner_prefork(tmp_path: Path) -> None:
+    (tmp_path / "main.py").write_text(
+        "import sys\n"
+        "a, b = map(int, input().split())\n"
+        "print(a + b)\n"
+        "sys.exit(0 if 'json' in sys.modules else 1)\n"
+    )
+    command = [sys.executable, "main.py"]
+    with PreforkServer(command, tmp_path, ["json"]) as server:
+        runner = JudgeRunner(command, tmp_path, prefork=server)
+        for a in range(3):
+            code, meta = runner(*write_case(tmp_path, f"{a} 2\n", f"{a + 2}\n"))
+            assert code == JudgeResult.AC
+            assert meta["memory"] > 0
+        assert server.startup is not None
+        assert len(server._workers) == 1  # ワーカーは使い回される
+
+        (tmp_path / "main.py").write_text("raise ValueError('boom')\n")
+        code, meta = runner(*write_case(tmp_path, "", ""))
+        assert code == JudgeResult.RE
+        assert "ValueError: boom" in meta["stderr"]
+
+
+def test_judge_runner_prefork_worker_crash(tmp_path: Path) -> None:
+    # ワーカーが落ちたらREにして、次からは新しいワーカーを使う
+    (tmp_path / "main.py").write_text("import os\nos.kill(os.getppid(), 9)\n")
+    command = [sys.executable, "main.py"]
+    with PreforkServer(command, tmp_path) as server:
+        runner = JudgeRunner(command, tmp_path, prefork=server)
+        code, _ = runner(*write_case(tmp_path, "", ""))
+        assert code == JudgeResult.RE
+        assert server._workers == []
+
+        (tmp_path / "main.py").write_text("print(1)\n")
+        code, _ = runner(*write_case(tmp_path, "", "1\n"))
+        assert code == JudgeResult.AC
+        assert len(server._workers) == 1
@@ -0,0 +1,40 @@
+import sys
+from pathlib import Path
+
+from acp.atcoder.memprofile import MemoryProfiler
+
+SOLUTION = """
+n = int(input())
+pairs = [(i, i * 2) for i in range(n)]
+print(len(pairs))
+"""
+
+
+def test_memprofile_finds_allocating_line(tmp_path: Path) -> None:
+    (tmp_path / "main.py").write_text(SOLUTION)
+    (tmp_path / "sample-0.in").write_text("100000\n")
+    report = MemoryProfiler([sys.executable, "main.py"]).profile(
+        tmp_path / "sample-0.in", tmp_path
+    )
+    assert report is not None
+    assert report.peak > 100000 * 64  # タプル1つで64バイト以上
+    assert (report.top[0].filename, report.top[0].lineno) == ("main.py", 3)
+
+
+def test_memprofile_reports_memory_error(tmp_path: Path) -> None:
+    # メモリ制限を超えてMemoryErrorで終了しても、それまでの結果が残る
+    (tmp_path / "main.py").write_text("a = []\nwhile True:\n    a.append([0] * 1000)\n")
+    (tmp_path / "sample-0.in").write_text("")
+    report = MemoryProfiler([sys.executable, "main.py"]).profile(
+        tmp_path / "sample-0.in", tmp_path, address_limit=64
+    )
+    assert report is not None
+    assert report.peak > 64 * 1024 * 1024
+    assert (report.top[0].filename, report.top[0].lineno) == ("main.py", 3)
+
+
+def test_memprofile_supported() -> None:
+    assert MemoryProfiler.supported(["python3", "main.py"])
+    assert MemoryProfiler.supported([sys.executable, "-m", "solution"])
+    assert not MemoryProfiler.supported(["pypy3", "main.py"])
+    assert not MemoryProfiler.supported(["./a.out"])
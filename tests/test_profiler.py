@@ -0,0 +1,40 @@
+import sys
+from pathlib import Path
+
+from acp.atcoder.profiler import Profiler
+
+SOLUTION = """
+def slow(n):
+    return sum(i * i for i in range(n))
+
+def fast(n):
+    return n
+
+n = int(input())
+print(slow(n) + fast(n))
+"""
+
+
+def test_profiler_finds_hot_function(tmp_path: Path) -> None:
+    (tmp_path / "main.py").write_text(SOLUTION)
+    (tmp_path / "sample-0.in").write_text("300000\n")
+    profiler = Profiler([sys.executable, "main.py"], tmp_path, top=3)
+    assert profiler.tool == "cProfile"
+    result = profiler.profile(tmp_path / "sample-0.in", tmp_path / "sample-0")
+    assert result.profile_file == tmp_path / "sample-0.prof"
+    assert result.profile_file.exists()
+    assert not result.timed_out
+    assert len(result.hot) == 3
+    assert "main.py:3(<genexpr>)" in [hot.name for hot in result.hot]
+
+
+def test_profiler_keeps_profile_of_interrupted_run(tmp_path: Path) -> None:
+    (tmp_path / "main.py").write_text("def spin():\n    while True: pass\nspin()\n")
+    (tmp_path / "sample-0.in").write_text("")
+    profiler = Profiler([sys.executable, "main.py"], tmp_path)
+    result = profiler.profile(
+        tmp_path / "sample-0.in", tmp_path / "sample-0", timeout=0.5
+    )
+    assert result.timed_out
+    assert result.hot[0].name == "main.py:1(spin)"
+    assert result.hot[0].share > 0.9
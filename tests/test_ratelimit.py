@@ -0,0 +1,91 @@
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from acp.general.ratelimit import HostRateLimiter, TokenBucket
+
+
+def test_burst_then_rate() -> None:
+    bucket = TokenBucket(rate=20, capacity=3)
+    start = time.monotonic()
+    waits = [bucket.acquire() for _ in range(5)]
+    # 3回までは待たず、その後は1回あたり1/20秒ずつ待つ
+    assert waits[:3] == [0.0, 0.0, 0.0]
+    assert time.monotonic() - start == pytest.approx(2 / 20, abs=0.03)
+
+
+def test_shared_by_threads() -> None:
+    bucket = TokenBucket(rate=50, capacity=1)
+    start = time.monotonic()
+    threads = [threading.Thread(target=bucket.acquire) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    # スレッドをまたいでも、全体で50回/秒を超えない
+    assert time.monotonic() - start >= 5 / 50 - 0.01
+
+
+def test_stricter_settings_win(tmp_path: Path) -> None:
+    # 同じファイルを別の設定で使っているときは厳しい方に合わせる
+    strict = TokenBucket(10, 1, tmp_path / "atcoder.jp")
+    lenient = TokenBucket(1000, 100, tmp_path / "atcoder.jp")
+    strict.acquire()
+    start = time.monotonic()
+    for _ in range(3):
+        lenient.acquire()
+    assert time.monotonic() - start >= 3 / 10 - 0.02
+
+    # 満タンに戻るまで使われなければ、自分の設定に戻す
+    time.sleep(2 / 10)
+    start = time.monotonic()
+    for _ in range(5):
+        lenient.acquire()
+    assert time.monotonic() - start < 0.05
+
+
+def test_invalid() -> None:
+    with pytest.raises(ValueError):
+        TokenBucket(rate=0)
+
+
+def test_shared_by_processes(tmp_path: Path) -> None:
+    # 同じファイルを使う2つのプロセスで、合わせて20回/秒を超えない
+    script = (
+        "import sys, time\n"
+        "from pathlib import Path\n"
+        "from acp.general.ratelimit import TokenBucket\n"
+        "bucket = TokenBucket(20, 1, Path(sys.argv[1]))\n"
+        "for _ in range(4):\n"
+        "    bucket.acquire()\n"
+        "    print(time.time())\n"
+    )
+    procs = [
+        subprocess.Popen(
+            [sys.executable, "-c", script, str(tmp_path / "atcoder.jp")],
+            stdout=subprocess.PIPE,
+            text=True,
+        )
+        for _ in range(2)
+    ]
+    times = sorted(float(t) for proc in procs for t in proc.communicate()[0].split())
+    assert len(times) == 8
+    # 取得してから時刻を記録するまでに待たされることがあるので、隣り合う間隔ではなく全体の長さで見る
+    # (別々に数えていれば2倍の速さになり、0.15秒ほどで終わる)
+    assert times[-1] - times[0] >= 7 / 20 - 0.02
+
+
+def test_per_host(tmp_path: Path) -> None:
+    limiter = HostRateLimiter(1, 1, tmp_path)
+    assert limiter.acquire("https://atcoder.jp/contests/abc300") == 0.0
+    # 別のホストは別のバケットなので待たない
+    assert (
+        limiter.acquire("https://kenkoooo.com/atcoder/resources/problems.json") == 0.0
+    )
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["atcoder.jp", "kenkoooo.com"]
+    # 同じホストは予算を使い切っているので待つ
+    assert HostRateLimiter(20, 1, tmp_path).acquire("https://atcoder.jp/") > 0
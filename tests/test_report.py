@@ -0,0 +1,76 @@
+import json
+import sys
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+import pytest
+
+from acp.atcoder.judge import JudgeResult, JudgeRunner
+from acp.atcoder.report import CaseReport, JudgeReport
+
+
+def make_report(tmp_path: Path) -> JudgeReport:
+    # sample-0はAC, sample-1はWA, sample-2はRE
+    runner = JudgeRunner(
+        [
+            sys.executable,
+            "-c",
+            "import sys; n = int(input()); print(n * 2); sys.exit(n == 3)",
+        ],
+        tmp_path,
+    )
+    cases = []
+    for i, (n, expected) in enumerate([(1, 2), (2, 5), (3, 6)]):
+        (tmp_path / f"sample-{i}.in").write_text(f"{n}\n")
+        (tmp_path / f"sample-{i}.out").write_text(f"{expected}\n")
+        code, meta = runner(tmp_path / f"sample-{i}.in", tmp_path / f"sample-{i}.out")
+        cases.append(CaseReport.from_meta(i, code, meta, tmp_path / f"sample-{i}.out"))
+    return JudgeReport("abc300_a", ["python", "main.py"], cases, wall_time=1.0)
+
+
+def test_report_summary(tmp_path: Path) -> None:
+    report = make_report(tmp_path)
+    assert report.verdicts == {0: JudgeResult.AC, 1: JudgeResult.WA, 2: JudgeResult.RE}
+    assert not report.passed
+    summary = report.summary()
+    assert summary["cases"] == 3
+    assert summary["verdicts"] == {"AC": 1, "WA": 1, "RE": 1}
+    assert summary["max_memory"] == max(case.memory for case in report.cases)
+    assert report.cases[1].mismatch == "line 1, column 1"
+    assert report.cases[1].expected_size == 2
+    assert report.cases[2].return_code == 1
+
+
+def test_report_json_lines(tmp_path: Path) -> None:
+    path = tmp_path / "report" / "result.jsonl"
+    make_report(tmp_path).write("json", path)
+    records = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [r["type"] for r in records] == ["case", "case", "case", "summary"]
+    assert [r["verdict"] for r in records[:3]] == ["AC", "WA", "RE"]
+    assert records[0]["output_size"] == 2
+    assert {"time", "cpu_time", "memory", "return_code"} <= records[0].keys()
+    assert records[-1]["passed"] is False
+
+
+def test_report_junit(tmp_path: Path) -> None:
+    path = tmp_path / "result.xml"
+    make_report(tmp_path).write("junit", path)
+    suite = ET.parse(path).getroot()
+    assert (suite.get("tests"), suite.get("failures"), suite.get("errors")) == (
+        "3",
+        "1",
+        "1",
+    )
+    testcases = suite.findall("testcase")
+    assert [tc.get("name") for tc in testcases] == ["sample-0", "sample-1", "sample-2"]
+    assert testcases[1].find("failure").get("type") == "WA"  # type: ignore[union-attr]
+    assert testcases[2].find("error").get("type") == "RE"  # type: ignore[union-attr]
+
+
+def test_report_error_and_unknown_format(tmp_path: Path) -> None:
+    report = JudgeReport("abc300_a", ["./a.out"], [], error="CE: main.cpp:1: error")
+    assert not report.passed
+    suite = ET.fromstring(report.to_junit().split("?>", 1)[1])
+    assert suite.get("errors") == "1"
+    with pytest.raises(ValueError):
+        report.write("csv", tmp_path / "result.csv")
@@ -0,0 +1,43 @@
+import sys
+from pathlib import Path
+
+from acp.atcoder.checker import FloatChecker
+from acp.atcoder.judge import JudgeResult, JudgeRunner
+from acp.atcoder.result_cache import ResultCache
+
+
+def test_result_cache(tmp_path: Path) -> None:
+    (tmp_path / "main.py").write_text("print(1)\n")
+    (tmp_path / "sample-0.in").write_text("")
+    (tmp_path / "sample-0.out").write_text("2\n")
+    command = [sys.executable, "main.py"]
+    cache = ResultCache(tmp_path / "results")
+    args = (command, tmp_path, tmp_path / "sample-0.in", tmp_path / "sample-0.out")
+
+    key = cache.key(*args, timelimit=2)
+    assert cache.get(key) is None
+    code, meta = JudgeRunner(command, tmp_path)(*args[2:])
+    assert code == JudgeResult.WA
+    cache.put(key, code, meta)
+
+    cached_code, cached_meta = cache.get(key)  # type: ignore[misc]
+    assert cached_code == JudgeResult.WA
+    assert cached_meta["cached"]
+    assert cached_meta["mismatch"] == meta["mismatch"]
+    assert cached_meta["time"] == meta["time"]
+
+    # 解答・テストケース・制限・判定方法のどれかが変わればキーも変わる
+    assert cache.key(*args, timelimit=3) != key
+    assert cache.key(*args, FloatChecker(), timelimit=2) != key
+    (tmp_path / "sample-0.out").write_text("1\n")
+    assert cache.key(*args, timelimit=2) != key
+    (tmp_path / "sample-0.out").write_text("2\n")
+    assert cache.key(*args, timelimit=2) == key
+    (tmp_path / "main.py").write_text("print(2)\n")
+    assert cache.key(*args, timelimit=2) != key
+
+
+def test_result_cache_skips_internal_error(tmp_path: Path) -> None:
+    cache = ResultCache(tmp_path / "results")
+    cache.put("key", JudgeResult.IE, {})
+    assert cache.get("key") is None
@@ -0,0 +1,49 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+from acp.atcoder.scale import InputCache, fit_complexities
+
+
+def test_fit_complexities() -> None:
+    samples = [(n, 0.05 + 1e-8 * n * n) for n in (1000, 2000, 4000, 8000)]
+    best = fit_complexities(samples)[0]
+    assert best.name == "O(n^2)"
+    assert best.predict(16000) == pytest.approx(0.05 + 1e-8 * 16000**2, rel=1e-3)
+
+    samples = [(n, 2e-7 * n) for n in (10**4, 10**5, 10**6)]
+    assert fit_complexities(samples)[0].name == "O(n)"
+
+
+def test_fit_complexities_needs_three_sizes() -> None:
+    # 2種類のサイズではどの計算量でも誤差0で当てはまるので推定しない
+    with pytest.raises(ValueError):
+        fit_complexities([(1000, 0.1), (2000, 0.2), (2000, 0.3)])
+    with pytest.raises(ValueError):
+        fit_complexities([(0, 0.01), (1000, 0.1), (2000, 0.2)])
+
+
+def test_input_cache(tmp_path: Path) -> None:
+    (tmp_path / "gen.py").write_text(
+        "import sys; n, seed = map(int, sys.argv[1:]); print(n); print(*range(n))"
+    )
+    generator = [sys.executable, "gen.py"]
+    cache = InputCache(tmp_path / "cache")
+    path, cached = cache.get(generator, tmp_path, 5)
+    assert not cached
+    assert path.read_text() == "5\n0 1 2 3 4\n"
+    assert cache.get(generator, tmp_path, 5) == (path, True)
+
+    # 生成器を書き換えたらキャッシュは使わない
+    (tmp_path / "gen.py").write_text("import sys; print(sys.argv[1])")
+    path, cached = cache.get(generator, tmp_path, 5)
+    assert not cached
+    assert path.read_text() == "5\n"
+
+
+def test_input_cache_generator_error(tmp_path: Path) -> None:
+    cache = InputCache(tmp_path / "cache")
+    with pytest.raises(InputCache.Exceptions.GeneratorError):
+        cache.get([sys.executable, "-c", "raise SystemExit(1)"], tmp_path, 5)
+    assert list((tmp_path / "cache").iterdir()) == []
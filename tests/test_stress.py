@@ -0,0 +1,47 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+from acp.atcoder.judge import JudgeResult
+from acp.atcoder.stress import StressTester
+
+GENERATOR = (
+    "import sys, random; random.seed(int(sys.argv[1])); print(random.randint(1, 20))"
+)
+REFERENCE = "n = int(input()); print(sum(range(n + 1)))"
+
+
+def python(code: str) -> list[str]:
+    return [sys.executable, "-c", code]
+
+
+def test_stress_tester_finds_failing_case(tmp_path: Path) -> None:
+    # n >= 10 のときだけ間違える解答
+    solution = "n = int(input()); print(n * (n + 1) // 2 if n < 10 else 0)"
+    tester = StressTester(
+        python(GENERATOR), python(solution), python(REFERENCE), tmp_path
+    )
+    case = tester.run(tmp_path, jobs=2, max_cases=200)
+    assert case is not None
+    assert case.code == JudgeResult.WA
+    n = int(case.input_file.read_text())
+    assert n >= 10
+    assert case.output_file.read_text() == f"{n * (n + 1) // 2}\n"
+
+
+def test_stress_tester_no_failing_case(tmp_path: Path) -> None:
+    solution = "n = int(input()); print(n * (n + 1) // 2)"
+    tester = StressTester(
+        python(GENERATOR), python(solution), python(REFERENCE), tmp_path
+    )
+    assert tester.run(tmp_path, jobs=2, max_cases=10) is None
+    assert list(tmp_path.iterdir()) == []  # 通ったケースは残らない
+
+
+def test_stress_tester_generator_error(tmp_path: Path) -> None:
+    tester = StressTester(
+        python("raise SystemExit(1)"), python(""), python(""), tmp_path
+    )
+    with pytest.raises(StressTester.Exceptions.CommandFailedError):
+        tester.run(tmp_path, jobs=2)
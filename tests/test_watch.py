@@ -0,0 +1,27 @@
+import threading
+from pathlib import Path
+
+import pytest
+
+from acp.general.watch import Watcher
+
+
+@pytest.mark.parametrize("force_polling", [False, True])
+def test_watcher_detects_changes(tmp_path: Path, force_polling: bool) -> None:
+    (tmp_path / "in").mkdir()
+    (tmp_path / "main.py").write_text("print(1)\n")
+    with Watcher(tmp_path, poll_interval=0.05, force_polling=force_polling) as watcher:
+        assert watcher.backend == "polling" or not force_polling
+
+        timer = threading.Timer(
+            0.1, lambda: (tmp_path / "in" / "sample-0.in").write_text("1\n")
+        )
+        timer.start()
+        assert watcher.wait(timeout=5) == {tmp_path / "in" / "sample-0.in"}
+        timer.join()
+
+        (tmp_path / "main.py").write_text("print(2)\n")
+        (tmp_path / ".main.py.swp").write_text("")  # 無視される
+        assert watcher.wait(timeout=5) == {tmp_path / "main.py"}
+
+        assert watcher.wait(timeout=0.2) == set()